@@ -0,0 +1,154 @@
+"""Run the benchmarks and compare them with a stored baseline.
+
+Usage:
+    python -m benchmarks                      # all cases at 1x, 10x and 100x
+    python -m benchmarks --scales 1 10 -k ids # only cases matching "ids"
+    python -m benchmarks --save-baseline      # store the results as the baseline
+
+Results are written to benchmarks/results/. The run exits with status 1 when a case
+is slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+import warnings
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.cases import CASES
+
+BENCHMARKS_DIR: str = os.path.dirname(__file__)
+RESULTS_DIR: str = f"{BENCHMARKS_DIR}/results"
+BASELINE_PATH: str = f"{BENCHMARKS_DIR}/baseline.json"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=BENCHMARKS_DIR,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def time_case(name: str, scale: int, repeat: int) -> dict:
+    """Time a case `repeat` times in a fresh workspace"""
+
+    with fixtures.workspace(), CASES[name](scale) as func:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+    return {
+        "min": round(min(timings), 4),
+        "median": round(statistics.median(timings), 4),
+        "repeat": repeat,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, floor: float) -> list:
+    """Cases whose median time grew by more than `threshold` (and `floor` seconds)"""
+
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous or "median" not in result or "median" not in previous:
+            continue
+
+        change = result["median"] / previous["median"] - 1 if previous["median"] else 0
+        if change > threshold and result["median"] - previous["median"] > floor:
+            regressions.append((key, previous["median"], result["median"], change))
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pandas transforms")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-k", dest="keyword", help="Only run cases matching this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown that counts as a regression (default 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--floor",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this many seconds (default 0.05)",
+    )
+    args = parser.parse_args()
+
+    # Deprecation noise from the transforms would drown the results
+    warnings.simplefilter("ignore", FutureWarning)
+
+    names = [n for n in CASES if not args.keyword or args.keyword in n]
+    results = {}
+
+    for name in names:
+        for scale in args.scales:
+            key = f"{name}@{scale}x"
+            try:
+                results[key] = time_case(name, scale, args.repeat)
+                print(f"{key:<65} {results[key]['median']:>9.3f}s")
+            except Exception as error:
+                results[key] = {"error": repr(error)}
+                print(f"{key:<65} failed: {error!r}")
+                traceback.print_exc()
+
+    run = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    with open(f"{RESULTS_DIR}/{stamp}.json", "w") as file:
+        json.dump(run, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(run, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with. Run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+
+    regressions = compare(results, baseline, args.threshold, args.floor)
+    for key, before, after, change in regressions:
+        print(f"REGRESSION {key}: {before:.3f}s -> {after:.3f}s (+{change:.0%})")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""The transforms timed by the benchmark runner.
+
+Each case is a context manager which takes a scale, prepares the synthetic input
+(and any patches needed to feed it to the transform) and yields the function to
+time. Preparation is not timed.
+"""
+
+from contextlib import contextmanager
+from unittest import mock
+
+from benchmarks import fixtures
+
+CASES: dict = {}
+
+
+def benchmark(name: str):
+    """Register a case under `name`"""
+
+    def decorator(func):
+        CASES[name] = contextmanager(func)
+        return func
+
+    return decorator
+
+
+@benchmark("oda.sector_cube+sectors_ts")
+def sectors_ts(scale: int):
+    from scripts.oda import topic_charts
+
+    data = fixtures.sectors_view(scale)
+
+    common = topic_charts.common
+
+    # Build the sector cube from a new sectors view, then the topic chart series
+    yield lambda: topic_charts.build_sectors_ts(
+        common.build_sector_cube(common.index_sectors(data))
+    )
+
+
+@benchmark("debt.ids_data.clean_ids_data+_flourish_clean_ids")
+def clean_ids(scale: int):
+    from scripts.debt import ids_data
+
+    data = fixtures.ids_raw(scale)
+
+    yield lambda: ids_data.clean_ids_data(data).pipe(ids_data._flourish_clean_ids)
+
+
+@benchmark("country_page.world_bank.wb_financial_summary")
+def wb_financial_summary(scale: int):
+    from scripts import config
+    from scripts.country_page import world_bank
+
+    for name in ("ida", "ibrd"):
+        fixtures.wb_financial_records(scale).to_feather(
+            f"{config.PATHS.raw_data}/{name}_full_historical_data.feather"
+        )
+
+    yield world_bank.wb_financial_summary
+
+
+@benchmark("owid_covid.tools.date_resample")
+def date_resample(scale: int):
+    from scripts.owid_covid import tools
+
+    data = fixtures.owid_long(scale)
+
+    yield lambda: tools.date_resample(data)
+
+
+@benchmark("owid_covid.tools.interpolate")
+def interpolate(scale: int):
+    from scripts.owid_covid import tools
+
+    data = fixtures.owid_sparse(scale)
+
+    yield lambda: tools.interpolate(data, start_date="2021-01-01")
+
+
+@benchmark("country_page.food_security.insufficient_food_chart")
+def insufficient_food_chart(scale: int):
+    from scripts.country_page import food_security
+
+    wfp = fixtures.FakeWFP(scale)
+
+    with (
+        mock.patch.object(food_security, "_read_wfp", lambda: wfp),
+        mock.patch.object(
+            food_security, "add_population_column", fixtures.add_population_column
+        ),
+    ):
+        yield food_security.insufficient_food_chart
+
+
+@benchmark("common.df_to_key_number")
+def df_to_key_number(scale: int):
+    from scripts import common
+
+    data = fixtures.key_numbers(scale)
+
+    yield lambda: common.df_to_key_number(
+        data,
+        indicator_name="benchmark",
+        id_column="iso_code",
+        value_columns=["value", "date"],
+    )
+
+
+@benchmark("fast_csv.to_csv_text")
+def fast_csv_text(scale: int):
+    from scripts.fast_csv import to_csv_text
+
+    data = fixtures.wide_pivot(scale)
+
+    # The fast writer is only useful if Flourish sees the same bytes
+    if to_csv_text(data) != data.to_csv(index=False, lineterminator="\n"):
+        raise ValueError("to_csv_text does not match DataFrame.to_csv")
+
+    yield lambda: to_csv_text(data)
+
+
+@benchmark("jsonstat.read_dataset")
+def jsonstat_read_dataset(scale: int):
+    from pyjstat import pyjstat
+
+    from scripts.jsonstat import read_dataset
+
+    data = fixtures.ids_jsonstat(scale)
+
+    # The decoder replaces pyjstat followed by dropping the empty cells
+    expected = pyjstat.Dataset(data).write(output="dataframe")
+    expected = expected.loc[expected.value.notna()].reset_index(drop=True)
+    if not read_dataset(data).astype(object).equals(expected.astype(object)):
+        raise ValueError("read_dataset does not match pyjstat")
+
+    yield lambda: read_dataset(data)
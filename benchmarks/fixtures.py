@@ -0,0 +1,317 @@
+"""Synthetic inputs for the benchmarks.
+
+Each fixture takes a `scale` and returns data shaped like the real input of a
+transform. At scale 1 the size is roughly that of today's data; the row count grows
+linearly with the scale. All fixtures are seeded so runs are comparable.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from scripts.config import PATHS
+
+# Static files the transforms read through PATHS, copied into the workspace
+STATIC_FILES: tuple = ("wb_groupings.csv", "debt/ids_country_codes.csv")
+
+# Used as-is so that country conversions behave as they do with real data
+AFRICAN_ISO3: list = [
+    "AGO", "BDI", "BEN", "BFA", "BWA", "CAF", "CIV", "CMR", "COD", "COG", "COM",
+    "CPV", "DJI", "DZA", "EGY", "ERI", "ETH", "GAB", "GHA", "GIN", "GMB", "GNB",
+    "GNQ", "KEN", "LBR", "LBY", "LSO", "MAR", "MDG", "MLI", "MOZ", "MRT", "MUS",
+    "MWI", "NAM", "NER", "NGA", "RWA", "SDN", "SEN", "SLE", "SOM", "SSD", "STP",
+    "SWZ", "SYC", "TCD", "TGO", "TUN", "TZA", "UGA", "ZAF", "ZMB", "ZWE",
+]  # fmt: skip
+
+DAC_CODES: list = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 18, 20, 21, 22, 40, 50]
+DAC_CODES += [61, 68, 69, 75, 76, 301, 302, 701, 742, 918]
+
+# A sample of purpose codes across the sector groups used by oda_data
+PURPOSE_CODES: list = [
+    11110, 11220, 11320, 11420, 12110, 12220, 12240, 12310, 13020, 14010, 14030,
+    15110, 15111, 15114, 15150, 15160, 15210, 16010, 16020, 16050, 21010, 23110,
+    23210, 24010, 25010, 31110, 31120, 31310, 41010, 43010, 51010, 52010, 60010,
+    72010, 72040, 73010, 74010, 91010, 93010, 99810,
+]  # fmt: skip
+
+
+def _rng(seed: int = 0) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+@contextmanager
+def workspace():
+    """Point PATHS to a temporary project folder for the duration of a benchmark.
+
+    Log records are not written to the project log file meanwhile.
+    """
+
+    from scripts.logger import file_handler, logger
+
+    original = PATHS.project_dir
+    folder = tempfile.mkdtemp(prefix="aftershocks_bench_")
+    logger.removeHandler(file_handler)
+
+    try:
+        for file in STATIC_FILES:
+            target = f"{folder}/raw_data/{file}"
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy(f"{original}/raw_data/{file}", target)
+
+        for sub in ("charts_live", "charts_download"):
+            for page in ("country_page", "debt_topic", "health", "oda_topic"):
+                os.makedirs(f"{folder}/{sub}/{page}", exist_ok=True)
+
+        PATHS.project_dir = folder
+        yield folder
+
+    finally:
+        PATHS.project_dir = original
+        logger.addHandler(file_handler)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def ids_raw(scale: int = 1) -> pd.DataFrame:
+    """IDS debt service/stocks as downloaded by `ids_data` (~200k rows at scale 1)"""
+
+    from scripts.debt.common import DEBT_SERVICE
+
+    names = pd.read_csv(
+        f"{PATHS.raw_data}/debt/ids_country_codes.csv", encoding="utf-8-sig"
+    ).name.to_list()[:150]
+    counterparts = ["World", *[f"Creditor {i}" for i in range(6 * scale - 1)]]
+    years = np.arange(2009, 2031, dtype="int16")
+
+    index = pd.MultiIndex.from_product(
+        [names, counterparts, list(DEBT_SERVICE), years],
+        names=["country", "counterpart-area", "series_code", "time"],
+    )
+
+    return (
+        index.to_frame(index=False)
+        .assign(
+            series=lambda d: d.series_code,
+            value=_rng().gamma(2, 5e6, len(index)),
+        )
+        .astype(
+            {
+                "time": "Int16",
+                "country": "category",
+                "series_code": "category",
+                "counterpart-area": "category",
+                "series": "category",
+            }
+        )
+    )
+
+
+def wb_financial_records(scale: int = 1) -> pd.DataFrame:
+    """IDA or IBRD cumulative disbursement records (~25k rows at scale 1)"""
+
+    rng = _rng()
+    countries = [
+        "Kenya", "Nigeria", "Ethiopia", "Ghana", "Senegal", "Uganda", "Tanzania",
+        "Mozambique", "Zambia", "Rwanda", "Malawi", "Mali", "Niger", "Benin",
+        "Cameroon", "Madagascar", "Burkina Faso", "Chad", "Egypt", "Morocco",
+    ]  # fmt: skip
+    periods = pd.date_range("2016-01-01", "2026-01-01", freq="MS")
+    credits = 10 * scale
+
+    index = pd.MultiIndex.from_product(
+        [countries, range(credits), periods], names=["country", "credit", "period"]
+    )
+    df = index.to_frame(index=False)
+    df["disbursed_amount"] = (
+        df.groupby(["country", "credit"])["period"]
+        .transform(lambda _: np.cumsum(rng.gamma(2, 1e5, len(_))))
+        .round(2)
+        .astype(str)
+    )
+
+    return df.drop(columns="credit")
+
+
+def owid_long(scale: int = 1) -> pd.DataFrame:
+    """OWID indicators in long format, daily (~250k rows at scale 1)"""
+
+    rng = _rng()
+    dates = pd.date_range(end=pd.Timestamp("today").floor("D"), periods=1000)
+    iso_codes = [f"C{i:03d}" for i in range(250)]
+    indicators = [f"indicator_{i}" for i in range(scale)]
+
+    index = pd.MultiIndex.from_product(
+        [iso_codes, indicators, dates], names=["iso_code", "indicator", "date"]
+    )
+    df = index.to_frame(index=False)
+    df["value"] = rng.normal(50, 10, len(df))
+    # OWID series have gaps
+    df.loc[rng.random(len(df)) < 0.3, "value"] = np.nan
+
+    return df
+
+
+def owid_sparse(scale: int = 1) -> pd.DataFrame:
+    """Sparse country series to interpolate (~60 countries at scale 1)"""
+
+    rng = _rng()
+    dates = pd.date_range("2021-01-01", periods=1000)
+    frames = []
+    for i in range(60 * scale):
+        picked = np.sort(rng.choice(len(dates), size=100, replace=False))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "iso_code": f"C{i:04d}",
+                    "date": dates[picked],
+                    "value": np.cumsum(rng.random(100)),
+                }
+            )
+        )
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def wfp_insufficient_food(scale: int = 1) -> pd.DataFrame:
+    """WFP people with insufficient food consumption (~54k rows at scale 1).
+
+    Larger scales add observations within each day so that the data still falls in
+    the period the chart keeps.
+    """
+
+    rng = _rng()
+    freq = f"{max(1440 // scale, 1)}min"
+    dates = pd.date_range("2022-01-01", "2024-10-01", freq=freq, inclusive="left")
+    dates = dates[: 1000 * scale]
+
+    index = pd.MultiIndex.from_product([AFRICAN_ISO3, dates], names=["iso_code", "date"])
+    df = index.to_frame(index=False)
+    df["value"] = rng.uniform(1e5, 2e7, len(df)).round()
+
+    return df
+
+
+def population() -> pd.DataFrame:
+    """Population of the African countries, as added by bblocks"""
+
+    return pd.DataFrame(
+        {
+            "iso_code": AFRICAN_ISO3,
+            "population": _rng(1).uniform(1e5, 2e8, len(AFRICAN_ISO3)).round(),
+        }
+    )
+
+
+def add_population_column(
+    df: pd.DataFrame, id_column: str, id_type: str | None = None
+) -> pd.DataFrame:
+    """Stands in for bblocks' `add_population_column`, without downloading data"""
+
+    return df.merge(
+        population().rename(columns={"iso_code": id_column}), on=id_column, how="left"
+    )
+
+
+class FakeWFP:
+    """Stands in for bblocks' WFPData, serving fixtures instead of files"""
+
+    def __init__(self, scale: int = 1):
+        self._data = {"insufficient_food": wfp_insufficient_food(scale)}
+
+    def get_data(self, indicator: str) -> pd.DataFrame:
+        return self._data[indicator].copy()
+
+
+def sectors_view(scale: int = 1) -> pd.DataFrame:
+    """Aid by donor, recipient and purpose code (~100k rows at scale 1)"""
+
+    years = pd.to_datetime([f"{y}-01-01" for y in range(2010, 2024)])
+    recipients = [f"Recipient {i}" for i in range(3 * scale)]
+
+    index = pd.MultiIndex.from_product(
+        [years, DAC_CODES, recipients, PURPOSE_CODES],
+        names=["year", "donor_code", "recipient_name", "purpose_code"],
+    )
+    df = index.to_frame(index=False)
+
+    return df.assign(
+        donor_code=lambda d: d.donor_code.astype("Int16"),
+        purpose_name=lambda d: d.purpose_code.astype(str),
+        value=_rng().gamma(1.5, 10, len(df)),
+    )
+
+
+def key_numbers(scale: int = 1) -> pd.DataFrame:
+    """Country level indicators to turn into key numbers (~60 rows at scale 1)"""
+
+    rng = _rng()
+    n = 60 * scale
+
+    return pd.DataFrame(
+        {
+            "iso_code": [f"C{i:05d}" for i in range(n)],
+            "value": rng.normal(size=n).round(2),
+            "date": pd.Timestamp("2024-01-01").strftime("%d %B %Y"),
+        }
+    )
+
+
+def wide_pivot(scale: int = 1) -> pd.DataFrame:
+    """A country pivot like `inflation_ts_by_country.csv` (~300 rows at scale 1).
+
+    Values are rounded like the charts, with gaps, and a few names need quotes.
+    """
+
+    rng = _rng()
+    dates = pd.date_range("2000-01-01", periods=300 * scale, freq="MS")
+    names = [f"Country {code}" for code in AFRICAN_ISO3]
+    names[:3] = ["Congo, Dem. Rep.", "Congo, Rep.", "Egypt, Arab Rep."]
+
+    values = rng.normal(10, 20, (len(dates), len(names))).round(2)
+    values[rng.random(values.shape) < 0.1] = np.nan
+
+    df = pd.DataFrame(values, columns=names)
+    df.insert(0, "date", dates.strftime("%Y-%m-%d"))
+    df.insert(1, "indicator", "Inflation")
+
+    return df
+
+
+def ids_jsonstat(scale: int = 1) -> dict:
+    """An IDS JSON-stat response for one series (~20k observations at scale 1).
+
+    The cube has every country x counterpart x year cell, and most are empty.
+    """
+
+    rng = _rng()
+    countries = [f"Country {i}" for i in range(120)]
+    counterparts = ["World", *[f"Creditor {i}" for i in range(100 * scale - 1)]]
+    years = [str(year) for year in range(2009, 2031)]
+
+    sizes = [len(countries), len(counterparts), 1, len(years)]
+    values = rng.gamma(2, 5e6, int(np.prod(sizes))).round(1)
+    empty = rng.random(len(values)) > 0.08
+
+    def dimension(label: str, names: list) -> dict:
+        ids = [f"{label[:3]}{i}" for i in range(len(names))]
+        return {
+            "label": label,
+            "category": {"index": ids, "label": dict(zip(ids, names))},
+        }
+
+    return {
+        "class": "dataset",
+        "version": "2.0",
+        "id": ["country", "counterpart-area", "series", "time"],
+        "size": sizes,
+        "dimension": {
+            "country": dimension("country", countries),
+            "counterpart-area": dimension("counterpart-area", counterparts),
+            "series": dimension("series", ["PPG, bilateral (DOD, current US$)"]),
+            "time": dimension("time", years),
+        },
+        "value": [None if e else v for e, v in zip(empty, values.tolist())],
+    }
@@ -0,0 +1,89 @@
+"""Measure the cold-start import time of the update scripts.
+
+Usage:
+    python -m benchmarks.import_time                  # the three update scripts
+    python -m benchmarks.import_time update_weekly    # a single module
+    python -m benchmarks.import_time --top 15         # also show the slowest imports
+
+Each import runs in a fresh interpreter with `-X importtime`, so nothing is cached
+between runs. The run exits with status 1 when a module takes longer than the target.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR: str = os.path.dirname(os.path.dirname(__file__))
+MODULES: tuple = ("update_daily", "update_weekly", "update_monthly")
+
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_profile(module: str) -> tuple[float, list[tuple[str, float]]]:
+    """Import time of `module` in seconds, and the time of each of its imports"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_DIR,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    profile = []
+    for line in result.stderr.splitlines():
+        if match := _LINE.match(line):
+            _, cumulative, indent, name = match.groups()
+            profile.append((name, int(cumulative) / 1e6, len(indent)))
+
+    # The module is the last entry and its imports are listed just before it, after
+    # the interpreter's own start-up imports (site, encodings...)
+    *imports, (_, total, _) = profile
+    start = max(
+        (i + 1 for i, (_, _, indent) in enumerate(imports) if indent == 0), default=0
+    )
+    children = [(name, s) for name, s, indent in imports[start:] if indent == 2]
+
+    return total, children
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time cold imports of the scripts")
+    parser.add_argument("modules", nargs="*", default=list(MODULES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=1.0,
+        help="Slowest acceptable median import time in seconds (default 1.0)",
+    )
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest imports")
+    args = parser.parse_args()
+
+    too_slow = []
+    for module in args.modules:
+        timings = []
+        for _ in range(args.repeat):
+            total, children = import_profile(module)
+            timings.append(total)
+
+        median = statistics.median(timings)
+        status = "ok" if median <= args.target else "TOO SLOW"
+        print(f"{module:<20} {median:>7.3f}s (min {min(timings):.3f}s)  {status}")
+
+        if median > args.target:
+            too_slow.append(module)
+
+        for name, seconds in sorted(children, key=lambda i: -i[1])[: args.top]:
+            print(f"    {name:<50} {seconds:>7.3f}s")
+
+    return 1 if too_slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
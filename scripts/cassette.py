@@ -0,0 +1,246 @@
+"""Record and replay HTTP traffic so update runs can be repeated offline.
+
+Two entry points are patched: `requests.adapters.HTTPAdapter.send`, which every
+`requests` call goes through (including pyjstat and the bblocks and oda_data
+importers), and `urllib.request.urlopen`, which pandas uses to read URLs.
+
+- In "record" mode every response is fetched from the web and stored in the cassette
+  folder.
+- In "replay" mode responses are served from the cassette folder, after an optional
+  simulated latency. A request which was never recorded raises `CassetteMiss`.
+- In "live" mode (the default) nothing is patched.
+
+The mode can be set with `use_cassettes()` or the `AFTERSHOCKS_HTTP` and
+`AFTERSHOCKS_HTTP_LATENCY` environment variables.
+"""
+
+import email.message
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.request
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from scripts.config import PATHS
+
+CASSETTE_DIR: str = f"{PATHS.raw_data}/cassettes"
+MODES: tuple = ("live", "record", "replay")
+
+_original_send = HTTPAdapter.send
+_original_urlopen = urllib.request.urlopen
+_state = {"mode": "live", "latency": 0.0, "folder": CASSETTE_DIR}
+_lock = threading.Lock()
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request that was never recorded"""
+
+
+def _normalise_url(url: str) -> str:
+    """Sort query parameters so equivalent URLs share a cassette"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def request_key(method: str, url: str, body: bytes | str | None = None) -> str:
+    """Hash identifying a request in the cassette folder"""
+
+    if isinstance(body, str):
+        body = body.encode()
+
+    digest = hashlib.sha256(f"{method.upper()} {_normalise_url(url)}".encode())
+    digest.update(body or b"")
+
+    return digest.hexdigest()
+
+
+def _paths(key: str) -> tuple[str, str]:
+    folder = f"{_state['folder']}/{key[:2]}"
+    return f"{folder}/{key}.json", f"{folder}/{key}.body"
+
+
+def _save(key: str, meta: dict, body: bytes) -> None:
+    meta_path, body_path = _paths(key)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+    # Write to temporary files first so a concurrent reader never sees half a body
+    for path, content, mode in ((body_path, body, "wb"), (meta_path, meta, "w")):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, mode) as file:
+            if mode == "w":
+                json.dump(content, file, indent=2)
+            else:
+                file.write(content)
+        os.replace(temp_path, path)
+
+
+def _load(key: str, url: str) -> tuple[dict, bytes]:
+    meta_path, body_path = _paths(key)
+
+    try:
+        with open(meta_path) as file:
+            meta = json.load(file)
+        with open(body_path, "rb") as file:
+            body = file.read()
+    except FileNotFoundError:
+        raise CassetteMiss(f"No recorded response for {url}")
+
+    if _state["latency"]:
+        time.sleep(_state["latency"])
+
+    return meta, body
+
+
+# ---------------------------------------------------------------------------------
+# requests
+# ---------------------------------------------------------------------------------
+
+
+def _build_response(request, meta: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = meta["status"]
+    response.reason = meta.get("reason", "")
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = meta["url"]
+    response.request = request
+    response._content = body
+    # As for a response read in full: `iter_content` (and `stream=True` consumers)
+    # then serve the body
+    response._content_consumed = True
+    response.raw = io.BytesIO(body)
+
+    return response
+
+
+def _send(adapter, request, **kwargs):
+    key = request_key(request.method, request.url, request.body)
+
+    if _state["mode"] == "replay":
+        return _build_response(request, *_load(key, request.url))
+
+    response = _original_send(adapter, request, **kwargs)
+
+    if _state["mode"] == "record":
+        meta = {
+            "method": request.method,
+            "url": response.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            # The body is stored decoded, so the encoding headers no longer apply
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower()
+                not in ("content-encoding", "content-length", "transfer-encoding")
+            },
+        }
+        _save(key, meta, response.content)
+
+    return response
+
+
+# ---------------------------------------------------------------------------------
+# urllib (used by pandas to read URLs)
+# ---------------------------------------------------------------------------------
+
+
+class _RecordedResponse(io.BytesIO):
+    """Minimal stand-in for the object returned by urllib's urlopen"""
+
+    def __init__(self, meta: dict, body: bytes):
+        super().__init__(body)
+        self.url = meta["url"]
+        self.status = meta["status"]
+        self.reason = meta.get("reason", "")
+        self.headers = email.message.Message()
+        for name, value in meta["headers"].items():
+            self.headers[name] = value
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def info(self):
+        return self.headers
+
+
+def _urlopen(url, data=None, *args, **kwargs):
+    if isinstance(url, urllib.request.Request):
+        method, full_url, body = url.get_method(), url.full_url, url.data
+    else:
+        method, full_url, body = ("POST" if data else "GET"), url, data
+
+    key = request_key(method, full_url, body)
+
+    if _state["mode"] == "replay":
+        return _RecordedResponse(*_load(key, full_url))
+
+    response = _original_urlopen(url, data, *args, **kwargs)
+
+    if _state["mode"] != "record":
+        return response
+
+    with response:
+        content = response.read()
+        meta = {
+            "method": method,
+            "url": response.geturl(),
+            "status": response.status,
+            "reason": response.reason,
+            "headers": dict(response.headers.items()),
+        }
+
+    _save(key, meta, content)
+
+    return _RecordedResponse(meta, content)
+
+
+# ---------------------------------------------------------------------------------
+# Switching modes
+# ---------------------------------------------------------------------------------
+
+
+def use_cassettes(
+    mode: str = "live", latency: float = 0.0, folder: str = CASSETTE_DIR
+) -> None:
+    """Set how HTTP requests are handled for the rest of the process.
+
+    Args:
+        mode: "live" (no recording), "record" or "replay".
+        latency: seconds to wait before serving a replayed response.
+        folder: where cassettes are stored.
+    """
+
+    if mode not in MODES:
+        raise ValueError(f"HTTP mode must be one of {MODES}, not '{mode}'")
+
+    with _lock:
+        _state.update(mode=mode, latency=float(latency), folder=folder)
+
+        if mode == "live":
+            HTTPAdapter.send = _original_send
+            urllib.request.urlopen = _original_urlopen
+        else:
+            HTTPAdapter.send = _send
+            urllib.request.urlopen = _urlopen
+
+
+def use_cassettes_from_env() -> None:
+    """Configure cassettes from AFTERSHOCKS_HTTP and AFTERSHOCKS_HTTP_LATENCY"""
+
+    use_cassettes(
+        mode=os.environ.get("AFTERSHOCKS_HTTP", "live"),
+        latency=float(os.environ.get("AFTERSHOCKS_HTTP_LATENCY", 0)),
+    )
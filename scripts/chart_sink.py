@@ -0,0 +1,93 @@
+"""Write the live and download versions of a chart in one go.
+
+Most charts are saved twice: as-is under `charts_live` and, with an extra `source`
+column, under `charts_download`. `ChartSink.write` serializes the frame once (with
+`scripts.fast_csv`) and derives the download version from the same text. A file is
+only replaced when its content changes, so unchanged charts keep their modification
+time (no git churn and no CDN cache invalidation). The files that did (or did not)
+change are recorded in the run report.
+"""
+
+import hashlib
+
+import pandas as pd
+
+from scripts.config import PATHS
+from scripts.fast_csv import csv_cell, to_csv_text
+from scripts.files import atomic_write, file_digest
+from scripts.instrumentation import record_output
+from scripts.logger import logger
+
+
+def write_if_changed(path: str, content: bytes) -> bool:
+    """Write `content` to `path` unless the file already holds exactly that"""
+
+    if file_digest(path) == hashlib.sha256(content).hexdigest():
+        record_output(path, changed=False)
+        return False
+
+    with atomic_write(path, "wb") as file:
+        file.write(content)
+
+    record_output(path, changed=True)
+    return True
+
+
+def _add_column(text: str, df: pd.DataFrame, name: str, value: str) -> str:
+    """The csv `text` of `df` with a constant column added at the end"""
+
+    lines = text.split("\n")
+    # A record on several lines (or a single, possibly empty, column) would need
+    # pandas' own handling
+    if len(lines) != len(df) + 2 or len(df.columns) < 2 or name in df.columns:
+        return to_csv_text(df.assign(**{name: value}))
+
+    cell = csv_cell(value)
+    rows = [f"{line},{cell}" for line in lines[1:-1]]
+
+    return "\n".join([f"{lines[0]},{csv_cell(name)}", *rows, ""])
+
+
+class ChartSink:
+    """Writes the charts of a page, e.g. `ChartSink("country_page")`"""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def write(
+        self,
+        name: str,
+        df: pd.DataFrame,
+        source: str | None = None,
+        live: bool = True,
+        download: bool = True,
+    ) -> list[str]:
+        """Save `df` as `name` (e.g. "debt_ts.csv") in the live and download folders.
+
+        The download version gets a `source` column when a source is given. Set
+        `live` or `download` to False to only write one of them.
+
+        Returns the paths of the files whose content changed.
+        """
+
+        text = to_csv_text(df)
+        outputs = []
+
+        if live:
+            outputs.append((f"{PATHS.charts}/{self.folder}/{name}", text))
+
+        if download:
+            if source is not None:
+                text = _add_column(text, df, "source", source)
+            outputs.append((f"{PATHS.download}/{self.folder}/{name}", text))
+
+        changed = [
+            path for path, text in outputs if write_if_changed(path, text.encode())
+        ]
+
+        if changed:
+            logger.debug(f"Saved '{self.folder}/{name}' ({len(changed)} file(s))")
+        else:
+            logger.debug(f"'{self.folder}/{name}' is unchanged")
+
+        return changed
@@ -1,11 +1,10 @@
-import json
-import os
+from functools import cache
 
-import country_converter as coco
 import pandas as pd
-from country_converter import country_converter
 
 from scripts.config import PATHS
+from scripts.country_ids import converter
+from scripts.key_numbers import key_number_store, to_document
 
 WEO_YEAR: int = 2024
 CAUSES_OF_DEATH_YEAR = 2019
@@ -14,7 +13,7 @@ DEBT_YEAR: int = 2024
 
 def get_full_africa_iso3() -> list:
     africa = (
-        coco.CountryConverter()
+        converter()
         .data[["ISO3", "continent"]]
         .query("continent == 'Africa'")
         .ISO3.to_list()
@@ -58,7 +57,7 @@ def base_africa_df():
     """Create a map with geometries for all african countries"""
 
     return (
-        country_converter.CountryConverter()
+        converter()
         .data[["ISO3", "continent"]]
         .rename(columns={"ISO3": "iso_code"})
         .query("continent == 'Africa'")
@@ -78,24 +77,37 @@ def _download_wb_regions():
             "CountryName": "country_name",
         }
     )
-    df.to_csv(f"{PATHS.raw_data}/wb_groupings.csv", index=False)
+    df.to_csv(_wb_groupings_path(), index=False)
 
+    # The regions are built again from the new file
+    _wb_groupings.cache_clear()
+    _region_registry.cache_clear()
+    _region_membership.cache_clear()
 
-def read_wb_regions(region_code: str) -> dict:
-    """Read World Bank regions from csv file"""
 
-    df = pd.read_csv(f"{PATHS.raw_data}/wb_groupings.csv")
+def _wb_groupings_path() -> str:
+    return f"{PATHS.raw_data}/wb_groupings.csv"
 
-    data = (
-        df.groupby("group_code")
-        .apply(lambda d: d.iso_code.to_list(), include_groups=False)
-        .to_dict()
-    )
 
-    return data[region_code]
+@cache
+def _wb_groupings(path: str) -> dict[str, tuple]:
+    """The countries of every World Bank group, read once per file"""
 
+    df = pd.read_csv(path)
+
+    return {code: tuple(group.iso_code) for code, group in df.groupby("group_code")}
+
+
+def read_wb_regions(region_code: str) -> list:
+    """Read World Bank regions from csv file"""
+
+    return list(_wb_groupings(_wb_groupings_path())[region_code])
+
+
+@cache
+def _region_registry(groupings_path: str) -> dict[str, tuple]:
+    """The countries of every region, built once per World Bank groupings file"""
 
-def regions() -> dict:
     north_africa_wb = [
         "DZA",
         "EGY",
@@ -113,7 +125,7 @@ def regions() -> dict:
     }
 
     data = (
-        country_converter.CountryConverter()
+        converter()
         .data[["ISO3", "continent", "UNregion"]]
         .rename(columns={"ISO3": "iso_code"})
         .query("continent == 'Africa'")
@@ -125,15 +137,72 @@ def regions() -> dict:
         "SSA_WB": data.query("iso_code not in @north_africa_wb").iso_code.to_list(),
         "AFR": data.iso_code.to_list(),
         "SSA_UN": data.query("un != 'NAF'").iso_code.to_list(),
-        "AFE_WB": read_wb_regions("AFE"),
-        "AFW_WB": read_wb_regions("AFW"),
+        "AFE_WB": _wb_groupings(groupings_path)["AFE"],
+        "AFW_WB": _wb_groupings(groupings_path)["AFW"],
     }
 
     # UN regions
     for region in data.un.unique():
         regions_dict[region] = data.query("un == @region").iso_code.to_list()
 
-    return regions_dict
+    return {region: tuple(members) for region, members in regions_dict.items()}
+
+
+def regions() -> dict:
+    """The ISO3 codes of the countries in every region, by region code"""
+
+    registry = _region_registry(_wb_groupings_path())
+
+    return {region: list(members) for region, members in registry.items()}
+
+
+@cache
+def _region_membership(groupings_path: str) -> pd.DataFrame:
+    registry = _region_registry(groupings_path)
+
+    return pd.DataFrame(
+        [(iso, region) for region, members in registry.items() for iso in members],
+        columns=["iso_code", "region"],
+    ).astype({"region": pd.CategoricalDtype(list(registry))})
+
+
+def region_membership() -> pd.DataFrame:
+    """A country by region membership table, with one row per (iso_code, region).
+
+    The region column is categorical, ordered as in `regions()`.
+    """
+
+    return _region_membership(_wb_groupings_path()).copy()
+
+
+def groupby_regions(
+    df: pd.DataFrame,
+    agg,
+    by: str | list[str] | None = None,
+    id_column: str = "iso_code",
+    **kwargs,
+) -> pd.DataFrame:
+    """Aggregate `df` for every region at once.
+
+    Each row is joined to the regions its country (in `id_column`) belongs to, and
+    the result is grouped by region and `by`. `agg` (and `kwargs`) are passed to
+    `DataFrameGroupBy.agg`, so it can be "median", "sum", a dict, etc.
+
+    Returns a dataframe with a `region` column holding the region code. Regions are
+    in the order of `regions()` and those without data are left out.
+    """
+
+    if isinstance(by, str):
+        by = [by]
+
+    membership = region_membership().rename(columns={"iso_code": id_column})
+
+    return (
+        df.merge(membership, on=id_column, how="inner")
+        .groupby(["region", *(by or [])], observed=True, as_index=False)
+        .agg(agg, **kwargs)
+        .astype({"region": str})
+    )
 
 
 def region_names() -> dict:
@@ -179,35 +248,34 @@ def df_to_key_number(
     id_column: str,
     value_columns: str | list[str],
 ) -> dict:
+    """{indicator_name: {id: {value_column: value}}}, with the values as strings"""
+
     if isinstance(value_columns, str):
         value_columns = [value_columns]
 
-    return (
-        df.assign(indicator=indicator_name)
-        .filter(["indicator", id_column] + value_columns, axis=1)
-        .groupby(["indicator"])
-        .apply(
-            lambda x: x.set_index(id_column)[value_columns]
-            .astype(str)
-            .to_dict(orient="index")
-        )
-        .to_dict()
+    # Each id is a key of the document: a duplicate would silently hide a value
+    duplicated = df[id_column].loc[lambda s: s.duplicated()].unique()
+    if len(duplicated) > 0:
+        ids = ", ".join(map(str, duplicated))
+        raise ValueError(f"Duplicated ids in '{id_column}' for {indicator_name}: {ids}")
+
+    # One (indicator, entity_id, field, value) row per value, in the order of `df`
+    table = (
+        df.filter([id_column] + value_columns, axis=1)
+        .astype({column: str for column in value_columns})
+        .melt(id_vars=id_column, var_name="field", value_name="_value")
+        .rename(columns={id_column: "entity_id", "_value": "value"})
+        .assign(indicator=indicator_name)
     )
 
+    return to_document(table)
 
-def update_key_number(path: str, new_dict: dict) -> None:
-    """Update a key number json by updating it with a new dictionary"""
-
-    # Check if the file exists, if not create
-    if not os.path.exists(path):
-        with open(path, "w") as f:
-            json.dump({}, f)
 
-    with open(path, "r") as f:
-        data = json.load(f)
+def update_key_number(path: str, new_dict: dict) -> None:
+    """Update a key number json by updating it with a new dictionary.
 
-    for k in new_dict.keys():
-        data[k] = new_dict[k]
+    The update goes through the shared key-number store, so during a task run the
+    file is written once, at the end of the run (see `scripts.key_numbers`).
+    """
 
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+    key_number_store().update(path, new_dict)
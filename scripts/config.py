@@ -1,4 +1,5 @@
 import os
+import threading
 
 
 class Paths:
@@ -39,3 +40,47 @@ class Paths:
 
 
 PATHS = Paths(os.path.dirname(os.path.dirname(__file__)))
+
+
+# Packages whose data folders have been pointed to PATHS
+_configured: set = set()
+_configure_lock = threading.Lock()
+
+
+def _configure_bblocks() -> None:
+    from bblocks import set_bblocks_data_path
+
+    set_bblocks_data_path(PATHS.bblocks_data)
+
+
+def _configure_pydeflate() -> None:
+    from pydeflate import set_pydeflate_path
+
+    set_pydeflate_path(PATHS.raw_data)
+
+
+def _configure_oda_data() -> None:
+    from oda_data import set_data_path
+
+    set_data_path(PATHS.raw_oda)
+
+
+_CONFIGURE = {
+    "bblocks": _configure_bblocks,
+    "pydeflate": _configure_pydeflate,
+    "oda_data": _configure_oda_data,
+}
+
+
+def configure_data_paths(*packages: str) -> None:
+    """Point the data folders of bblocks, pydeflate and oda_data to PATHS.
+
+    Each package is configured (and imported) once, the first time it is requested.
+    Without arguments all three packages are configured.
+    """
+
+    with _configure_lock:
+        for package in packages or tuple(_CONFIGURE):
+            if package not in _configured:
+                _CONFIGURE[package]()
+                _configured.add(package)
@@ -0,0 +1,203 @@
+"""Country identifier conversions, resolved once per distinct value.
+
+`convert_id`, `add_short_names_column` and `add_iso_codes_column` take the same
+arguments and return the same values as their bblocks counterparts. They differ in
+how the work is done:
+
+- the country converter (slow to build) is created once and shared;
+- a column is factorized and only its distinct values are resolved. Results are
+  broadcast back to the rows through the integer codes;
+- every resolved value is remembered for the rest of the run. Values matched with
+  regular expressions (the slow part) are also stored in `raw_data/country_ids.csv`
+  by `save()`, so the next run does not match them again (the file is a local
+  cache, and is not committed).
+
+The stored table is ignored if it was written with another country_converter version.
+"""
+
+import os
+import threading
+from functools import cache
+
+import country_converter as coco
+import numpy as np
+import pandas as pd
+
+from scripts.config import PATHS
+from scripts.files import atomic_write
+from scripts.logger import logger
+
+# Conversions from these types are matched with regular expressions
+_REGEX_TYPES: tuple = ("regex", "auto")
+
+_lock = threading.RLock()
+_learned: dict[tuple[str, str], dict] = {}
+_stored: set = set()
+_loaded: bool = False
+_dirty: bool = False
+
+
+def _table_path() -> str:
+    return f"{PATHS.raw_data}/country_ids.csv"
+
+
+@cache
+def converter() -> coco.CountryConverter:
+    """The country converter shared by every module (loading its table is slow)"""
+    return coco.CountryConverter()
+
+
+def _load() -> None:
+    """Read the stored regex matches, once per run"""
+    global _loaded
+
+    if _loaded:
+        return
+    _loaded = True
+
+    path = _table_path()
+    if not os.path.exists(path):
+        return
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if df.empty or (df.coco_version != coco.__version__).any():
+        logger.debug("Ignored country_ids.csv (different country_converter version)")
+        return
+
+    for (from_type, to_type), group in df.groupby(["from_type", "to_type"]):
+        results = group.result.replace("", np.nan)
+        learned = _learned.setdefault((from_type, to_type), {})
+        learned.update(zip(group.value, results))
+        _stored.add((from_type, to_type))
+
+
+def _resolve(values: np.ndarray, from_type: str | None, to_type: str) -> list:
+    """Converted `values` (distinct, not missing), matching new ones with coco"""
+    global _dirty
+
+    key = ("auto" if from_type is None else from_type, to_type)
+
+    with _lock:
+        if key[0] in _REGEX_TYPES:
+            _load()
+
+        learned = _learned.setdefault(key, {})
+        new = [v for v in values if v not in learned]
+        # Built once, under the lock
+        country_converter = converter() if new else None
+
+    if new:
+        # Matching is the slow part: it runs outside the lock so that tasks on
+        # other threads keep resolving their own values meanwhile
+        converted = country_converter.convert(
+            names=new, src=from_type, to=to_type, not_found=np.nan
+        )
+        # coco returns a scalar, not a list, when given a single name
+        if len(new) == 1:
+            converted = [converted]
+
+        with _lock:
+            learned.update(zip(new, converted))
+
+            if key[0] in _REGEX_TYPES:
+                _stored.add(key)
+                _dirty = True
+
+    with _lock:
+        return [learned[v] for v in values]
+
+
+def convert_id(
+    series: pd.Series,
+    from_type: str | None = "regex",
+    to_type: str = "ISO3",
+    not_found: str | None = None,
+    *,
+    additional_mapping: dict | None = None,
+) -> pd.Series:
+    """Convert a series of country identifiers, like bblocks' `convert_id`.
+
+    Values which are not found are kept as they are, or replaced by `not_found` if
+    one is given. `additional_mapping` takes precedence over the converter.
+    """
+
+    if from_type == to_type:
+        return series
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+
+    converted = np.empty(len(uniques) + 1, dtype=object)
+    converted[:-1] = _resolve(uniques, from_type, to_type)
+    # Missing values get the code -1, which picks this last (empty) slot
+    converted[-1] = np.nan
+
+    if additional_mapping is not None:
+        for i, value in enumerate(uniques):
+            if value in additional_mapping:
+                converted[i] = additional_mapping[value]
+
+    result = pd.Series(converted[codes], index=series.index, name=series.name)
+
+    return result.fillna(series if not_found is None else not_found)
+
+
+def add_short_names_column(
+    df: pd.DataFrame,
+    id_column: str,
+    id_type: str | None = None,
+    target_column: str = "name_short",
+) -> pd.DataFrame:
+    """Add a column with the short names of the countries in `id_column`"""
+
+    if id_column not in df.columns:
+        raise ValueError(f"id_column '{id_column}' not in dataframe columns")
+
+    df[target_column] = convert_id(
+        df[id_column], from_type=id_type, to_type="short_name"
+    )
+
+    return df
+
+
+def add_iso_codes_column(
+    df: pd.DataFrame,
+    id_column: str,
+    id_type: str | None = None,
+    target_column: str = "iso_code",
+) -> pd.DataFrame:
+    """Add a column with the ISO3 codes of the countries in `id_column`"""
+
+    if id_column not in df.columns:
+        raise ValueError(f"id_column '{id_column}' not in dataframe columns")
+
+    df[target_column] = convert_id(df[id_column], from_type=id_type, to_type="ISO3")
+
+    return df
+
+
+def save() -> None:
+    """Store the regex matches learned during the run in `raw_data/country_ids.csv`"""
+    global _dirty
+
+    with _lock:
+        if not _dirty:
+            return
+
+        rows = [
+            (from_type, to_type, value, result)
+            for from_type, to_type in sorted(_stored)
+            for value, result in _learned[(from_type, to_type)].items()
+            # Only names and single matches (or NaN when not found) are stored
+            if isinstance(value, str) and isinstance(result, (str, float))
+        ]
+        df = pd.DataFrame(rows, columns=["from_type", "to_type", "value", "result"])
+        df = df.assign(
+            result=lambda d: d.result.fillna(""), coco_version=coco.__version__
+        ).sort_values(["from_type", "to_type", "value"])
+
+        with atomic_write(_table_path(), newline="") as file:
+            df.to_csv(file, index=False)
+
+        _dirty = False
+        logger.debug(f"Saved {len(df)} country identifiers to country_ids.csv")
@@ -1,21 +1,27 @@
 import pandas as pd
-from bblocks import set_bblocks_data_path, DebtIDS
-from bblocks.cleaning_tools.clean import convert_id, format_number
+from bblocks import DebtIDS
+from bblocks.cleaning_tools.clean import format_number
 from bblocks.dataframe_tools.add import (
     add_gov_exp_share_column,
     add_gov_expenditure_column,
-    add_iso_codes_column,
-    add_short_names_column,
 )
 
+from scripts.chart_sink import ChartSink
 from scripts.common import DEBT_YEAR, df_to_key_number, update_key_number
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import (
+    add_iso_codes_column,
+    add_short_names_column,
+    convert_id,
+)
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("country_page")
 
 
 def _update_debt_data() -> None:
+    configure_data_paths("bblocks")
+
     debt = DebtIDS()
 
     service = debt.debt_service_indicators()
@@ -29,6 +35,8 @@ def _update_debt_data() -> None:
 
 
 def _read_debt_service_total_data() -> pd.DataFrame:
+    configure_data_paths("bblocks")
+
     debt = DebtIDS()
 
     service = debt.debt_service_indicators()
@@ -65,6 +73,8 @@ def _clean_debt_data(df: pd.DataFrame) -> pd.DataFrame:
 def debt_chart_country() -> None:
     """Data for the Debt Service key number"""
 
+    configure_data_paths("bblocks")
+
     df = _read_debt_service_total_data()
     df = _clean_debt_data(df)
 
@@ -87,7 +97,7 @@ def debt_chart_country() -> None:
     )
 
     # Chart version
-    debt.to_csv(f"{PATHS.charts}/country_page/overview_debt_sm.csv", index=False)
+    SINK.write("overview_debt_sm.csv", debt, download=False)
     logger.debug("Saved live version of 'overview_debt_sm.csv'")
 
     # Key number version
@@ -111,6 +121,8 @@ def debt_chart_country() -> None:
 
 
 def debt_chart_region() -> None:
+    configure_data_paths("bblocks")
+
     df = _read_debt_service_total_data()
     df = _clean_debt_data(df)
 
@@ -144,7 +156,7 @@ def debt_chart_region() -> None:
     )
 
     # Chart version
-    debt.to_csv(f"{PATHS.charts}/country_page/overview_debt_sm_region.csv", index=False)
+    SINK.write("overview_debt_sm_region.csv", debt, download=False)
     logger.debug("Saved live version of 'overview_debt_sm_region.csv'")
 
     # Key number version
@@ -1,16 +1,17 @@
 import pandas as pd
 from bblocks.cleaning_tools.filter import filter_african_countries
-from bblocks.dataframe_tools.add import add_short_names_column, add_iso_codes_column
-from bblocks import set_bblocks_data_path, WorldEconomicOutlook, WFPData, WorldBankData
-from pydeflate import deflate, set_pydeflate_path
+from bblocks import WorldBankData
+from pydeflate import deflate
 
 from scripts import common
+from scripts.chart_sink import ChartSink
 from scripts.common import WEO_YEAR
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_iso_codes_column, add_short_names_column
+from scripts.importers import WFPSession, weo_data, wfp_session, world_bank_data
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
-set_pydeflate_path(PATHS.raw_data)
+SINK = ChartSink("country_page")
 
 
 # ------------------------------------------------------------------------------
@@ -18,17 +19,12 @@ set_pydeflate_path(PATHS.raw_data)
 # ------------------------------------------------------------------------------
 
 
-def _read_wfp() -> WFPData:
-    """Read all available WFP indicators"""
-    wfp = WFPData()
+def _read_wfp() -> WFPSession:
+    """WFP data shared by the charts. Indicators are parsed when first requested"""
+    return wfp_session()
 
-    for indicator in wfp.available_indicators:
-        wfp.load_data(indicator)
 
-    return wfp
-
-
-def _wfp_inflation(wfp: WFPData, indicator="Inflation Rate") -> pd.DataFrame:
+def _wfp_inflation(wfp: WFPSession, indicator="Inflation Rate") -> pd.DataFrame:
     """Read an inflation indicator from WFP and return a dataframe"""
 
     return (
@@ -55,7 +51,7 @@ def inflation_overview() -> None:
     inflation = _wfp_inflation(wfp)
 
     # Live chart version
-    inflation.to_csv(f"{PATHS.charts}/country_page/overview_inflation.csv", index=False)
+    SINK.write("overview_inflation.csv", inflation, download=False)
     logger.debug("Saved live version of 'overview_inflation.csv'")
 
 
@@ -74,26 +70,17 @@ def inflation_overview_regions() -> None:
 
     inflation = inflation.loc[lambda d: ~d.date.isin(incomplete.date)]
 
-    dfs = []
-
-    for region in common.regions():
-        _ = (
-            inflation.loc[lambda d: d.iso_code.isin(common.regions()[region])]
-            .groupby(["date"], as_index=False)
-            .value.median()
-            .assign(name_short=common.region_names()[region])
-            .assign(indicator_name="Inflation Rate (median)")
+    inflation = (
+        common.groupby_regions(inflation, {"value": "median"}, by="date")
+        .assign(
+            name_short=lambda d: d.region.map(common.region_names()),
+            indicator_name="Inflation Rate (median)",
         )
-        dfs.append(_)
-
-    inflation = pd.concat(dfs, ignore_index=True).filter(
-        ["name_short", "date", "indicator_name", "value"]
+        .filter(["name_short", "date", "indicator_name", "value"])
     )
 
     # Live chart version
-    inflation.to_csv(
-        f"{PATHS.charts}/country_page/overview_inflation_regions.csv", index=False
-    )
+    SINK.write("overview_inflation_regions.csv", inflation, download=False)
     logger.debug("Saved live version of 'overview_inflation_regions.csv'")
 
     # Dynamic text version
@@ -120,7 +107,6 @@ def inflation_ts_chart() -> None:
     """Create a line chart with an overview of inflation data"""
     source = "Price inflation data from the WFP VAM resource centre"
 
-    set_bblocks_data_path(PATHS.bblocks_data)
     wfp = _read_wfp()
 
     inflation = _wfp_inflation(wfp)
@@ -145,18 +131,10 @@ def inflation_ts_chart() -> None:
         .reset_index()
     )
 
-    # Live chart version
-    inflation.to_csv(
-        f"{PATHS.charts}/country_page/inflation_ts_by_country.csv", index=False
-    )
+    # Live chart and download versions
+    SINK.write("inflation_ts_by_country.csv", inflation, source=source)
     logger.debug("Saved live version of 'inflation_ts_by_country.csv'")
 
-    # Download version
-    inflation.assign(source=source).to_csv(
-        f"{PATHS.download}/country_page/inflation_ts_by_country.csv", index=False
-    )
-    logger.debug("Saved download version of 'inflation_ts_by_country.csv'")
-
     # Dynamic text version
     kn = (
         inflation.melt(id_vars="date")
@@ -196,12 +174,8 @@ def __weo_center(df: pd.DataFrame) -> pd.DataFrame:
 
 def _read_weo() -> pd.DataFrame:
     """Read the WEO data and return a dataframe with the last 10 years of data"""
-    weo = WorldEconomicOutlook(year=2025, release=1)
-
-    weo.load_data(indicator=list(WEO_INDICATORS))
-
     return (
-        weo.get_data(indicators="all", keep_metadata=True)
+        weo_data(list(WEO_INDICATORS), keep_metadata=True)
         .pipe(add_short_names_column, id_column="iso_code")
         .pipe(filter_african_countries, id_column="iso_code", id_type="ISO3")
         .loc[lambda d: d.year.dt.year.between(WEO_YEAR - 10, WEO_YEAR)]
@@ -254,9 +228,7 @@ def gdp_growth_single_measure() -> None:
     gdp_growth_chart = __single_weo_measure("NGDP_RPCH", comparison_year_difference=1)
 
     # chart version
-    gdp_growth_chart.to_csv(
-        f"{PATHS.charts}/country_page/overview_GDP_growth.csv", index=False
-    )
+    SINK.write("overview_GDP_growth.csv", gdp_growth_chart, download=False)
     logger.debug("Saved live version of 'overview_GDP_growth.csv'")
 
     # dynamic text version
@@ -280,27 +252,29 @@ def gdp_growth_regions_single_measure() -> None:
         add_iso_codes_column, id_column="name_short", id_type="name_short"
     )
 
-    dfs = []
-
-    for region in common.regions():
-        _ = (
-            gdp_growth.loc[lambda d: d.iso_code.isin(common.regions()[region])]
-            .groupby(["indicator_name", "lower"], as_index=False)
-            .median(numeric_only=True)
-            .assign(name_short=common.region_names()[region])
-            .assign(indicator_name=f"{WEO_YEAR} estimate (median)")
+    gdp_growth = (
+        common.groupby_regions(
+            gdp_growth, "median", by=["indicator_name", "lower"], numeric_only=True
+        )
+        .assign(
+            name_short=lambda d: d.region.map(common.region_names()),
+            indicator_name=f"{WEO_YEAR} estimate (median)",
+        )
+        .filter(
+            [
+                "name_short",
+                "indicator_name",
+                "value",
+                "lower",
+                "value_previous",
+                "center",
+            ],
+            axis=1,
         )
-        dfs.append(_)
-
-    gdp_growth = pd.concat(dfs, ignore_index=True).filter(
-        ["name_short", "indicator_name", "value", "lower", "value_previous", "center"],
-        axis=1,
     )
 
     # chart version
-    gdp_growth.to_csv(
-        f"{PATHS.charts}/country_page/overview_GDP_growth_regions.csv", index=False
-    )
+    SINK.write("overview_GDP_growth_regions.csv", gdp_growth, download=False)
     logger.debug("Saved live version of 'overview_GDP_growth_regions.csv'")
 
     kn = (
@@ -330,13 +304,10 @@ WB_INDICATORS = {
 
 
 def _read_wb_ts() -> dict:
-    wb = WorldBankData()
-    wb.load_data(list(WB_INDICATORS))
-
     dfs = {}
     for indicator in WB_INDICATORS:
         dfs[indicator] = (
-            wb.get_data(indicator)
+            world_bank_data(indicator)
             .loc[lambda d: d.iso_code.isin(common.get_full_africa_iso3())]
             .copy()
             .assign(iso_code=lambda d: d.iso_code.replace(common.region_names()))
@@ -357,13 +328,10 @@ def poverty_chart() -> None:
 
     source = "World Bank Open Data: SI.POV.DDAY"
 
-    wb = WorldBankData()
-    wb.load_data(list(WB_INDICATORS))
-
     cols = ["date", "iso_code", "value"]
 
-    poverty_ratio = wb.get_data("SI.POV.DDAY").filter(cols, axis=1)
-    population = wb.get_data("SP.POP.TOTL").filter(cols, axis=1)
+    poverty_ratio = world_bank_data("SI.POV.DDAY").filter(cols, axis=1)
+    population = world_bank_data("SP.POP.TOTL").filter(cols, axis=1)
 
     df = (
         poverty_ratio.merge(
@@ -403,7 +371,7 @@ def poverty_chart() -> None:
     data = pd.concat(dfs, ignore_index=True)
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/country_page/poverty_country_ts.csv", index=False)
+    SINK.write("poverty_country_ts.csv", data, download=False)
     logger.debug("Saved live version of 'poverty_country_ts.csv'")
 
     # download version
@@ -413,9 +381,7 @@ def poverty_chart() -> None:
         .pipe(add_iso_codes_column, id_column="country", id_type="regex")
         .filter(["iso_code", "country", "Year", "Indicator", "value", "source"], axis=1)
     )
-    data_download.to_csv(
-        f"{PATHS.download}/country_page/poverty_country_ts.csv", index=False
-    )
+    SINK.write("poverty_country_ts.csv", data_download, live=False)
     logger.debug("Saved download version of 'poverty_country_ts.csv'")
 
     # dynamic text version
@@ -469,31 +435,33 @@ def wb_poverty_single_measure() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/country_page/poverty_single_measure.csv", index=False)
+    SINK.write("poverty_single_measure.csv", data, download=False)
     logger.debug("Saved live version of 'poverty_single_measure.csv'")
 
 
 def _financial_weo() -> pd.DataFrame:
     indicators = ["GGX_NGDP"]
 
-    return WorldEconomicOutlook(year=2025, release=1).load_data(indicators).get_data()
+    return weo_data(indicators)
 
 
 def _financial_gdp_usd_current() -> pd.DataFrame:
     indicators = ["NGDPD"]
 
-    return WorldEconomicOutlook(year=2025, release=1).load_data(indicators).get_data()
+    return weo_data(indicators)
 
 
 def _financial_wb(update: bool = False) -> pd.DataFrame:
-    wb_indicators = ["DT.ODA.ODAT.CD", "BX.TRF.PWKR.CD.DT", "BX.KLT.DINV.CD.WD"]
+    configure_data_paths("bblocks")
 
-    wb = WorldBankData().load_data(wb_indicators)
+    wb_indicators = ["DT.ODA.ODAT.CD", "BX.TRF.PWKR.CD.DT", "BX.KLT.DINV.CD.WD"]
 
     if update:
-        wb.update_data(reload_data=True)
+        WorldBankData().load_data(wb_indicators).update_data(reload_data=False)
 
-    return wb.get_data().rename(columns={"indicator_code": "indicator", "date": "year"})
+    return world_bank_data(wb_indicators).rename(
+        columns={"indicator_code": "indicator", "date": "year"}
+    )
 
 
 def _financial_gdp_to_usd(df: pd.DataFrame) -> pd.DataFrame:
@@ -512,6 +480,8 @@ def _financial_gdp_to_usd(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def financial_overview() -> None:
+    configure_data_paths("pydeflate")
+
     indicators = {
         "GGX_NGDP": "Government Expenditure",
         "DT.ODA.ODAT.CD": "ODA",
@@ -556,15 +526,10 @@ def financial_overview() -> None:
     )
 
     # chart version
-    data.to_csv(
-        f"{PATHS.charts}/country_page/country_financial_overview.csv", index=False
-    )
+    SINK.write("country_financial_overview.csv", data, download=False)
 
     # download version
-    data.to_csv(
-        f"{PATHS.download}/country_page/country_financial_overview_download.csv",
-        index=False,
-    )
+    SINK.write("country_financial_overview_download.csv", data, live=False)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,17 @@
-from functools import reduce
-
 import pandas as pd
-from bblocks import set_bblocks_data_path
 from bblocks.analysis_tools.get import change_from_date
 from bblocks.cleaning_tools.clean import date_to_str
 from bblocks.cleaning_tools.filter import filter_african_countries
-from bblocks.dataframe_tools.add import (
-    add_iso_codes_column,
-    add_population_column,
-    add_short_names_column,
-)
+from bblocks.dataframe_tools.add import add_population_column
 from dateutil.relativedelta import relativedelta
 
 from scripts import common
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_iso_codes_column, add_short_names_column
 from scripts.country_page.financial_security import _read_wfp, _wfp_inflation
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("country_page")
 
 
 # ------------------------------------------------------------------------------
@@ -75,7 +70,7 @@ def wfp_insufficient_food_single_measure() -> None:
         .filter(["name_short", "date", "value", "lower", "change", "center"], axis=1)
     )
 
-    df.to_csv(f"{PATHS.charts}/country_page/overview_food_sm.csv", index=False)
+    SINK.write("overview_food_sm.csv", df, download=False)
 
     # dynamic version
     kn = (
@@ -96,32 +91,27 @@ def wfp_insufficient_food_single_measure() -> None:
 
     # ---- REGIONS
 
-    regions = []
-    for region in common.regions():
-        _ = (
-            df.pipe(add_iso_codes_column, id_column="name_short", id_type="name_short")
-            .loc[lambda d: d.iso_code.isin(common.regions()[region])]
-            .assign(previous=lambda d: d.value * (d.change + 1))
-            .groupby("lower", as_index=False)
-            .agg(
-                {
-                    "value": "sum",
-                    "previous": "sum",
-                    "change": "mean",
-                    "center": "median",
-                    "date": pd.Series.mode,
-                }
-            )
-            .assign(change=lambda d: d.value / d.previous - 1, name_short=region)
-            .drop("previous", axis=1)
-            .assign(name_short=lambda d: d.name_short.replace(common.region_names()))
-            .filter(
-                ["name_short", "date", "value", "lower", "change", "center"], axis=1
-            )
+    regions = (
+        df.pipe(add_iso_codes_column, id_column="name_short", id_type="name_short")
+        .assign(previous=lambda d: d.value * (d.change + 1))
+        .pipe(
+            common.groupby_regions,
+            {
+                "value": "sum",
+                "previous": "sum",
+                "change": "mean",
+                "center": "median",
+                "date": pd.Series.mode,
+            },
+            by="lower",
         )
-        regions.append(_)
-
-    regions = pd.concat(regions, ignore_index=True)
+        .assign(
+            change=lambda d: d.value / d.previous - 1,
+            name_short=lambda d: d.region.replace(common.region_names()),
+        )
+        .drop("previous", axis=1)
+        .filter(["name_short", "date", "value", "lower", "change", "center"], axis=1)
+    )
 
     if pd.api.types.is_array_like(
         regions.query("name_short == 'Africa'")["date"].values[0]
@@ -130,9 +120,7 @@ def wfp_insufficient_food_single_measure() -> None:
             lambda d: d.name_short == "Africa"
         ]["date"].values[0][0]
 
-    regions.to_csv(
-        f"{PATHS.charts}/country_page/overview_food_sm_region.csv", index=False
-    )
+    SINK.write("overview_food_sm_region.csv", regions, download=False)
 
     def _clean_data(row):
         try:
@@ -161,6 +149,8 @@ def wfp_insufficient_food_single_measure() -> None:
 
 
 def insufficient_food_chart() -> None:
+    configure_data_paths("bblocks")
+
     wfp = _read_wfp()
     source = "WFP HungerMapLive"
 
@@ -200,13 +190,14 @@ def insufficient_food_chart() -> None:
     ).reset_index()
 
     # Chart version
-    food_pivot.to_csv(
-        f"{PATHS.charts}/country_page/insufficient_food_ts.csv", index=False
-    )
+    SINK.write("insufficient_food_ts.csv", food_pivot, download=False)
 
     # Download_version
-    pd.concat([median, food], ignore_index=True).assign(source=source).to_csv(
-        f"{PATHS.download}/country_page/insufficient_food_ts.csv", index=False
+    SINK.write(
+        "insufficient_food_ts.csv",
+        pd.concat([median, food], ignore_index=True),
+        source=source,
+        live=False,
     )
 
 
@@ -243,46 +234,35 @@ def food_inflation_chart() -> None:
     )
 
     # Chart version
-    inflation_chart.to_csv(
-        f"{PATHS.charts}/country_page/food_inflation_ts.csv", index=False
-    )
+    SINK.write("food_inflation_ts.csv", inflation_chart, download=False)
 
     # Download version
-    pd.concat([median, inflation], ignore_index=True).assign(source=source).to_csv(
-        f"{PATHS.download}/country_page/food_inflation_ts.csv", index=False
+    SINK.write(
+        "food_inflation_ts.csv",
+        pd.concat([median, inflation], ignore_index=True),
+        source=source,
+        live=False,
     )
 
     # regions version
-    regions = []
-
-    for region in common.regions():
-        _ = (
-            inflation.copy()
-            .loc[lambda d: ~d.date.isin(incomplete.date)]
-            .pipe(add_iso_codes_column, id_column="name_short", id_type="name_short")
-            .loc[lambda d: d.iso_code.isin(common.regions()[region])]
-            .groupby(["date"], as_index=False)
-            .value.median()
-            .assign(name_short=common.region_names()[region])
-            .pivot(index="date", columns="name_short", values="value")
-            .round(2)
-            .reset_index()
-        )
-        regions.append(_)
-
-    regions_data = reduce(
-        lambda left, right: pd.merge(left, right, on=["date"], how="left"), regions
-    )
+    names = [common.region_names()[region] for region in common.regions()]
 
-    # Chart version
-    regions_data.to_csv(
-        f"{PATHS.charts}/country_page/food_inflation_ts_regions.csv", index=False
+    regions_data = (
+        inflation.loc[lambda d: ~d.date.isin(incomplete.date)]
+        .pipe(add_iso_codes_column, id_column="name_short", id_type="name_short")
+        .pipe(common.groupby_regions, {"value": "median"}, by="date")
+        .assign(name_short=lambda d: d.region.map(common.region_names()))
+        .pivot(index="date", columns="name_short", values="value")
+        .round(2)
+        # Regions in registry order (a region without data is an empty column), on
+        # the dates of the first one
+        .reindex(columns=names)
+        .dropna(subset=names[:1])
+        .reset_index()
     )
 
-    # Download version
-    regions_data.assign(source=source).to_csv(
-        f"{PATHS.download}/country_page/food_inflation_ts_regions.csv", index=False
-    )
+    # Chart and download versions
+    SINK.write("food_inflation_ts_regions.csv", regions_data, source=source)
 
 
 if __name__ == "__main__":
@@ -1,19 +1,23 @@
 import numpy as np
 import pandas as pd
-from bblocks import set_bblocks_data_path
-from bblocks.cleaning_tools.clean import convert_id, format_number
+from bblocks.cleaning_tools.clean import format_number
 from bblocks.cleaning_tools.filter import filter_african_countries, filter_latest_by
-from bblocks.dataframe_tools.add import add_iso_codes_column, add_short_names_column
-from bblocks.import_tools.world_bank import WorldBankData
 
 from scripts import common
+from scripts.chart_sink import ChartSink
 from scripts.common import CAUSES_OF_DEATH_YEAR
 from scripts.config import PATHS
+from scripts.country_ids import (
+    add_iso_codes_column,
+    add_short_names_column,
+    convert_id,
+)
 from scripts.country_page.food_security import _group_monthly_change
 from scripts.country_page.health_update import read_dpt_data
+from scripts.importers import world_bank_data
 from scripts.owid_covid import tools as ot
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("country_page")
 
 CAUSES_YEAR_COMPARISON = 2000
 
@@ -82,7 +86,7 @@ def vaccination_rate_single_measure() -> None:
     )
 
     # Chart version
-    vax.to_csv(f"{PATHS.charts}/country_page/{chart_name}.csv", index=False)
+    SINK.write(f"{chart_name}.csv", vax, download=False)
 
     # dynamic text version
     kn = (
@@ -177,13 +181,8 @@ def leading_causes_of_death_chart() -> None:
         .assign(missing=lambda d: np.where(d.Cause.isna(), True, False))
     )
 
-    # chart version
-    dfc.to_csv(f"{PATHS.charts}/country_page/leading_causes_of_death.csv", index=False)
-
-    # download version
-    dfc.assign(source=CAUSES_SOURCE).to_csv(
-        f"{PATHS.download}/country_page/leading_causes_of_death.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("leading_causes_of_death.csv", dfc, source=CAUSES_SOURCE)
 
 
 def leading_causes_of_death_column_chart() -> None:
@@ -219,15 +218,8 @@ def leading_causes_of_death_column_chart() -> None:
         }
     ).drop(["death_rate_missing", "deaths_missing"], axis=1)
 
-    # chart version
-    dfc.to_csv(
-        f"{PATHS.charts}/country_page/leading_causes_of_death_column.csv", index=False
-    )
-
-    # download version
-    dfc.assign(source=CAUSES_SOURCE).to_csv(
-        f"{PATHS.download}/country_page/leading_causes_of_death_column.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("leading_causes_of_death_column.csv", dfc, source=CAUSES_SOURCE)
 
 
 # ------------------------------------------------------------------------------
@@ -236,11 +228,8 @@ def leading_causes_of_death_column_chart() -> None:
 
 
 def _get_life_expectancy() -> pd.DataFrame:
-    wb = WorldBankData()
-    wb.load_data("SP.DYN.LE00.IN")
-
     return (
-        wb.get_data()
+        world_bank_data("SP.DYN.LE00.IN")
         .loc[lambda d: d.iso_code.isin(common.get_full_africa_iso3())]
         .copy()
         .replace({"SSA": "Sub-Saharan Africa", "WLD": "World"})
@@ -262,11 +251,8 @@ def life_expectancy_chart() -> None:
         .reset_index()
     )
 
-    # chart version
-    chart.to_csv(f"{PATHS.charts}/country_page/life_expectancy.csv", index=False)
-
-    # download version
-    chart.to_csv(f"{PATHS.download}/country_page/life_expectancy.csv", index=False)
+    # chart and download versions
+    SINK.write("life_expectancy.csv", chart)
 
     # dynamic version
     kn = (
@@ -341,12 +327,10 @@ def art_chart() -> None:
         index="year", columns="name_short", values="people_on_art"
     ).reset_index()
 
-    dfp.to_csv(f"{PATHS.charts}/country_page/people_on_art_ts.csv", index=False)
+    SINK.write("people_on_art_ts.csv", dfp, download=False)
 
     # download version
-    df.assign(source="UNAIDS").to_csv(
-        f"{PATHS.download}/country_page/people_on_art.csv", index=False
-    )
+    SINK.write("people_on_art.csv", df, source="UNAIDS", live=False)
 
 
 def _read_malaria_data() -> pd.DataFrame:
@@ -354,10 +338,8 @@ def _read_malaria_data() -> pd.DataFrame:
 
 
 def malaria_chart() -> None:
-    wb = WorldBankData()
-    wb.load_data("SP.POP.TOTL")
     population = (
-        wb.get_data()
+        world_bank_data("SP.POP.TOTL")
         .drop("indicator_code", axis=1)
         .rename(columns={"value": "population"})
     )
@@ -398,13 +380,8 @@ def malaria_chart() -> None:
         )
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/country_page/malaria_deaths.csv", index=False)
-
-    # download version
-    df.assign(source="WHO").to_csv(
-        f"{PATHS.download}/country_page/malaria_deaths.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("malaria_deaths.csv", df, source="WHO")
 
 
 def dpt_chart() -> None:
@@ -456,11 +433,14 @@ def dpt_chart() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/country_page/dpt_ts.csv", index=False)
+    SINK.write("dpt_ts.csv", data, download=False)
 
     # download version
-    pd.concat([regions, countries], ignore_index=True).assign(source="WHO").to_csv(
-        f"{PATHS.download}/country_page/dpt_ts.csv", index=False
+    SINK.write(
+        "dpt_ts.csv",
+        pd.concat([regions, countries], ignore_index=True),
+        source="WHO",
+        live=False,
     )
 
 
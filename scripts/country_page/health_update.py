@@ -1,46 +1,199 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+
 import pandas as pd
 import requests
 from bblocks.cleaning_tools.clean import clean_numeric_series
 
 from scripts.config import PATHS
+from scripts.files import atomic_write
+from scripts.health.common import query_who
+from scripts.logger import logger
+from scripts.odata import ODataQuery, all_of, eq, is_in, page_skips
 
 
-def get_ghe_url(country_code, year):
-    """Get a WHO_API_URL to the GHE API for a given country and year"""
-    return (
-        "https://frontdoor-l4uikgap6gz3m.azurefd.net/"
-        "DEX_CMS/GHE_FULL?&$orderby=VAL_DEATHS_RATE100K_NUMERIC"
-        "%20desc&$select=DIM_COUNTRY_CODE,"
-        "DIM_GHECAUSE_TITLE,DIM_YEAR_CODE,"
-        "FLAG_CAUSEGROUP,"
-        "VAL_DEATHS_COUNT_NUMERIC,"
-        "ATTR_POPULATION_NUMERIC,"
-        "VAL_DEATHS_RATE100K_NUMERIC&"
-        "$filter=FLAG_RANKABLE%20eq%201%20and%20DIM_COUNTRY_CODE"
-        f"%20eq%20%27{country_code}%27%20and%20DIM_SEX_CODE%20eq%20%27BTSX%27%20"
-        "and%20DIM_AGEGROUP_CODE%20eq%20%27ALLAges%27%20and%20"
-        f"DIM_YEAR_CODE%20eq%20%27{year}%27"
+GHE_URL: str = "https://frontdoor-l4uikgap6gz3m.azurefd.net/DEX_CMS/GHE_FULL"
+
+# Columns of the leading causes of death file, and the GHE fields they come from
+GHE_FIELDS: dict[str, str] = {
+    "cause": "DIM_GHECAUSE_TITLE",
+    "cause_group": "FLAG_CAUSEGROUP",
+    "deaths": "VAL_DEATHS_COUNT_NUMERIC",
+    "population": "ATTR_POPULATION_NUMERIC",
+    "death_rate": "VAL_DEATHS_RATE100K_NUMERIC",
+}
+
+# Requests per second sent to the GHE API, and records per request
+GHE_REQUESTS_PER_SECOND: float = 1.0
+GHE_PAGE_SIZE: int = 1_000
+
+
+def ghe_query(countries: list[str], year: int) -> ODataQuery:
+    """The rankable causes of death of `countries` in `year` (both sexes, all ages),
+    by country and from the highest death rate"""
+
+    return ODataQuery(
+        url=GHE_URL,
+        filter=all_of(
+            eq("FLAG_RANKABLE", 1),
+            is_in("DIM_COUNTRY_CODE", countries),
+            eq("DIM_SEX_CODE", "BTSX"),
+            eq("DIM_AGEGROUP_CODE", "ALLAges"),
+            eq("DIM_YEAR_CODE", str(year)),
+        ),
+        select=("DIM_COUNTRY_CODE", "DIM_YEAR_CODE", *GHE_FIELDS.values()),
+        orderby=(
+            "DIM_COUNTRY_CODE",
+            "VAL_DEATHS_RATE100K_NUMERIC desc",
+            "DIM_GHECAUSE_TITLE",
+        ),
     )
 
 
-def unpack_ghe_country(country: str, country_data: list, year: int) -> pd.DataFrame:
-    df = pd.DataFrame()
+def ghe_frame(country_data: dict[str, list], year: int) -> pd.DataFrame:
+    """Leading causes of death from the GHE records of each country, built column by
+    column"""
 
-    for y in country_data:
-        d = pd.DataFrame(
-            {
-                "iso_code": [country],
-                "year": [year],
-                "cause": [y["DIM_GHECAUSE_TITLE"]],
-                "cause_group": [y["FLAG_CAUSEGROUP"]],
-                "deaths": [y["VAL_DEATHS_COUNT_NUMERIC"]],
-                "population": [y["ATTR_POPULATION_NUMERIC"]],
-                "death_rate": [y["VAL_DEATHS_RATE100K_NUMERIC"]],
-            }
+    records = [record for data in country_data.values() for record in data]
+
+    return pd.DataFrame(
+        {
+            "iso_code": [c for c, data in country_data.items() for _ in data],
+            "year": [year] * len(records),
+            **{
+                column: [record[field] for record in records]
+                for column, field in GHE_FIELDS.items()
+            },
+        }
+    )
+
+
+class TokenBucket:
+    """Lets through `rate` requests per second, in bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request can be sent"""
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _ghe_checkpoints(year: int) -> str:
+    return f"{PATHS.raw_data}/health/.ghe_{year}"
+
+
+async def _download_ghe_page(
+    query: ODataQuery, skip: int, folder: str, bucket: TokenBucket
+) -> dict | None:
+    """A page of GHE records, from its checkpoint if it was already downloaded. The
+    first page also has the number of records."""
+
+    path = f"{folder}/{skip}.json"
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            return json.load(file)
+
+    await bucket.acquire()
+    url = query.page_url(top=GHE_PAGE_SIZE, skip=skip, count=skip == 0)
+    response = await asyncio.to_thread(requests.get, url, timeout=60)
+
+    try:
+        page = response.json()
+    except requests.exceptions.JSONDecodeError:
+        page = {}
+
+    if "value" not in page:
+        logger.info(f"Error downloading GHE records from {skip}")
+        return None
+
+    with atomic_write(path) as file:
+        json.dump(page, file)
+
+    return page
+
+
+async def _download_ghe(
+    countries: list[str], year: int, requests_per_second: float
+) -> list[dict]:
+    query = ghe_query(countries, year)
+    # Checkpoints only resume the same query
+    digest = hashlib.sha256(query.page_url().encode()).hexdigest()[:16]
+    folder = f"{_ghe_checkpoints(year)}/{digest}"
+    bucket = TokenBucket(requests_per_second)
+
+    first = await _download_ghe_page(query, 0, folder, bucket)
+    pages = [first]
+    count = None if first is None else first.get("@odata.count")
+
+    if first is not None and count is None:
+        # Without a count, read the pages one after the other until a short one
+        page, skip = first, 0
+        while page is not None and len(page["value"]) == GHE_PAGE_SIZE:
+            skip += GHE_PAGE_SIZE
+            page = await _download_ghe_page(query, skip, folder, bucket)
+            pages.append(page)
+    elif first is not None:
+        skips = page_skips(count, len(first["value"]), GHE_PAGE_SIZE)
+        pages += await asyncio.gather(
+            *(_download_ghe_page(query, skip, folder, bucket) for skip in skips)
         )
-        df = pd.concat([df, d], ignore_index=True)
 
-    return df
+    # A missing page would leave some countries with part of their causes
+    if any(page is None for page in pages):
+        raise ConnectionError("Could not download all the GHE records, run again")
+
+    return [record for page in pages for record in page["value"]]
+
+
+def download_ghe(
+    countries: list[str],
+    year: int,
+    requests_per_second: float = GHE_REQUESTS_PER_SECOND,
+) -> pd.DataFrame:
+    """Leading causes of death of `countries` in `year`, from the WHO GHE API.
+
+    A single query covers all the countries. Its pages are requested concurrently,
+    at most `requests_per_second`, and each page is saved as a checkpoint as soon as
+    it arrives: if a page cannot be downloaded, a `ConnectionError` is raised and the
+    next run resumes with the pages it is missing. Call `clear_ghe_checkpoints` once
+    the data is saved.
+    """
+
+    records = asyncio.run(_download_ghe(countries, year, requests_per_second))
+
+    by_country: dict[str, list] = {}
+    for record in records:
+        by_country.setdefault(record["DIM_COUNTRY_CODE"], []).append(record)
+
+    return ghe_frame(
+        {c: by_country[c] for c in dict.fromkeys(countries) if c in by_country}, year
+    )
+
+
+def clear_ghe_checkpoints(year: int) -> None:
+    shutil.rmtree(_ghe_checkpoints(year), ignore_errors=True)
 
 
 def clean_hiv(df_hiv: pd.DataFrame) -> pd.DataFrame:
@@ -120,30 +273,24 @@ def clean_art(df_art: pd.DataFrame) -> pd.DataFrame:
     ).reset_index()
 
 
-def get_url_malaria(indicator: str):
-    return f"https://ghoapi.azureedge.net/api/{indicator}"
-
-
 def unpack_malaria(indicator: str) -> pd.DataFrame:
-    url = get_url_malaria(indicator)
-
-    df = pd.DataFrame()
-
-    data = requests.get(url).json()["value"]
+    """Estimates of a WHO malaria indicator (countries, regions and world)"""
 
-    for point in data:
-        _ = pd.DataFrame(
-            {
-                "iso_code": [point["SpatialDim"]],
-                "year": [point["TimeDim"]],
-                "value": [point["NumericValue"]],
+    return (
+        query_who(indicator, fields=["SpatialDim", "TimeDim", "NumericValue"])
+        .rename(
+            columns={
+                "SpatialDim": "iso_code",
+                "TimeDim": "year",
+                "NumericValue": "value",
             }
         )
-        df = pd.concat([df, _], ignore_index=True).assign(indicator=indicator)
+        .assign(indicator=indicator)
+    )
+
 
-    return df
+DPT_FILE: str = "Diphtheria Tetanus Toxoid and Pertussis (DTP) vaccination coverage.xlsx"
 
 
 def read_dpt_data() -> pd.DataFrame:
-    file = "Diphtheria Tetanus Toxoid and Pertussis (DTP) vaccination coverage.xlsx"
-    return pd.read_excel(f"{PATHS.raw_data}/health/{file}", sheet_name=0)
+    return pd.read_excel(f"{PATHS.raw_data}/health/{DPT_FILE}", sheet_name=0)
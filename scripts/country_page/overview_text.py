@@ -1,54 +1,42 @@
-import json
-
 import pandas as pd
-from bblocks import convert_id
-from bblocks.dataframe_tools.add import add_short_names_column
 
 from scripts.common import update_key_number, base_africa_df
 from scripts.config import PATHS
+from scripts.country_ids import add_short_names_column
+from scripts.key_numbers import key_number_store, summary_projection, to_document
 
 
-def read_dictionary() -> dict:
-    path = f"{PATHS.charts}/country_page/overview.json"
-
-    with open(path, "r") as f:
-        t = json.load(f)
-
-    return t
-
+def _country_ids() -> pd.Series:
+    """ISO3 codes of the African countries, indexed by short name"""
 
-def build_summary() -> None:
-    df = (
+    return (
         base_africa_df()
         .pipe(add_short_names_column, id_column="iso_code", id_type="ISO3")
         .set_index("name_short")["iso_code"]
-        .to_dict()
     )
 
-    data = read_dictionary()
-
-    for indicator, country_data in data.items():
-        for country in df:
-            if country not in country_data.keys():
-                try:
-                    data[indicator][df.get(country, None)] = data[indicator][country]
-                except KeyError:
-                    data[indicator][df.get(country, None)] = {"info": "display-none"}
-                try:
-                    del data[indicator][country]
-                except KeyError:
-                    pass
-            else:
-                data[indicator][df.get(country, None)] = data[indicator][country]
-                data[indicator][df.get(country, None)]["info"] = ""
-                try:
-                    del data[indicator][country]
-                except KeyError:
-                    pass
-
-    update_key_number(
-        path=f"{PATHS.charts}/country_page/overview_summary.json", new_dict=data
-    )
+
+def build_summary() -> None:
+    """Key numbers from overview.json keyed by ISO3 code, with a 'display-none'
+    entry for the countries without data.
+
+    During a task run only the indicators updated in the run (and those missing
+    from the summary) are projected again.
+    """
+
+    store = key_number_store()
+    overview = f"{PATHS.charts}/country_page/overview.json"
+    summary = f"{PATHS.charts}/country_page/overview_summary.json"
+
+    table = store.table(overview)
+
+    if indicators := store.updated(overview):
+        indicators |= set(table.indicator) - set(store.read(summary))
+        table = table.loc[lambda d: d.indicator.isin(indicators)]
+
+    data = to_document(summary_projection(table, _country_ids()))
+
+    update_key_number(path=summary, new_dict=data)
 
 
 if __name__ == "__main__":
@@ -1,47 +1,27 @@
-import time
-
-import pandas as pd
-import requests
-from bblocks import WFPData, WorldBankData, WorldEconomicOutlook, set_bblocks_data_path
-
-from scripts.common import CAUSES_OF_DEATH_YEAR
-from scripts.config import PATHS
-from scripts.country_page import (
-    financial_security,
-    food_security,
-    health,
-    health_update as hu,
-)
-from scripts.country_page.debt import debt_chart_country, debt_chart_region
-from scripts.country_page.overview_text import build_summary
-from scripts.country_page.world_bank import wb_support_chart
-from scripts.explorers.common import base_africa_map
-from scripts.logger import logger
+"""Task lists for the country page.
+
+The chart and data modules are imported when the task lists are built, so importing
+this module stays cheap.
+"""
 
-set_bblocks_data_path(PATHS.bblocks_data)
+from functools import partial
+
+from scripts.config import PATHS, configure_data_paths
+from scripts.logger import logger
+from scripts.tasks import Task, WEO_RAW, WFP_RAW, run_tasks, wb_cache
 
 
 def update_monthly_leading_causes_of_death() -> None:
-    def __download_country(country_code: str) -> None:
-        d = requests.get(hu.get_ghe_url(country_code, request_year)).json()["value"]
-        dfs.append(hu.unpack_ghe_country(country_code, d, request_year))
-        time.sleep(5)
+    from scripts.common import CAUSES_OF_DEATH_YEAR
+    from scripts.country_page import health_update as hu
+    from scripts.explorers.common import base_africa_map
 
     # Define year for data update
     request_year = CAUSES_OF_DEATH_YEAR
 
-    dfs = []
-    africa = base_africa_map().iso_code.to_list()
-
-    for country in africa:
-        try:
-            __download_country(country_code=country)
-        except requests.exceptions.JSONDecodeError:
-            logger.info(f"Error downloading data for {country}")
-            continue
-    try:
-        df = pd.concat(dfs, ignore_index=True)
-    except ValueError:
+    df = hu.download_ghe(base_africa_map().iso_code.to_list(), request_year)
+
+    if df.empty:
         logger.info("No data was downloaded")
         return
 
@@ -49,9 +29,14 @@ def update_monthly_leading_causes_of_death() -> None:
         f"{PATHS.raw_data}/health/leading_causes_of_death_{request_year}.csv",
         index=False,
     )
+    hu.clear_ghe_checkpoints(request_year)
 
 
 def update_monthly_hiv_data() -> None:
+    import pandas as pd
+
+    from scripts.country_page import health_update as hu
+
     url = (
         "http://www.unaids.org/sites/default/files/media_asset/"
         "HIV_estimates_from_1990-to-present.xlsx"
@@ -69,6 +54,10 @@ def update_monthly_hiv_data() -> None:
 
 
 def update_monthly_malaria_data() -> None:
+    import pandas as pd
+
+    from scripts.country_page import health_update as hu
+
     indicator = "MALARIA_EST_DEATHS"
     indicator2 = "MALARIA_EST_MORTALITY"
 
@@ -81,6 +70,12 @@ def update_monthly_malaria_data() -> None:
 
 
 def update_daily_wfp_data() -> None:
+    from bblocks import WFPData
+
+    from scripts.importers import wfp_session
+
+    configure_data_paths("bblocks")
+
     # Create a wfp object
     wfp = WFPData()
 
@@ -90,8 +85,17 @@ def update_daily_wfp_data() -> None:
     # Update data
     wfp.update_data()
 
+    # The charts should read the new files
+    wfp_session().clear("insufficient_food")
+
 
 def update_weekly_wfp_data() -> None:
+    from bblocks import WFPData
+
+    from scripts.importers import wfp_session
+
+    configure_data_paths("bblocks")
+
     # Create a wfp object
     wfp = WFPData()
 
@@ -101,9 +105,15 @@ def update_weekly_wfp_data() -> None:
     # Update data
     wfp.update_data()
 
+    # The charts should read the new files
+    wfp_session().clear("inflation")
+
 
 def update_monthly_weo_data() -> None:
     """Update the WEO data. Monthly schedule though it updates twice a year"""
+    from bblocks import WorldEconomicOutlook
+
+    configure_data_paths("bblocks")
 
     # create object
     weo = WorldEconomicOutlook(year=2025, release=1)
@@ -116,6 +126,12 @@ def update_monthly_wb_data() -> None:
     """Update the World Bank data. Monthly schedule"""
     import time
 
+    from bblocks import WorldBankData
+
+    from scripts.country_page import financial_security
+
+    configure_data_paths("bblocks")
+
     # create object
     wb = WorldBankData()
 
@@ -134,77 +150,236 @@ def update_monthly_wb_data() -> None:
     wb_recent.update_data(reload_data=False)
 
 
-def update_daily() -> None:
-    """Update all data that is updated daily"""
-
-    # Update underlying data
-    update_daily_wfp_data()
-    logger.info("Updated WFP data (insufficient food)")
-
-    # Update related charts
-    food_security.wfp_insufficient_food_single_measure()
-    food_security.insufficient_food_chart()
-    logger.info("Updated WFP insufficient food charts")
-
-    # Update charts for which underlying data is updated elsewhere
-    health.vaccination_rate_single_measure()
-    logger.info("Updated vaccination rate chart")
+# Charts and data files used by the task definitions below
+CHARTS: str = f"{PATHS.charts}/country_page"
+DOWNLOAD: str = f"{PATHS.download}/country_page"
+HEALTH_RAW: str = f"{PATHS.raw_data}/health"
+IDS_RAW: str = f"{PATHS.bblocks_data}/ids_data"
+
+
+def daily_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated daily"""
+    from scripts.country_page import food_security, health
+    from scripts.country_page.overview_text import build_summary
+
+    return [
+        # Underlying data
+        Task(update_daily_wfp_data, outputs=[WFP_RAW]),
+        # Related charts
+        Task(
+            food_security.wfp_insufficient_food_single_measure,
+            inputs=[WFP_RAW],
+            outputs=[
+                f"{CHARTS}/overview_food_sm.csv",
+                f"{CHARTS}/overview_food_sm_region.csv",
+                f"{CHARTS}/overview.json",
+                f"{CHARTS}/region_overview.json",
+            ],
+        ),
+        Task(
+            food_security.insufficient_food_chart,
+            inputs=[WFP_RAW, *wb_cache(["SP.POP.TOTL"], most_recent_only=True)],
+            outputs=[
+                f"{CHARTS}/insufficient_food_ts.csv",
+                f"{DOWNLOAD}/insufficient_food_ts.csv",
+            ],
+        ),
+        # Charts for which underlying data is updated elsewhere
+        Task(
+            health.vaccination_rate_single_measure,
+            inputs=[f"{PATHS.raw_data}/owid_data.feather"],
+            outputs=[
+                f"{CHARTS}/overview_pct_fully_vaccinated_single_measure.csv",
+                f"{CHARTS}/overview.json",
+            ],
+        ),
+        *_inflation_chart_tasks(),
+        # Live text
+        Task(
+            build_summary,
+            inputs=[f"{CHARTS}/overview.json"],
+            outputs=[f"{CHARTS}/overview_summary.json"],
+        ),
+    ]
+
+
+def weekly_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated weekly"""
+    from scripts.country_page import financial_security
+    from scripts.country_page.world_bank import wb_support_chart
+
+    return [
+        Task(update_weekly_wfp_data, outputs=[WFP_RAW]),
+        # Related charts
+        Task(
+            financial_security.inflation_overview,
+            inputs=[WFP_RAW],
+            outputs=[f"{CHARTS}/overview_inflation.csv"],
+        ),
+        Task(
+            financial_security.inflation_overview_regions,
+            inputs=[WFP_RAW],
+            outputs=[
+                f"{CHARTS}/overview_inflation_regions.csv",
+                f"{CHARTS}/region_overview.json",
+            ],
+        ),
+        *_inflation_chart_tasks(),
+        # World Bank support
+        Task(
+            partial(wb_support_chart, download=True),
+            outputs=[
+                f"{PATHS.raw_data}/ida_full_historical_data.feather",
+                f"{PATHS.raw_data}/ibrd_full_historical_data.feather",
+                f"{CHARTS}/c06_wb_support_ts.csv",
+            ],
+            name="country_page.world_bank.wb_support_chart",
+        ),
+    ]
+
+
+def _inflation_chart_tasks() -> list[Task]:
+    from scripts.country_page import financial_security, food_security
+
+    return [
+        Task(
+            financial_security.inflation_ts_chart,
+            inputs=[WFP_RAW],
+            outputs=[
+                f"{CHARTS}/inflation_ts_by_country.csv",
+                f"{DOWNLOAD}/inflation_ts_by_country.csv",
+                f"{CHARTS}/overview.json",
+            ],
+        ),
+        Task(
+            food_security.food_inflation_chart,
+            inputs=[WFP_RAW],
+            outputs=[
+                f"{CHARTS}/food_inflation_ts.csv",
+                f"{DOWNLOAD}/food_inflation_ts.csv",
+                f"{CHARTS}/food_inflation_ts_regions.csv",
+                f"{DOWNLOAD}/food_inflation_ts_regions.csv",
+            ],
+        ),
+    ]
+
+
+def monthly_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated monthly"""
+    from scripts.common import CAUSES_OF_DEATH_YEAR
+    from scripts.country_page import financial_security, health
+    from scripts.country_page import health_update as hu
+    from scripts.country_page.debt import debt_chart_country, debt_chart_region
+
+    wb_files = wb_cache(financial_security.WB_INDICATORS) + wb_cache(
+        financial_security.WB_INDICATORS, most_recent_only=True
+    )
+    causes_of_death = [
+        f"{HEALTH_RAW}/leading_causes_of_death_{year}.csv"
+        for year in (CAUSES_OF_DEATH_YEAR, health.CAUSES_YEAR_COMPARISON)
+    ]
+
+    return [
+        # ------- update underlying data-----------
+        # Financial
+        Task(update_monthly_weo_data, outputs=[WEO_RAW]),
+        Task(update_monthly_wb_data, outputs=wb_files),
+        # Health
+        # update_monthly_leading_causes_of_death  # WHO API not returning data
+        Task(
+            update_monthly_hiv_data,
+            outputs=[
+                f"{HEALTH_RAW}/hiv_estimates.csv",
+                f"{HEALTH_RAW}/art_estimates.csv",
+            ],
+        ),
+        Task(update_monthly_malaria_data, outputs=[f"{HEALTH_RAW}/malaria_deaths.csv"]),
+        # ------- update related charts-----------
+        # Financial security
+        Task(
+            financial_security.poverty_chart,
+            inputs=wb_files,
+            outputs=[
+                f"{CHARTS}/poverty_country_ts.csv",
+                f"{DOWNLOAD}/poverty_country_ts.csv",
+                f"{CHARTS}/overview.json",
+            ],
+        ),
+        Task(
+            financial_security.wb_poverty_single_measure,
+            inputs=wb_files,
+            outputs=[f"{CHARTS}/poverty_single_measure.csv"],
+        ),
+        Task(
+            debt_chart_country,
+            inputs=[IDS_RAW, WEO_RAW],
+            outputs=[f"{CHARTS}/overview_debt_sm.csv", f"{CHARTS}/overview.json"],
+        ),
+        Task(
+            debt_chart_region,
+            inputs=[IDS_RAW, WEO_RAW],
+            outputs=[
+                f"{CHARTS}/overview_debt_sm_region.csv",
+                f"{CHARTS}/overview.json",
+            ],
+        ),
+        # Health
+        Task(
+            health.leading_causes_of_death_chart,
+            inputs=causes_of_death,
+            outputs=[
+                f"{CHARTS}/leading_causes_of_death.csv",
+                f"{DOWNLOAD}/leading_causes_of_death.csv",
+            ],
+        ),
+        Task(
+            health.leading_causes_of_death_column_chart,
+            inputs=causes_of_death,
+            outputs=[
+                f"{CHARTS}/leading_causes_of_death_column.csv",
+                f"{DOWNLOAD}/leading_causes_of_death_column.csv",
+            ],
+        ),
+        Task(
+            health.life_expectancy_chart,
+            inputs=wb_cache(["SP.DYN.LE00.IN"]),
+            outputs=[
+                f"{CHARTS}/life_expectancy.csv",
+                f"{DOWNLOAD}/life_expectancy.csv",
+                f"{CHARTS}/health.json",
+            ],
+        ),
+        Task(
+            health.art_chart,
+            inputs=[f"{HEALTH_RAW}/art_estimates.csv"],
+            outputs=[f"{CHARTS}/people_on_art_ts.csv", f"{DOWNLOAD}/people_on_art.csv"],
+        ),
+        Task(
+            health.malaria_chart,
+            inputs=[f"{HEALTH_RAW}/malaria_deaths.csv", *wb_cache(["SP.POP.TOTL"])],
+            outputs=[f"{CHARTS}/malaria_deaths.csv", f"{DOWNLOAD}/malaria_deaths.csv"],
+        ),
+        Task(
+            health.dpt_chart,
+            inputs=[f"{HEALTH_RAW}/{hu.DPT_FILE}"],
+            outputs=[f"{CHARTS}/dpt_ts.csv", f"{DOWNLOAD}/dpt_ts.csv"],
+        ),
+    ]
 
-    financial_security.inflation_ts_chart()
-    food_security.food_inflation_chart()
 
-    # Update live text
-    build_summary()
-    logger.info("Updated overview text (summary) json")
+def update_daily() -> None:
+    """Update all data that is updated daily"""
+    run_tasks(daily_tasks())
 
 
 def update_weekly() -> None:
     """Update all data that is updated weekly"""
-    update_weekly_wfp_data()
-
-    # Update related charts
-    financial_security.inflation_overview()
-    financial_security.inflation_overview_regions()
-
-    financial_security.inflation_ts_chart()
-    food_security.food_inflation_chart()
-
-    # world bank support
-    wb_support_chart(download=True)
+    run_tasks(weekly_tasks())
 
 
 def update_monthly() -> None:
     """Update all data that is updated monthly"""
-
-    # ------- update underlying data-----------
-
-    # Financial
-    update_monthly_weo_data()
-    update_monthly_wb_data()
-    # update_monthly_debt_data()
-
-    # Health
-    # update_monthly_leading_causes_of_death()  # Commented out - WHO API not returning data
-    update_monthly_hiv_data()
-    update_monthly_malaria_data()
-
-    # ------- update related charts-----------
-
-    # Financial security
-    # financial_security.gdp_growth_single_measure()
-    # financial_security.gdp_growth_regions_single_measure()
-    financial_security.poverty_chart()
-    financial_security.wb_poverty_single_measure()
-    debt_chart_country()
-    debt_chart_region()
-
-    # Health
-    health.leading_causes_of_death_chart()
-    health.leading_causes_of_death_column_chart()
-    health.life_expectancy_chart()
-    health.art_chart()
-    health.malaria_chart()
-    health.dpt_chart()
+    run_tasks(monthly_tasks())
 
 
 if __name__ == "__main__":
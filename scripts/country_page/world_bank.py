@@ -1,14 +1,14 @@
 import pandas as pd
 import requests
-from bblocks import (
-    add_iso_codes_column,
-    add_short_names_column,
-    filter_african_countries,
-)
+from bblocks import filter_african_countries
 
 from scripts import config
+from scripts.chart_sink import ChartSink
+from scripts.country_ids import add_iso_codes_column, add_short_names_column
 from urllib.parse import urlencode, quote
 
+SINK = ChartSink("country_page")
+
 
 def api_query(
     base_url: str,
@@ -303,7 +303,7 @@ def wb_support_chart(download: bool = False) -> None:
     )
 
     # Export
-    df.to_csv(config.PATHS.charts + r"/country_page/c06_wb_support_ts.csv", index=False)
+    SINK.write("c06_wb_support_ts.csv", df, download=False)
 
 
 if __name__ == "__main__":
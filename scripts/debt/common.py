@@ -1,15 +1,19 @@
+import heapq
+import random
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 import pandas as pd
 import requests
-from bblocks import WorldBankData, add_iso_codes_column, set_bblocks_data_path
-from pyjstat import pyjstat
+from bblocks import WorldBankData
 import bblocks_data_importers as bbdata
 
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_iso_codes_column
+from scripts.importers import world_bank_data
+from scripts.jsonstat import read_dataset
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
 
 DEBT_SERVICE = {
     "DT.AMT.BLAT.CD": "Bilateral",
@@ -39,6 +43,8 @@ WORLD_BANK_INDICATORS = {
 
 
 def update_debt_world_bank() -> None:
+    configure_data_paths("bblocks")
+
     wb = WorldBankData()
     wb.load_data(indicator=list(WORLD_BANK_INDICATORS))
 
@@ -96,6 +102,106 @@ def _api_url(
     )
 
 
+def ids_release_date(source: int = 6) -> str | None:
+    """Date of the last IDS release ("2024-12-03"), None if it cannot be checked"""
+
+    try:
+        response = requests.get(
+            f"http://api.worldbank.org/v2/sources/{source}?format=json", timeout=30
+        )
+        response.raise_for_status()
+        return response.json()[1][0]["lastupdated"]
+    except (requests.RequestException, ValueError, LookupError, TypeError) as error:
+        logger.info(f"Could not check the IDS release date ({error})")
+        return None
+
+
+def _read_indicator(
+    indicator: str, countries: str | list, start_year: int, end_year: int, source: int
+) -> pd.DataFrame:
+    """Data for one indicator. Raises if the request fails"""
+
+    url = _api_url(indicator, countries, start_year, end_year, source)
+    response = requests.get(url, headers={"Accept": "application/json"}, timeout=120)
+    response.raise_for_status()
+
+    # Only the non-empty cells of the JSON-stat cube are decoded
+    data = read_dataset(response.json())
+    logger.debug(f"Got data for {indicator}")
+
+    return data.assign(series_code=indicator)
+
+
+def _retry_delay(attempt: int, backoff: float) -> float:
+    """Seconds before the next attempt: exponential, with jitter"""
+    return backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+def fetch_indicators(
+    indicators: list[str],
+    countries: str | list = "all",
+    start_year: int = 2017,
+    end_year: int = 2025,
+    source: int = 6,
+    max_workers: int = 4,
+    retries: int = 2,
+    backoff: float = 60,
+) -> pd.DataFrame:
+    """Data for several indicators, requested in parallel.
+
+    At most `max_workers` requests run at the same time. A request that fails is
+    queued again after a delay (`backoff` seconds, doubled at every attempt, with
+    jitter) while the other indicators keep being fetched. Indicators which still
+    fail after `retries` retries are left out, with a warning.
+
+    Returns the data of every indicator, in the order of `indicators`.
+    """
+
+    results: dict[str, pd.DataFrame] = {}
+    attempts: dict[str, int] = {}
+    # Indicators waiting to be (re)submitted, as (time when due, indicator)
+    queue = [(0.0, indicator) for indicator in indicators]
+    heapq.heapify(queue)
+    running: dict[Future, str] = {}
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        while queue or running:
+            now = time.monotonic()
+            while queue and queue[0][0] <= now:
+                _, indicator = heapq.heappop(queue)
+                attempts[indicator] = attempts.get(indicator, 0) + 1
+                future = pool.submit(
+                    _read_indicator, indicator, countries, start_year, end_year, source
+                )
+                running[future] = indicator
+
+            # Wake up when a request ends, or when the next retry is due
+            timeout = max(queue[0][0] - now, 0) if queue else None
+            finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                indicator = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    results[indicator] = future.result()
+                elif attempts[indicator] <= retries:
+                    delay = _retry_delay(attempts[indicator], backoff)
+                    heapq.heappush(queue, (time.monotonic() + delay, indicator))
+                    logger.debug(
+                        f"Failed to get data for {indicator} ({error}), "
+                        f"retrying in {delay:.0f}s"
+                    )
+                else:
+                    logger.warning(f"Failed to get data for {indicator}: {error}")
+
+    if not results:
+        raise RuntimeError(f"Could not get data for any of {', '.join(indicators)}")
+
+    return pd.concat(
+        [results[i] for i in indicators if i in results], ignore_index=True
+    )
+
+
 def get_indicator_data(
     indicator: str,
     countries: str | list = "all",
@@ -103,40 +209,20 @@ def get_indicator_data(
     end_year: int = 2025,
     source: int = 6,
     try_again: bool = True,
-) -> pd.DataFrame:
-    # Get API url
-    url = _api_url(indicator, countries, start_year, end_year, source)
+) -> pd.DataFrame | None:
+    """Data for one indicator (None if it could not be fetched)"""
 
-    # Get data
     try:
-        data = pyjstat.Dataset.read(url).write(output="dataframe")
-        logger.debug(f"Got data for {indicator}")
-
-        return (
-            data.loc[data.value.notna()]
-            .assign(series_code=indicator)
-            .reset_index(drop=True)
-        )
-
-    except requests.exceptions.HTTPError:
-        logger.debug(f"Failed to get data for {indicator}")
-
-    except requests.exceptions.JSONDecodeError:
-        logger.debug(f"Failed to get data for {indicator}")
-
-    except Exception as e:
-        print("Ran into other trouble: ", e)
-
-    if try_again:
-        time.sleep(300)
-        get_indicator_data(
-            indicator=indicator,
+        return fetch_indicators(
+            [indicator],
             countries=countries,
             start_year=start_year,
             end_year=end_year,
             source=source,
-            try_again=False,
+            retries=1 if try_again else 0,
         )
+    except RuntimeError:
+        return None
 
 
 def read_dservice_data() -> pd.DataFrame:
@@ -165,9 +251,7 @@ def education_expenditure_share() -> pd.DataFrame:
     indicator = "SE.XPD.TOTL.GB.ZS"
 
     return (
-        WorldBankData()
-        .load_data(indicator)
-        .get_data()
+        world_bank_data(indicator)
         .dropna(subset="value")
         .assign(year=lambda d: d.date.dt.year)
         .filter(["year", "iso_code", "value"])
@@ -180,9 +264,7 @@ def health_expenditure_share_wb() -> pd.DataFrame:
     indicator = "SH.XPD.GHED.GE.ZS"
 
     return (
-        WorldBankData()
-        .load_data(indicator)
-        .get_data()
+        world_bank_data(indicator)
         .dropna(subset="value")
         .assign(year=lambda d: d.date.dt.year)
         .filter(["year", "iso_code", "value"])
@@ -1,6 +1,6 @@
 import pandas as pd
 
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
 from scripts.debt.ids_data import (
     clean_ids_china_stocks,
     clean_ids_data,
@@ -10,6 +10,8 @@ from scripts.debt.ids_data import (
 )
 from scripts.debt.topic_page import DATE, SOURCE
 
+SINK = ChartSink("debt_topic")
+
 
 def update_long_ids_stocks() -> None:
     download_ids_stocks(start_year=1990, end_year=2030, file_name="ids_stocks_raw_long")
@@ -55,13 +57,8 @@ def africa_long_debt_stocks_columns() -> None:
 
     df = get_long_stocks_clean().drop(columns=["Total"])
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/africa_long_debt_stocks_ts.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/africa_long_debt_stocks_ts.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("africa_long_debt_stocks_ts.csv", df, source=f"{SOURCE}{DATE}")
 
 
 if __name__ == "__main__":
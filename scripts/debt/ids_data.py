@@ -1,79 +1,177 @@
+import json
+import os
+
 import pandas as pd
-from bblocks import add_short_names_column
 
 from scripts import common
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
-from scripts.debt.common import get_indicator_data, DEBT_SERVICE, DEBT_STOCKS
+from scripts.country_ids import add_short_names_column
+from scripts.debt.common import (
+    fetch_indicators,
+    ids_release_date,
+    DEBT_SERVICE,
+    DEBT_STOCKS,
+)
+from scripts.files import atomic_write
 from scripts.logger import logger
 
+SINK = ChartSink("debt_topic")
+
 START_YEAR: int = 2009
 END_YEAR: int = 2030
 
+# Years of history re-downloaded by incremental updates (projections always are)
+REVISABLE_YEARS: int = 3
+
+# Release date and last year of history of each series, for incremental updates
+WATERMARKS: str = f"{PATHS.raw_debt}/ids_watermarks.json"
+
 
 # ---------------------------------------------------------------------
 # Download
 # ---------------------------------------------------------------------
 
 
-def _download_ids_service() -> None:
-    """Use API to download IDS data"""
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype(
+        {
+            "time": "Int16",
+            "country": "category",
+            "series_code": "category",
+            "counterpart-area": "category",
+            "series": "category",
+        }
+    ).reset_index(drop=True)
 
-    d_ = [
-        get_indicator_data(i, start_year=START_YEAR, end_year=END_YEAR)
-        for i in DEBT_SERVICE
-    ]
 
-    df = (
-        pd.concat(d_, ignore_index=True)
-        .astype(
-            {
-                "time": "Int16",
-                "country": "category",
-                "series_code": "category",
-                "counterpart-area": "category",
-                "series": "category",
-            }
-        )
-        .reset_index(drop=True)
+def _read_watermarks() -> dict:
+    try:
+        with open(WATERMARKS, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_watermark(file_name: str, watermark: dict) -> None:
+    watermarks = _read_watermarks() | {file_name: watermark}
+    with atomic_write(WATERMARKS) as file:
+        json.dump(watermarks, file, indent=4)
+
+
+def _upsert(stored: pd.DataFrame, new: pd.DataFrame, windows: dict) -> pd.DataFrame:
+    """Replace the rows of each series from the start of its window onwards.
+
+    Series missing from `new` (their download failed) keep all their stored rows.
+    """
+
+    codes = stored.series_code.astype(str)
+    start = codes.map(windows)
+    fetched = codes.isin(set(new.series_code.astype(str)))
+    kept = stored.loc[~fetched | (stored.time.astype("float") < start)]
+
+    order = {code: position for position, code in enumerate(windows)}
+
+    return (
+        pd.concat([kept, new], ignore_index=True)
+        .sort_values("series_code", key=lambda s: s.map(order), kind="stable")
+        .pipe(_typed)
     )
 
-    df.to_feather(f"{PATHS.raw_debt}/ids_service_raw.feather")
-    logger.info("Downloaded IDS debt service data")
 
+def _group_by_window(windows: dict[str, int]) -> dict[int, list[str]]:
+    groups: dict[int, list[str]] = {}
+    for code, window in windows.items():
+        groups.setdefault(window, []).append(code)
+    return groups
 
-def download_ids_stocks(
-    start_year: int = START_YEAR,
-    end_year: int = END_YEAR,
-    file_name: str = "ids_stocks_raw",
+
+def _update_ids_file(
+    indicators: list[str],
+    start_year: int,
+    end_year: int,
+    file_name: str,
+    incremental: bool,
 ) -> None:
-    """Use API to download IDS debt stocks"""
+    """Download IDS series into `{file_name}.feather`.
+
+    In incremental mode, only the years from which data can still be revised are
+    requested again: the last REVISABLE_YEARS years of history of each series, and
+    the projections. They replace the stored rows for those years. Everything is
+    downloaded again when the IDS release date changes (or cannot be checked), when
+    the series or years requested change, or when there is no stored file.
+    """
+
+    path = f"{PATHS.raw_debt}/{file_name}.feather"
+    release = ids_release_date()
+    watermark = _read_watermarks().get(file_name)
+
+    full = (
+        not incremental
+        or release is None
+        or watermark is None
+        or not os.path.exists(path)
+        or watermark["release"] != release
+        or (watermark["start_year"], watermark["end_year"]) != (start_year, end_year)
+        or set(watermark["series"]) != set(indicators)
+    )
 
-    d_ = [
-        get_indicator_data(i, start_year=start_year, end_year=end_year)
-        for i in DEBT_STOCKS
-    ]
+    if full:
+        df = fetch_indicators(indicators, start_year=start_year, end_year=end_year)
+        df = _typed(df)
+    else:
+        windows = {
+            code: max(start_year, watermark["series"][code] - REVISABLE_YEARS + 1)
+            for code in indicators
+        }
+        new = [
+            fetch_indicators(codes, start_year=window, end_year=end_year)
+            for window, codes in _group_by_window(windows).items()
+        ]
+        new = _typed(pd.concat(new, ignore_index=True))
+        df = _upsert(pd.read_feather(path), new, windows)
+
+    df.to_feather(path)
+
+    # The last year of history (before the year of the release) of each series
+    history = df.loc[lambda d: d.time < int((release or str(end_year + 1))[:4])]
+    last_years = history.groupby("series_code", observed=True).time.max()
+    _save_watermark(
+        file_name,
+        {
+            "release": release,
+            "start_year": start_year,
+            "end_year": end_year,
+            "series": {
+                code: int(last_years.get(code, start_year)) for code in indicators
+            },
+        },
+    )
 
-    df = (
-        pd.concat(d_, ignore_index=True)
-        .astype(
-            {
-                "time": "Int16",
-                "country": "category",
-                "series_code": "category",
-                "counterpart-area": "category",
-                "series": "category",
-            }
-        )
-        .reset_index(drop=True)
+    kind = "full" if full else "incremental"
+    logger.info(f"Downloaded IDS data: {file_name} ({kind}, release {release})")
+
+
+def _download_ids_service(incremental: bool = True) -> None:
+    """Use API to download IDS data"""
+    _update_ids_file(
+        list(DEBT_SERVICE), START_YEAR, END_YEAR, "ids_service_raw", incremental
     )
 
-    df.to_feather(f"{PATHS.raw_debt}/{file_name}.feather")
-    logger.info(f"Downloaded IDS debt stocks data: {file_name}")
+
+def download_ids_stocks(
+    start_year: int = START_YEAR,
+    end_year: int = END_YEAR,
+    file_name: str = "ids_stocks_raw",
+    incremental: bool = True,
+) -> None:
+    """Use API to download IDS debt stocks (see `_update_ids_file`)"""
+    _update_ids_file(list(DEBT_STOCKS), start_year, end_year, file_name, incremental)
 
 
-def update_ids_data() -> None:
-    _download_ids_service()
-    download_ids_stocks()
+def update_ids_data(incremental: bool = True) -> None:
+    _download_ids_service(incremental)
+    download_ids_stocks(incremental=incremental)
 
 
 # ---------------------------------------------------------------------
@@ -317,12 +415,11 @@ def flourish_ids_debt_service_china() -> None:
     file_name = "debt_service_china"
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/{file_name}.csv", index=False)
+    SINK.write(f"{file_name}.csv", df, download=False)
     logger.debug("Saved debt file debt_service_ts.csv (tracker version)")
 
     # download version
-    df = df.assign(source="World Bank IDS")
-    df.to_csv(f"{PATHS.download}/debt_topic/{file_name}.csv", index=False)
+    SINK.write(f"{file_name}.csv", df, source="World Bank IDS", live=False)
 
 
 def flourish_ids_debt_service() -> None:
@@ -1,24 +1,21 @@
 import datetime
 
 import pandas as pd
-from bblocks import (
-    add_short_names_column,
-    convert_id,
-    format_number,
-    set_bblocks_data_path,
-)
+from bblocks import format_number
 from bblocks.dataframe_tools.add import (
     add_gdp_column,
     add_gov_expenditure_column,
 )
 from bblocks.import_tools.debt.common import get_dsa
 
+from scripts.chart_sink import ChartSink
 from scripts.common import update_key_number
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_short_names_column, convert_id
 from scripts.debt.common import read_dservice_data, read_dstocks_data
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("debt_topic")
 
 KEY_NUMBERS: dict = {}
 
@@ -28,6 +25,8 @@ STOCKS_YEAR = CURRENT_YEAR - 1
 
 def debt_distress() -> None:
     """Update Debt Distress live number"""
+
+    configure_data_paths("bblocks")
     df = get_dsa(update=False, local_path=f"{PATHS.raw_data}/debt/dsa_list.pdf")
 
     df = df.assign(continent=lambda d: convert_id(d.country, to_type="continent")).loc[
@@ -58,7 +57,7 @@ def debt_service_africa_trend() -> None:
     )
 
     # Live version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_service_africa_trend.csv", index=False)
+    SINK.write("debt_service_africa_trend.csv", df, download=False)
     logger.debug("Saved live debt file 'debt_service_africa_trend.csv'")
 
     # Dynamic text version
@@ -77,6 +76,8 @@ def debt_service_africa_trend() -> None:
 def debt_service_gov_spending() -> None:
     """Debt Service vs Government Spending debt chart"""
 
+    configure_data_paths("bblocks")
+
     df = (
         read_dservice_data()
         .filter(["year", "iso_code", "Total"], axis=1)
@@ -108,18 +109,17 @@ def debt_service_gov_spending() -> None:
         .reset_index()
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/dservice_to_gov_exp.csv", index=False)
+    # chart and download versions
+    SINK.write("dservice_to_gov_exp.csv", df)
     logger.debug("Saved live debt file 'dservice_to_gov_exp.csv'")
-
-    # download version
-    df.to_csv(f"{PATHS.download}/debt_topic/dservice_to_gov_exp.csv", index=False)
     logger.debug("Saved download debt file 'dservice_to_gov_exp.csv'")
 
 
 def debt_to_gdp_trend() -> None:
     """Africa's debt to gdp overview chart"""
 
+    configure_data_paths("bblocks")
+
     df = (
         read_dstocks_data()
         .filter(["year", "iso_code", "Total"], axis=1)
@@ -141,7 +141,7 @@ def debt_to_gdp_trend() -> None:
     )
 
     # Live version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_gdp_africa_trend.csv", index=False)
+    SINK.write("debt_gdp_africa_trend.csv", df, download=False)
     logger.debug("Saved live debt file 'debt_gdp_africa_trend.csv'")
 
     # Dynamic text version
@@ -168,7 +168,7 @@ def debt_stocks_africa_trend() -> None:
     )
 
     # Live version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_stocks_africa_trend.csv", index=False)
+    SINK.write("debt_stocks_africa_trend.csv", df, download=False)
     logger.debug("Saved live debt file 'debt_stocks_africa_trend.csv'")
 
     # Dynamic text version
@@ -1,18 +1,20 @@
 import pandas as pd
 from bblocks import (
-    add_short_names_column,
-    convert_id,
-    set_bblocks_data_path,
     get_dsa,
     date_to_str,
 )
 from bblocks.dataframe_tools.add import (
     add_gdp_column,
     add_gov_expenditure_column,
-    add_iso_codes_column,
 )
 
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import (
+    add_iso_codes_column,
+    add_short_names_column,
+    convert_id,
+)
 from scripts.debt import common
 from scripts.debt.common import (
     education_expenditure_share,
@@ -23,7 +25,7 @@ from scripts.debt.common import (
 from scripts.debt.overview_charts import CURRENT_YEAR
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("debt_topic")
 
 SOURCE = "International Debt Statistics (IDS) Database"
 DATE = " (December 2025)"
@@ -63,13 +65,8 @@ def debt_stocks_columns() -> None:
         axis=1,
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_stocks_ts.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_stocks_ts.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_stocks_ts.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def debt_service_columns() -> None:
@@ -107,16 +104,13 @@ def debt_service_columns() -> None:
         .loc[lambda d: d.year <= (CURRENT_YEAR + 5)]
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_service_ts.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_service_ts.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_service_ts.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def debt_to_gdp_ts() -> None:
+    configure_data_paths("bblocks")
+
     df = (
         read_dstocks_data()
         .filter(["year", "iso_code", "Total"], axis=1)
@@ -148,13 +142,8 @@ def debt_to_gdp_ts() -> None:
         .reset_index()
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_gdp_ratio_country_ts.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_gdp_ratio_country_ts.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_gdp_ratio_country_ts.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def read_debt_chart_data() -> pd.DataFrame:
@@ -210,13 +199,8 @@ def debt_composition_chart() -> None:
         )
     )
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_composition_country.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_composition_country.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_composition_country.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def debt_to_china_chart() -> None:
@@ -249,16 +233,13 @@ def debt_to_china_chart() -> None:
         lambda d: d[["Bilateral", "Private"]].sum(axis=1) > 0
     ]
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_to_china_country.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_to_china_country.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_to_china_country.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def debt_service_comparison_chart() -> None:
+    configure_data_paths("bblocks")
+
     edu = education_expenditure_share()
     health = health_expenditure_share_ghed()
     comparison = edu.merge(
@@ -305,20 +286,15 @@ def debt_service_comparison_chart() -> None:
             }
         )
     )
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_service_comparison.csv", index=False)
-
-    # download version
-    df.assign(source=f"{SOURCE}{DATE}").to_csv(
-        f"{PATHS.download}/debt_topic/debt_service_comparison.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_service_comparison.csv", df, source=f"{SOURCE}{DATE}")
 
 
 def flourish_ids_debt_service() -> None:
     """Debt service data for Flourish, in million"""
 
     df = pd.read_feather(f"{PATHS.raw_debt}/debt_service_ts.feather")
-    df.to_csv(PATHS.charts + r"/debt_topic/c07_debt_service_ts.csv", index=False)
+    SINK.write("c07_debt_service_ts.csv", df, download=False)
 
     logger.info("Successfully updated chart C07")
 
@@ -327,12 +303,14 @@ def flourish_ids_debt_stocks() -> None:
     """Debt Stocks data for Flourish in Millions"""
 
     df = pd.read_feather(f"{PATHS.raw_debt}/debt_stocks-ts.feather")
-    df.to_csv(PATHS.charts + r"/debt_topic/c08_debt_stocks-ts.csv", index=False)
+    SINK.write("c08_debt_stocks-ts.csv", df, download=False)
 
     logger.info("Successfully updated chart C08")
 
 
 def debt_distress_map() -> None:
+    configure_data_paths("bblocks")
+
     df = (
         get_dsa(update=True)
         .pipe(add_short_names_column, id_column="country", id_type="regex")
@@ -345,13 +323,8 @@ def debt_distress_map() -> None:
 
     df = df.assign(latest_publication=lambda d: date_to_str(d.latest_publication))
 
-    # chart version
-    df.to_csv(f"{PATHS.charts}/debt_topic/debt_distress_map.csv", index=False)
-
-    # download version
-    df.assign(source=f"IMF DSA").to_csv(
-        f"{PATHS.download}/debt_topic/debt_distress_map.csv", index=False
-    )
+    # chart and download versions
+    SINK.write("debt_distress_map.csv", df, source=f"IMF DSA")
 
 
 def update_debt_country_charts() -> None:
@@ -1,73 +1,186 @@
-from bblocks import set_bblocks_data_path, convert_id
-from bblocks.import_tools.debt.common import get_dsa
-
-from scripts.config import PATHS
-from scripts.debt import (
-    dashboard,
-    ids_data,
-    overview_charts as debt_overview,
-    topic_page,
-)
-from scripts.debt.common import update_debt_world_bank
-from scripts.debt.data_dive import (
-    africa_long_debt_stocks_columns,
-    update_long_ids_stocks,
-)
+"""Task lists for the debt topic.
+
+The chart and data modules are imported when the task lists are built, so importing
+this module stays cheap.
+"""
+
+from scripts.config import PATHS, configure_data_paths
 from scripts.logger import logger
+from scripts.tasks import Task, WEO_RAW, run_tasks, wb_cache
 
-set_bblocks_data_path(PATHS.bblocks_data)
+# Charts and data files used by the task definitions below
+CHARTS: str = f"{PATHS.charts}/debt_topic"
+DOWNLOAD: str = f"{PATHS.download}/debt_topic"
+DSA_RAW: str = f"{PATHS.raw_data}/debt/dsa_list.pdf"
+KEY_NUMBERS: str = f"{CHARTS}/debt_key_numbers.json"
+SERVICE_TS: str = f"{PATHS.raw_debt}/debt_service_ts.feather"
+STOCKS_TS: str = f"{PATHS.raw_debt}/debt_stocks-ts.feather"
 
 
-def update_weekly_data() -> None:
-    # Update DSA list
-    _ = get_dsa(update=True, local_path=f"{PATHS.raw_data}/debt/dsa_list.pdf")
-    logger.info("Updated DSA list data")
+def _wb_spending_raw() -> list[str]:
+    """bblocks cache files of the World Bank spending indicators"""
+    from scripts.debt.common import WORLD_BANK_INDICATORS
 
-    _ = _.assign(continent=lambda d: convert_id(d.country, to_type="continent"))
+    return wb_cache(WORLD_BANK_INDICATORS)
 
-    # Update IDS data
-    ids_data.update_ids_data()
 
-    # Update raw data for Tableau
-    dashboard.export_tableau_database()
+def update_dsa_list() -> None:
+    """Update DSA list"""
+    from bblocks.import_tools.debt.common import get_dsa
 
-    # Update other charts
-    ids_data.update_flourish_charts()
+    from scripts.country_ids import convert_id
 
-    # Update long stocks africa
-    update_long_ids_stocks()
+    configure_data_paths("bblocks")
 
+    _ = get_dsa(update=True, local_path=DSA_RAW)
+    logger.info("Updated DSA list data")
+
+    _ = _.assign(continent=lambda d: convert_id(d.country, to_type="continent"))
 
-def update_weekly_charts() -> None:
-    # update DSA chart
-    debt_overview.debt_distress()
 
-    # Update data from tracker
-    debt_overview.debt_service_africa_trend()
-    debt_overview.debt_stocks_africa_trend()
-    debt_overview.debt_service_gov_spending()
-    debt_overview.debt_to_gdp_trend()
+def _chart(name: str) -> list[str]:
+    """Live and download versions of a debt topic chart"""
+    return [f"{CHARTS}/{name}.csv", f"{DOWNLOAD}/{name}.csv"]
+
+
+def weekly_data_tasks() -> list[Task]:
+    from scripts.debt import dashboard, ids_data
+    from scripts.debt.data_dive import update_long_ids_stocks
+
+    return [
+        # Update DSA list
+        Task(update_dsa_list, outputs=[DSA_RAW]),
+        # Update IDS data
+        Task(
+            ids_data.update_ids_data,
+            outputs=[
+                f"{PATHS.raw_debt}/ids_service_raw.feather",
+                f"{PATHS.raw_debt}/ids_stocks_raw.feather",
+                f"{PATHS.raw_debt}/ids_watermarks.json",
+            ],
+        ),
+        # Update raw data for Tableau
+        Task(
+            dashboard.export_tableau_database,
+            inputs=[
+                f"{PATHS.raw_debt}/ids_service_raw.feather",
+                f"{PATHS.raw_debt}/ids_stocks_raw.feather",
+            ],
+            outputs=[f"{PATHS.raw_debt}/ids_tableau.feather"],
+        ),
+        # Update other charts
+        Task(
+            ids_data.update_flourish_charts,
+            inputs=[
+                f"{PATHS.raw_debt}/ids_service_raw.feather",
+                f"{PATHS.raw_debt}/ids_stocks_raw.feather",
+            ],
+            outputs=[STOCKS_TS, SERVICE_TS, *_chart("debt_service_china")],
+        ),
+        # Update long stocks africa
+        Task(
+            update_long_ids_stocks,
+            outputs=[
+                f"{PATHS.raw_debt}/ids_stocks_raw_long.feather",
+                f"{PATHS.raw_debt}/ids_watermarks.json",
+            ],
+        ),
+    ]
+
+
+def weekly_chart_tasks() -> list[Task]:
+    from scripts.debt import overview_charts as debt_overview, topic_page
+    from scripts.debt.data_dive import africa_long_debt_stocks_columns
+
+    return [
+        # update DSA chart
+        Task(debt_overview.debt_distress, inputs=[DSA_RAW], outputs=[KEY_NUMBERS]),
+        # Update data from tracker
+        Task(
+            debt_overview.debt_service_africa_trend,
+            inputs=[SERVICE_TS],
+            outputs=[f"{CHARTS}/debt_service_africa_trend.csv", KEY_NUMBERS],
+        ),
+        Task(
+            debt_overview.debt_stocks_africa_trend,
+            inputs=[STOCKS_TS],
+            outputs=[f"{CHARTS}/debt_stocks_africa_trend.csv", KEY_NUMBERS],
+        ),
+        Task(
+            debt_overview.debt_service_gov_spending,
+            inputs=[SERVICE_TS, WEO_RAW],
+            outputs=_chart("dservice_to_gov_exp"),
+        ),
+        Task(
+            debt_overview.debt_to_gdp_trend,
+            inputs=[STOCKS_TS, WEO_RAW],
+            outputs=[f"{CHARTS}/debt_gdp_africa_trend.csv", KEY_NUMBERS],
+        ),
+        # Topic page
+        Task(
+            topic_page.update_debt_country_charts,
+            inputs=[
+                STOCKS_TS,
+                SERVICE_TS,
+                f"{PATHS.raw_debt}/ids_tableau.feather",
+                DSA_RAW,
+                WEO_RAW,
+                *_wb_spending_raw(),
+            ],
+            outputs=[
+                *_chart("debt_stocks_ts"),
+                *_chart("debt_service_ts"),
+                *_chart("debt_gdp_ratio_country_ts"),
+                *_chart("debt_composition_country"),
+                *_chart("debt_to_china_country"),
+                *_chart("debt_service_comparison"),
+                *_chart("debt_distress_map"),
+                f"{CHARTS}/c07_debt_service_ts.csv",
+                f"{CHARTS}/c08_debt_stocks-ts.csv",
+            ],
+            # Also reads GHED data, which bblocks fetches from the web
+            always_run=True,
+        ),
+        # Data dive
+        Task(
+            africa_long_debt_stocks_columns,
+            inputs=[f"{PATHS.raw_debt}/ids_stocks_raw_long.feather"],
+            outputs=_chart("africa_long_debt_stocks_ts"),
+        ),
+    ]
+
+
+def monthly_data_tasks() -> list[Task]:
+    from scripts.debt.common import update_debt_world_bank
+
+    return [Task(update_debt_world_bank, outputs=_wb_spending_raw())]
+
+
+def weekly_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated weekly"""
+    return weekly_data_tasks() + weekly_chart_tasks()
+
+
+def monthly_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated monthly"""
+    return monthly_data_tasks()
 
-    # Topic page
-    topic_page.update_debt_country_charts()
 
-    # Data dive
-    africa_long_debt_stocks_columns()
+def update_weekly_data() -> None:
+    run_tasks(weekly_data_tasks())
+
+
+def update_weekly_charts() -> None:
+    run_tasks(weekly_chart_tasks())
 
 
 def update_monthly_data() -> None:
-    update_debt_world_bank()
-    logger.info("Updated World Bank Health and Education spending data")
+    run_tasks(monthly_data_tasks())
 
 
 def update_debt_weekly() -> None:
-    # Update data
-    update_weekly_data()
-
-    # Update charts
-    update_weekly_charts()
+    run_tasks(weekly_tasks())
 
 
 def update_debt_monthly() -> None:
-    # Update data
-    update_monthly_data()
+    run_tasks(monthly_tasks())
@@ -1,22 +1,22 @@
 import pandas as pd
-from bblocks import WorldEconomicOutlook, set_bblocks_data_path
 from bblocks.dataframe_tools.add import add_gdp_column
 
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.importers import weo_data
 
-set_bblocks_data_path(PATHS.bblocks_data)
 
 UNU_NAME = "UNUWIDERGRD_2022_0.xlsx"
 
 
-def gov_revenue(weo: WorldEconomicOutlook) -> pd.DataFrame:
+def gov_revenue() -> pd.DataFrame:
     """Read government revenue data from the World Economic Outlook database."""
 
+    configure_data_paths("bblocks")
+
     rev: str = "GGR_NGDP"
 
     return (
-        weo.load_data(rev)
-        .get_data(keep_metadata=True)
+        weo_data(rev, keep_metadata=True)
         .filter(["iso_code", "indicator_name", "year", "value", "estimate"])
         .pipe(
             add_gdp_column,
@@ -69,6 +69,8 @@ def _read_unu() -> pd.DataFrame:
 
 
 def unu_gov_revenue() -> pd.DataFrame:
+    configure_data_paths("bblocks")
+
     return (
         _read_unu()
         .filter(["iso_code", "year", "total revenue_including grants_inc sc"], axis=1)
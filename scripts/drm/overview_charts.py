@@ -1,19 +1,10 @@
 from datetime import datetime
 
 import pandas as pd
-from bblocks import (
-    WorldEconomicOutlook,
-    convert_id,
-    format_number,
-    set_bblocks_data_path,
-)
-
-from scripts.config import PATHS
-from scripts.drm import common
-
-set_bblocks_data_path(PATHS.bblocks_data)
+from bblocks import format_number
 
-WEO = WorldEconomicOutlook(year=2025, release=1)
+from scripts.country_ids import convert_id
+from scripts.drm import common
 
 
 def _latest_weo_ssa_with_yoy_change(
@@ -72,7 +63,7 @@ def _latest_unu_ssa_with_yoy_change(
 
 
 def revenue_key_number(summary: bool = True) -> None:
-    df = common.gov_revenue(WEO)
+    df = common.gov_revenue()
     df = (
         df.pipe(_latest_weo_ssa_with_yoy_change, summary=summary)
         .assign(
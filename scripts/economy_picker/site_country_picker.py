@@ -1,37 +1,30 @@
 import datetime
 
 import pandas as pd
-from bblocks import (
-    WFPData,
-    WorldBankData,
-    WorldEconomicOutlook,
-    add_iso_codes_column,
-    clean_numeric_series,
-    set_bblocks_data_path,
-)
+from bblocks import clean_numeric_series
 from bblocks.dataframe_tools.add import (
     add_flourish_geometries,
     add_population_column,
     add_population_share_column,
 )
 
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_iso_codes_column, converter
 from scripts.explorers.common import base_africa_map
+from scripts.importers import weo_data, wfp_session, world_bank_data
 from scripts.owid_covid import tools as owid_tools
 from scripts.schemas import BubbleDataSchema, MapDataSchema
 
-set_bblocks_data_path(PATHS.bblocks_data)
-
 
 def _core_data() -> pd.DataFrame:
     """Generate a basic table with African countries, formal names, short names,
     and geometries"""
-    from country_converter.country_converter import CountryConverter
 
-    cc = CountryConverter()
+    configure_data_paths("bblocks")
 
     return (
-        cc.data[["ISO3", "name_short", "name_official", "continent"]]
+        converter()
+        .data[["ISO3", "name_short", "name_official", "continent"]]
         .rename(
             columns={
                 "ISO3": MapDataSchema.ISO_CODE,
@@ -93,16 +86,10 @@ def weo_indicators() -> pd.DataFrame:
         "NGDP_RPCH": "GDP Growth (% change)",
     }
 
-    # Create a WEO object to import the data
-    weo = WorldEconomicOutlook(year=2025, release=1)
-
-    # Load the data for the relevant indicators
-    weo.load_data(list(indicators))
-
     # Return a dataframe which filters for the most recent year,
     # maps the right indicator names, and fixes the formatting and structure
     return (
-        weo.get_data(keep_metadata=False)
+        weo_data(list(indicators))
         .query(f"year == {current_year}")
         .assign(
             indicator=lambda d: d.indicator.map(indicators),
@@ -148,12 +135,8 @@ def wb_indicators() -> pd.DataFrame:
         "HD.HCI.OVRL": "Human Capital Index",
     }
 
-    wb = WorldBankData()
-
-    wb.load_data(list(indicators), most_recent_only=True)
-
     return (
-        wb.get_data()
+        world_bank_data(list(indicators), most_recent_only=True)
         .assign(indicator=lambda d: d.indicator.map(indicators))
         .filter(["iso_code", "indicator", "value"], axis=1)
         .pivot(index="iso_code", columns="indicator", values="value")
@@ -164,11 +147,9 @@ def wb_indicators() -> pd.DataFrame:
 
 
 def latest_inflation_data() -> pd.DataFrame:
-    wfp = WFPData()
-    wfp.load_data(list(wfp.available_indicators))
-
     return (
-        wfp.get_data("inflation")
+        wfp_session()
+        .get_data("inflation")
         .loc[lambda d: d.date.dt.year.between(2018, 2022)]
         .loc[lambda d: d.indicator == "Inflation Rate"]
         .groupby(["iso_code"], as_index=False)
@@ -181,11 +162,9 @@ def latest_inflation_data() -> pd.DataFrame:
 
 
 def latest_food_data() -> pd.DataFrame:
-    wfp = WFPData()
+    configure_data_paths("bblocks")
 
-    wfp.load_data(list(wfp.available_indicators))
-
-    food = wfp.get_data("insufficient_food")
+    food = wfp_session().get_data("insufficient_food")
 
     # calculate starting date
 
@@ -222,6 +201,8 @@ def latest_debt_service() -> pd.DataFrame:
 
 
 def map_data(base_map: pd.DataFrame) -> None:
+    configure_data_paths("bblocks")
+
     df = base_map_data()
 
     # Add WEO indicators
@@ -1,27 +1,19 @@
-import country_converter
 import pandas as pd
 import requests
-from bblocks import (
-    WorldBankData,
-    WorldEconomicOutlook,
-    add_short_names_column,
-    clean_numeric_series,
-    convert_id,
-    set_bblocks_data_path,
-)
+from bblocks import clean_numeric_series
 from bblocks.dataframe_tools import add
 from bblocks.dataframe_tools.add import add_flourish_geometries
 from bblocks.dataframe_tools.common import get_population_df, get_poverty_ratio_df
 
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import add_short_names_column, convert_id, converter
+from scripts.importers import weo_data, world_bank_data
 from scripts.owid_covid.tools import (
     filter_countries_only,
     get_indicators_ts,
     read_owid_data,
 )
 
-set_bblocks_data_path(PATHS.bblocks_data)
-
 
 # Data structure
 class ExplorerSchema:
@@ -130,8 +122,10 @@ OWID_INDICATORS: dict = {
 def base_africa_map():
     """Create a map with geometries for all african countries"""
 
+    configure_data_paths("bblocks")
+
     return (
-        country_converter.CountryConverter()
+        converter()
         .data[["ISO3", "continent"]]
         .rename(columns={"ISO3": "iso_code"})
         .query("continent == 'Africa'")
@@ -144,7 +138,7 @@ def base_africa_map():
 def _base_df() -> pd.DataFrame:
     """A dataframe with iso3 codes, name, UN region and continent"""
 
-    return country_converter.CountryConverter().data[
+    return converter().data[
         ["ISO3", "name_short", "continent", "UNregion"]
     ]
 
@@ -152,6 +146,8 @@ def _base_df() -> pd.DataFrame:
 def basic_info() -> pd.DataFrame:
     """Create a DataFrame with basic information"""
 
+    configure_data_paths("bblocks")
+
     return (
         _base_df()
         .pipe(add.add_income_level_column, id_column="ISO3", id_type="ISO3")
@@ -212,11 +208,8 @@ def add_hdi_column(df: pd.DataFrame, iso_column="iso_code") -> pd.DataFrame:
 
 
 def _weo_meta() -> pd.DataFrame:
-    weo = WorldEconomicOutlook(year=2025, release=1)
-    weo.load_data(indicator=list(ECONOMICS_WEO_INDICATORS))
-
     return (
-        weo.get_data(keep_metadata=True)
+        weo_data(list(ECONOMICS_WEO_INDICATORS), keep_metadata=True)
         .loc[lambda d: d.year.dt.year == WEO_YEAR]
         .assign(
             indicator=lambda d: d.indicator.map(ECONOMICS_WEO_INDICATORS),
@@ -229,6 +222,8 @@ def _weo_meta() -> pd.DataFrame:
 
 
 def _wb_econ_meta() -> pd.DataFrame:
+    configure_data_paths("bblocks")
+
     # population
     population = (
         get_population_df(most_recent_only=True, update=False)
@@ -249,12 +244,8 @@ def _wb_econ_meta() -> pd.DataFrame:
 
 
 def _wb_health_meta() -> pd.DataFrame:
-    wb = WorldBankData()
-
-    wb.load_data(indicator=list(HEALTH_WB_INDICATORS), most_recent_only=True)
-
     return (
-        wb.get_data()
+        world_bank_data(list(HEALTH_WB_INDICATORS), most_recent_only=True)
         .assign(
             year=lambda d: d.date.dt.year,
             source=lambda d: "World Bank Open Data: " + d["indicator_code"],
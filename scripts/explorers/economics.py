@@ -1,6 +1,6 @@
 import pandas as pd
-from bblocks import WorldEconomicOutlook, set_bblocks_data_path
 
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
 from scripts.explorers.common import (
     ECONOMICS_WEO_INDICATORS,
@@ -10,16 +10,14 @@ from scripts.explorers.common import (
     basic_info,
     indicators_metadata,
 )
+from scripts.importers import weo_data
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("explorers")
 
 
 def _base_weo_economics() -> pd.DataFrame:
-    weo = WorldEconomicOutlook(year=2025, release=1)
-    weo.load_data(list(ECONOMICS_WEO_INDICATORS))
-
     return (
-        weo.get_data(keep_metadata=False)
+        weo_data(list(ECONOMICS_WEO_INDICATORS))
         .loc[lambda d: d.year.dt.year == WEO_YEAR]
         .drop("year", axis=1)
         .assign(indicator=lambda d: d.indicator.map(ECONOMICS_WEO_INDICATORS))
@@ -40,7 +38,7 @@ def econ_explorer():
     metadata = indicators_metadata().loc[lambda d: d.indicator.isin(df.columns)]
 
     # Export explorer
-    df.to_csv(f"{PATHS.charts}/explorers/economics.csv", index=False)
+    SINK.write("economics.csv", df, download=False)
 
     # Export metadata
     metadata.to_excel(f"{PATHS.download}/explorers/econ_metadata.xlsx", index=False)
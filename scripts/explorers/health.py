@@ -1,6 +1,6 @@
 import pandas as pd
-from bblocks import WorldBankData, set_bblocks_data_path
 
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
 from scripts.explorers.common import (
     ExplorerSchema,
@@ -14,16 +14,14 @@ from scripts.owid_covid.tools import (
     get_indicators_ts,
     read_owid_data,
 )
+from scripts.importers import world_bank_data
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("explorers")
 
 
 def _base_wb_health() -> pd.DataFrame:
-    wb = WorldBankData()
-    wb.load_data(indicator=list(HEALTH_WB_INDICATORS), most_recent_only=True)
-
     return (
-        wb.get_data()
+        world_bank_data(list(HEALTH_WB_INDICATORS), most_recent_only=True)
         .assign(indicator=lambda d: d.indicator.map(HEALTH_WB_INDICATORS))
         .filter(["iso_code", "indicator", "value"], axis=1)
         .pivot(index=["iso_code"], columns="indicator", values="value")
@@ -108,7 +106,7 @@ def health_explorer() -> None:
     metadata = indicators_metadata().loc[lambda d: d.indicator.isin(df.columns)]
 
     # Export explorer
-    df.to_csv(f"{PATHS.charts}/explorers/health.csv", index=False)
+    SINK.write("health.csv", df, download=False)
 
     # Export metadata
     metadata.to_excel(f"{PATHS.download}/explorers/health_metadata.xlsx", index=False)
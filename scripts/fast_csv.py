@@ -0,0 +1,138 @@
+"""Serialize DataFrames to csv text with pyarrow, byte for byte like pandas.
+
+`DataFrame.to_csv` formats and writes every cell from Python, which is slow for wide
+pivots (one column per country or sector). `to_csv_text` formats whole columns with
+pyarrow compute kernels instead and joins them into rows in C++.
+
+The text is the same as `df.to_csv(index=False, lineterminator="\\n")`:
+
+- floats use Python's shortest round-trip representation ("1.0", "1e-05"). pyarrow
+  agrees with it on the digits but not on the notation, so values outside the plain
+  decimal range are formatted by numpy (they are rare in chart data);
+- booleans are written as True/False and missing values as empty cells;
+- text is only quoted when it contains a comma, a quote or a newline (pyarrow's
+  own csv writer quotes every string, which Flourish would see as a change).
+
+Frames with other column types (dates, categories, mixed objects...) are written by
+pandas, as are frames with fewer than two columns, no rows or a column MultiIndex.
+"""
+
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Python switches to scientific notation outside of this range (see `float.__repr__`)
+_PLAIN_FLOATS: tuple[float, float] = (1e-4, 1e16)
+
+# Characters which make the csv module quote a cell (with "\n" as line terminator)
+_QUOTED_CHARACTERS: str = '[,"\n]'
+
+
+def csv_cell(value: str) -> str:
+    """`value` quoted the way pandas writes it in a csv with several columns"""
+
+    if value == "":
+        return ""
+
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow([value])
+
+    return buffer.getvalue()[:-1]
+
+
+def _pandas_csv(df: pd.DataFrame) -> str:
+    return df.to_csv(index=False, lineterminator="\n")
+
+
+def _float_cells(values: np.ndarray) -> pa.Array:
+    """Float64 values as Python writes them ("" for NaN)"""
+
+    cells = pa.array(values, from_pandas=True).cast(pa.string())
+
+    # Within the plain range pyarrow and Python write the same digits, except that
+    # pyarrow drops the ".0" of whole numbers and writes some of them as "1e+15"
+    magnitude = np.abs(values)
+    in_range = (magnitude >= _PLAIN_FLOATS[0]) & (magnitude < _PLAIN_FLOATS[1])
+    scientific = pc.fill_null(pc.match_substring(cells, "e"), False)
+    scientific = scientific.to_numpy(zero_copy_only=False)
+    plain = ((magnitude == 0) | in_range) & ~scientific
+
+    whole = pc.invert(pc.match_substring(cells, "."))
+    cells = pc.if_else(
+        pc.and_(whole, pa.array(plain)),
+        pc.binary_join_element_wise(cells, ".0", ""),
+        cells,
+    )
+
+    others = ~plain & ~np.isnan(values)
+    if others.any():
+        cells = cells.to_numpy(zero_copy_only=False)
+        cells[others] = values[others].astype(str)
+        cells = pa.array(cells, type=pa.string())
+
+    return cells
+
+
+def _text_cells(values: pa.Array) -> pa.Array:
+    """Text values, quoted when they contain structural characters"""
+
+    needs_quotes = pc.match_substring_regex(values, _QUOTED_CHARACTERS)
+    quoted = pc.binary_join_element_wise(
+        '"', pc.replace_substring(values, '"', '""'), '"', ""
+    )
+
+    return pc.if_else(needs_quotes, quoted, values)
+
+
+def _cells(column: pd.Series) -> pa.Array | None:
+    """The csv cells of a column, or None if pandas has to write it"""
+
+    dtype = column.dtype
+
+    if dtype == np.float64:
+        return _float_cells(column.to_numpy())
+
+    if dtype.kind in "iu" and isinstance(dtype, np.dtype):
+        return pa.array(column.to_numpy()).cast(pa.string())
+
+    if dtype == np.bool_:
+        return pc.if_else(pa.array(column.to_numpy()), "True", "False")
+
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        try:
+            values = pa.array(column, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Numbers, dates... mixed with the text
+            return None
+        return _text_cells(values)
+
+    return None
+
+
+def to_csv_text(df: pd.DataFrame) -> str:
+    """The text of `df.to_csv(index=False, lineterminator="\\n")`, built with pyarrow"""
+
+    if (
+        len(df.columns) < 2
+        or df.empty
+        or isinstance(df.columns, pd.MultiIndex)
+        or df.columns.isna().any()
+    ):
+        return _pandas_csv(df)
+
+    columns = []
+    for _, column in df.items():
+        cells = _cells(column)
+        if cells is None:
+            return _pandas_csv(df)
+        columns.append(pc.fill_null(cells, ""))
+
+    header = ",".join(csv_cell(str(name)) for name in df.columns)
+    rows = pc.binary_join_element_wise(*columns, ",")
+    body = pc.binary_join(pa.ListArray.from_arrays([0, len(rows)], rows), "\n")
+
+    return f"{header}\n{body[0].as_py()}\n"
@@ -0,0 +1,57 @@
+"""Helpers to write output files safely and to tell when a file changed."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+_digests: dict[tuple, str] = {}
+_digests_lock = threading.Lock()
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", **kwargs):
+    """Open a temporary file which replaces `path` once the block succeeds.
+
+    Readers (and a failed run) never see a partly written file. `kwargs` are passed
+    to `open` (for example `newline=""` for csv files).
+    """
+
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(
+        dir=folder, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(handle, mode, **kwargs) as file:
+            yield file
+        # Temporary files are private, give it the mode of a normal output file
+        os.chmod(temporary, os.stat(path).st_mode if os.path.exists(path) else 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def file_digest(path: str) -> str | None:
+    """Content hash of a file (None if it does not exist), cached by size and mtime"""
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        if key in _digests:
+            return _digests[key]
+
+    with open(path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+
+    with _digests_lock:
+        _digests[key] = digest
+
+    return digest
@@ -1,29 +1,55 @@
 import pandas as pd
-import requests
 
 from scripts.config import PATHS
+from scripts.odata import ODataQuery, all_of, between, eq, is_in, read_query
 
 WHO_API_URL = "https://ghoapi.azureedge.net/api/"
 
 
-def query_who(code: str):
+def who_query(
+    code: str,
+    spatial_dims: list[str] | None = None,
+    spatial_type: str | None = None,
+    years: range | None = None,
+    fields: list[str] | None = None,
+) -> ODataQuery:
+    """A query for a GHO indicator, filtered by spatial dimension (countries,
+    regions...), type of spatial dimension and years"""
+
+    return ODataQuery(
+        url=WHO_API_URL + code,
+        filter=all_of(
+            None if spatial_dims is None else is_in("SpatialDim", spatial_dims),
+            None if spatial_type is None else eq("SpatialDimType", spatial_type),
+            None if years is None else between("TimeDim", min(years), max(years)),
+        ),
+        select=tuple(fields or ()),
+        orderby=("Id",),
+    )
+
+
+def query_who(
+    code: str,
+    spatial_dims: list[str] | None = None,
+    spatial_type: str | None = None,
+    years: range | None = None,
+    fields: list[str] | None = None,
+) -> pd.DataFrame:
     """Query the WHO website for a given code.
-    To be replaced in bblocks
-    """
 
-    request = requests.get(WHO_API_URL + code)
-    data = request.json()
-    df = pd.DataFrame.from_records(data["value"])
+    Filters and the selection of `fields` are applied by the WHO API, so only the
+    records and fields needed are downloaded.
+    """
 
-    return df
+    return read_query(who_query(code, spatial_dims, spatial_type, years, fields))
 
 
 def update_malaria_data() -> None:
     """Update WHO data for malaria"""
-    df = (
-        query_who("MALARIA_EST_DEATHS")
-        .loc[lambda d: d.SpatialDim.isin(["GLOBAL", "AFR"])]
-        .filter(["SpatialDim", "TimeDim", "NumericValue"], axis=1)
+    df = query_who(
+        "MALARIA_EST_DEATHS",
+        spatial_dims=["GLOBAL", "AFR"],
+        fields=["SpatialDim", "TimeDim", "NumericValue"],
     )
 
     df.to_csv(f"{PATHS.raw_data}/health/who_malaria_data.csv", index=False)
@@ -2,22 +2,19 @@
 
 import json
 
-import country_converter as coco
 import pandas as pd
 from bblocks import (
-    WorldBankData,
-    set_bblocks_data_path,
     format_number,
     add_income_level_column,
 )
 
 from scripts.common import update_key_number
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import convert_id
 from scripts.health.common import get_malaria_data
+from scripts.importers import world_bank_data
 from scripts.owid_covid import tools as owid_tools
 
-set_bblocks_data_path(PATHS.bblocks_data)
-
 
 def _format_wb_df(df: pd.DataFrame, indicator_name: str):
     df = (
@@ -27,7 +24,9 @@ def _format_wb_df(df: pd.DataFrame, indicator_name: str):
         .last()
         .loc[:, ["iso_code", "value"]]
         .assign(
-            continent=lambda d: coco.convert(d.iso_code, to="continent", not_found=None)
+            continent=lambda d: convert_id(
+                d.iso_code, from_type=None, to_type="continent"
+            )
         )
         .loc[lambda d: d.continent == "Africa", :]
         .assign(indicator=indicator_name)
@@ -37,19 +36,16 @@ def _format_wb_df(df: pd.DataFrame, indicator_name: str):
 
 
 def spending_dynamic() -> dict:
-    wb = WorldBankData()
-    wb.load_data(["SH.XPD.CHEX.PC.CD", "SH.XPD.CHEX.GD.ZS"])
-
     # TODO: Explain the cut-offs
     pc = (
-        wb.get_data("SH.XPD.CHEX.PC.CD")
+        world_bank_data("SH.XPD.CHEX.PC.CD")
         .pipe(_format_wb_df, "pc")
         .loc[lambda d: d.value >= 86, :]
     )
 
     # TODO: Explain the cut-offs
     gdp = (
-        wb.get_data("SH.XPD.CHEX.GD.ZS")
+        world_bank_data("SH.XPD.CHEX.GD.ZS")
         .pipe(_format_wb_df, "gdp")
         .loc[lambda d: d.value >= 5, :]
     )
@@ -106,6 +102,8 @@ def _get_indicator_item(
 
 
 def doses_dynamic() -> None:
+    configure_data_paths("bblocks")
+
     df = owid_tools.read_owid_data().filter(
         [
             "date",
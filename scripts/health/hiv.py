@@ -1,11 +1,14 @@
 """HIV charts for health topic page"""
 
+from functools import cache
+
 import pandas as pd
 import numpy as np
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
 from scripts.logger import logger
 
-HIV_DATA = pd.read_csv(f"{PATHS.raw_data}/health/unaids_hiv_data.csv")
+SINK = ChartSink("health")
 
 INDICATORS = {
     "unaids_new_hiv_infections": "New HIV infections",
@@ -14,6 +17,12 @@ INDICATORS = {
 }
 
 
+@cache
+def read_hiv_data() -> pd.DataFrame:
+    """UNAIDS HIV data, read on first use"""
+    return pd.read_csv(f"{PATHS.raw_data}/health/unaids_hiv_data.csv")
+
+
 def _significant_rounding(number: int, significance: int) -> int:
     """round a number to the nearest significance
 
@@ -88,7 +97,7 @@ def create_topic_chart(df: pd.DataFrame) -> None:
         .assign(indicator=lambda x: x.indicator.map(INDICATORS))
     )
 
-    df.to_csv(f"{PATHS.charts}/health/hiv_topic_chart_v2.csv", index=False)
+    SINK.write("hiv_topic_chart_v2.csv", df, download=False)
     logger.debug("Saved live version of 'hiv_topic_chart_v2.csv'")
 
 
@@ -103,10 +112,10 @@ def create_topic_chart_download(df):
         ["entity_name", "indicator_code", "year", "value"],
     ]
 
-    df.to_csv(f"{PATHS.download}/health/hiv_topic_chart_v2.csv", index=False)
+    SINK.write("hiv_topic_chart_v2.csv", df, live=False)
     logger.debug("Saved download version of 'hiv_topic_chart_v2.csv'")
 
 
 if __name__ == "__main__":
-    create_topic_chart(HIV_DATA)
-    create_topic_chart_download(HIV_DATA)
+    create_topic_chart(read_hiv_data())
+    create_topic_chart_download(read_hiv_data())
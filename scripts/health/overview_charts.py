@@ -1,13 +1,15 @@
 import pandas as pd
-from bblocks import WorldBankData, set_bblocks_data_path
+from bblocks import WorldBankData
 
+from scripts.chart_sink import ChartSink
 from scripts.common import clean_wb_overview
-from scripts.config import PATHS
+from scripts.config import configure_data_paths
 from scripts.health.common import get_malaria_data
+from scripts.importers import world_bank_data
 from scripts.logger import logger
 from scripts.owid_covid import tools as owid_tools
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("health")
 
 WORLD_BANK_INDICATORS = {
     "life_expectancy_overview": "SP.DYN.LE00.IN",
@@ -21,6 +23,8 @@ WORLD_BANK_INDICATORS = {
 def update_wb_health_data() -> None:
     """Update World Bank health overview charts"""
 
+    configure_data_paths("bblocks")
+
     # Create object
     wb = WorldBankData()
 
@@ -33,15 +37,9 @@ def update_wb_health_data() -> None:
 def wb_health_charts() -> None:
     """Create World Bank overview charts"""
 
-    wb = WorldBankData()
-
     for name, code in WORLD_BANK_INDICATORS.items():
-        (
-            wb.load_data(code)
-            .get_data(code)
-            .pipe(clean_wb_overview)
-            .to_csv(f"{PATHS.charts}/health/{name}.csv", index=False)
-        )
+        df = world_bank_data(code).pipe(clean_wb_overview)
+        SINK.write(f"{name}.csv", df, download=False)
         logger.debug(f"Saved live version of {name}")
 
 
@@ -49,7 +47,7 @@ def vaccination_chart() -> None:
     """Create vaccination overview chart"""
 
     # covid vaccination overview
-    (
+    df = (
         owid_tools.read_owid_data()
         .loc[lambda d: d["iso_code"].isin(["OWID_WRL", "OWID_AFR"])]
         .pipe(owid_tools.get_indicators_ts, "people_fully_vaccinated_per_hundred")
@@ -58,8 +56,8 @@ def vaccination_chart() -> None:
         .reset_index()
         .dropna(subset=["OWID_AFR", "OWID_WRL"])
         .rename(columns={"OWID_AFR": "Africa", "OWID_WRL": "World"})
-        .to_csv(f"{PATHS.charts}/health/vaccination_overview.csv", index=False)
     )
+    SINK.write("vaccination_overview.csv", df, download=False)
     logger.debug("Saved live version of vaccination_overview.csv")
 
 
@@ -83,5 +81,5 @@ def malaria_chart() -> None:
     )
 
     # Save overview chart
-    df.to_csv(f"{PATHS.charts}/health/malaria_overview.csv", index=False)
+    SINK.write("malaria_overview.csv", df, download=False)
     logger.debug("Saved live version of malaria_overview.csv")
@@ -1,17 +1,18 @@
 import io
 from zipfile import ZipFile
 
-import country_converter as coco
 import pandas as pd
 import requests
-from bblocks import WorldBankData, set_bblocks_data_path
 from bblocks.dataframe_tools import add
 
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import convert_id, converter
 from scripts.health.common import query_who
+from scripts.importers import world_bank_data
 from scripts.logger import logger
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("health")
 DTP_CODE = "WHS4_100"
 
 
@@ -54,22 +55,22 @@ def hiv_topic_chart() -> None:
 
     df_merged = pd.concat([df_africa_region, df_without_africa])
 
-    df_merged.to_csv(f"{PATHS.charts}/health/hiv_topic_chart.csv", index=False)
+    SINK.write("hiv_topic_chart.csv", df_merged)
     logger.debug("Saved live version of 'hiv_topic_chart.csv'")
 
-    df_merged.to_csv(f"{PATHS.download}/health/hiv_topic_chart.csv", index=False)
-    logger.debug("Saved download version of 'hiv_topic_chart.csv'")
-
 
 def malaria_topic_chart() -> None:
     """Create Malaria topic chart"""
 
     code = "MALARIA_EST_DEATHS"
 
-    df = query_who(code)
     regions = {"NGA": "Nigeria", "COD": "DRC", "AFR": "Africa", "GLOBAL": "Global"}
     df = (
-        df.loc[df.SpatialDim.isin(regions), ["SpatialDim", "TimeDim", "NumericValue"]]
+        query_who(
+            code,
+            spatial_dims=list(regions),
+            fields=["SpatialDim", "TimeDim", "NumericValue"],
+        )
         .pivot(index="TimeDim", columns="SpatialDim", values="NumericValue")
         .reset_index()
         .assign(rest=lambda d: d["GLOBAL"] - d["AFR"])
@@ -77,15 +78,14 @@ def malaria_topic_chart() -> None:
         .rename(columns={"rest": "Rest of the world", "TimeDim": "year"})
     )
 
-    df.to_csv(f"{PATHS.charts}/health/malaria_topic_chart.csv", index=False)
-    df.to_csv(f"{PATHS.download}/health/malaria_topic_chart.csv", index=False)
+    SINK.write("malaria_topic_chart.csv", df)
 
 
 def update_dtp_data() -> None:
-    df = query_who(DTP_CODE)
-
-    df = df.loc[df.SpatialDimType == "WORLDBANKINCOMEGROUP"].filter(
-        ["SpatialDim", "TimeDim", "NumericValue"], axis=1
+    df = query_who(
+        DTP_CODE,
+        spatial_type="WORLDBANKINCOMEGROUP",
+        fields=["SpatialDim", "TimeDim", "NumericValue"],
     )
 
     df.to_csv(f"{PATHS.raw_data}/health/who_dtp.csv", index=False)
@@ -110,14 +110,10 @@ def dtp_topic_chart() -> None:
             }
         )
     )
-    # Create live chart version
-    df.to_csv(f"{PATHS.charts}/health/DTP_topic_chart.csv", index=False)
+    # Create live chart and download versions
+    SINK.write("DTP_topic_chart.csv", df)
     logger.debug("Saved live version of 'DTP_topic_chart.csv'")
 
-    # Create download version
-    df.to_csv(f"{PATHS.download}/health/DTP_topic_chart.csv", index=False)
-    logger.debug("Saved download version of 'DTP_topic_chart.csv'")
-
 
 # IHME spending
 def __extract_data() -> pd.DataFrame:
@@ -227,25 +223,18 @@ def ihme_spending_topic_chart() -> None:
 
     # TODO: the dollar pricing is removed. Find a better way to store and communicate prices
 
-    # Create live chart version
-    df.to_csv(f"{PATHS.charts}/health/health_spending_topic_chart.csv", index=False)
+    # Create live chart and download versions
+    SINK.write("health_spending_topic_chart.csv", df)
     logger.debug("Saved live version of 'health_spending_topic_chart.csv'")
 
-    # Create download version
-    df.to_csv(f"{PATHS.download}/health/health_spending_topic_chart.csv", index=False)
-    logger.debug("Saved download version of 'health_spending_topic_chart.csv'")
-
 
 def wb_spending_topic_chart() -> None:
     """Create World Bank health spending topic chart"""
 
-    cc = coco.CountryConverter()
-
-    wb = WorldBankData()
-    wb.load_data("SH.XPD.CHEX.PC.CD")
+    configure_data_paths("bblocks")
 
     df = (
-        wb.get_data()
+        world_bank_data("SH.XPD.CHEX.PC.CD")
         .dropna(subset="value")
         .sort_values("date")
         .groupby("iso_code", as_index=False)
@@ -253,14 +242,14 @@ def wb_spending_topic_chart() -> None:
         .filter(["iso_code", "indicator_code", "value"], axis=1)
         .round(2)
         .assign(
-            country_name=lambda d: coco.CountryConverter().pandas_convert(
-                series=d.iso_code, src="ISO3", to="name_short", not_found=None
+            country_name=lambda d: convert_id(
+                d.iso_code, from_type="ISO3", to_type="name_short"
             )
         )
-        .loc[lambda d: d.iso_code.isin(cc.data.ISO3)]
+        .loc[lambda d: d.iso_code.isin(converter().data.ISO3)]
         .assign(
-            continent=lambda d: coco.CountryConverter().pandas_convert(
-                d.iso_code, to="continent", not_found=None
+            continent=lambda d: convert_id(
+                d.iso_code, from_type=None, to_type="continent"
             )
         )
         .pipe(add.add_income_level_column, "iso_code", id_type="ISO3")
@@ -276,14 +265,10 @@ def wb_spending_topic_chart() -> None:
         )
     )
 
-    # Create live chart version
-    df.to_csv(f"{PATHS.charts}/health/health_expenditure_per_person.csv", index=False)
+    # Create live chart and download versions
+    SINK.write("health_expenditure_per_person.csv", df)
     logger.debug("Saved live version of 'health_expenditure_per_person.csv'")
 
-    # Create download version
-    df.to_csv(f"{PATHS.download}/health/health_expenditure_per_person.csv", index=False)
-    logger.debug("Saved download version of 'health_expenditure_per_person.csv'")
-
 
 if __name__ == "__main__":
     update_dtp_data()
@@ -1,76 +1,166 @@
-from scripts.health import dynamic_text as health_dynamic_text
-from scripts.health import overview_charts as health_overview_charts
+"""Task lists for the health topic.
 
-from scripts.health import topic_charts as health_topic
-from scripts.health import common as health_common
-from scripts.logger import logger
+The chart and data modules are imported when the task lists are built, so importing
+this module stays cheap.
+"""
 
-from scripts.owid_covid import tools as ot
+from scripts.config import PATHS
+from scripts.tasks import Task, run_tasks, wb_cache
 
+# Charts and data files used by the task definitions below
+CHARTS: str = f"{PATHS.charts}/health"
+DOWNLOAD: str = f"{PATHS.download}/health"
+HEALTH_RAW: str = f"{PATHS.raw_data}/health"
+OWID_RAW: str = f"{PATHS.raw_data}/owid_data.feather"
+WHO_MALARIA_RAW: str = f"{HEALTH_RAW}/who_malaria_data.csv"
+WHO_DTP_RAW: str = f"{HEALTH_RAW}/who_dtp.csv"
 
-# --- DAILY UPDATE ---
-def update_daily_health_data() -> None:
-    """Update the underlying OWID health data"""
-    ot.download_owid_data()
-    logger.info("Updated OWID data")
 
+def _wb_health_raw() -> list[str]:
+    """bblocks cache files of the World Bank health indicators"""
+    from scripts.health import overview_charts as health_overview_charts
 
-def update_daily_health_charts() -> None:
-    """Update the charts after having updated the underlying data"""
-    # OWID charts
-    health_overview_charts.vaccination_chart()
+    return wb_cache(health_overview_charts.WORLD_BANK_INDICATORS.values())
 
-    # Overview chart
-    health_dynamic_text.update_dynamic_text()
 
-    # doses
-    health_dynamic_text.doses_dynamic()
+# --- DAILY UPDATE ---
+def daily_health_data_tasks() -> list[Task]:
+    """Update the underlying OWID health data"""
+    from scripts.owid_covid import tools as ot
 
+    return [Task(ot.download_owid_data, outputs=[OWID_RAW])]
 
-# --- MONTHLY UPDATE ---
-def update_monthly_health_data() -> None:
-    """Update data which only changes infrequently"""
-    # World Bank
-    health_overview_charts.update_wb_health_data()
-    health_topic.wb_spending_topic_chart()
 
-    # WHO
-    health_topic.update_dtp_data()
-    health_common.update_malaria_data()
+def daily_health_chart_tasks() -> list[Task]:
+    """Update the charts after having updated the underlying data"""
+    from scripts.health import dynamic_text as health_dynamic_text
+    from scripts.health import overview_charts as health_overview_charts
+
+    return [
+        # OWID charts
+        Task(
+            health_overview_charts.vaccination_chart,
+            inputs=[OWID_RAW],
+            outputs=[f"{CHARTS}/vaccination_overview.csv"],
+        ),
+        # Overview chart
+        Task(
+            health_dynamic_text.update_dynamic_text,
+            inputs=[OWID_RAW, WHO_MALARIA_RAW, *_wb_health_raw()],
+            outputs=[f"{CHARTS}/key_numbers.json"],
+        ),
+        # doses
+        Task(
+            health_dynamic_text.doses_dynamic,
+            inputs=[OWID_RAW],
+            outputs=[f"{CHARTS}/key_numbers_doses.json"],
+        ),
+    ]
 
 
-def update_monthly_health_charts() -> None:
+# --- MONTHLY UPDATE ---
+def monthly_health_data_tasks() -> list[Task]:
+    """Update data which only changes infrequently"""
+    from scripts.health import common as health_common
+    from scripts.health import overview_charts as health_overview_charts
+    from scripts.health import topic_charts as health_topic
+
+    return [
+        # World Bank
+        Task(health_overview_charts.update_wb_health_data, outputs=_wb_health_raw()),
+        Task(
+            health_topic.wb_spending_topic_chart,
+            inputs=_wb_health_raw(),
+            outputs=[
+                f"{CHARTS}/health_expenditure_per_person.csv",
+                f"{DOWNLOAD}/health_expenditure_per_person.csv",
+            ],
+        ),
+        # WHO
+        Task(health_topic.update_dtp_data, outputs=[WHO_DTP_RAW]),
+        Task(health_common.update_malaria_data, outputs=[WHO_MALARIA_RAW]),
+    ]
+
+
+def monthly_health_chart_tasks() -> list[Task]:
     """Update health charts which change infrequently"""
-    # World Bank charts
-    # TODO: these should be split into individual functions
-    health_overview_charts.wb_health_charts()
-
-    # TODO: Convert this to a automatic update
-    health_topic.hiv_topic_chart()
-
-    # WHO charts
-    health_topic.dtp_topic_chart()
-    health_overview_charts.malaria_chart()
-    health_topic.malaria_topic_chart()
-
-    # IHME
-    health_topic.ihme_spending_topic_chart()
+    from scripts.health import overview_charts as health_overview_charts
+    from scripts.health import topic_charts as health_topic
+
+    return [
+        # World Bank charts
+        Task(
+            health_overview_charts.wb_health_charts,
+            inputs=_wb_health_raw(),
+            outputs=[
+                f"{CHARTS}/{name}.csv"
+                for name in health_overview_charts.WORLD_BANK_INDICATORS
+            ],
+        ),
+        # TODO: Convert this to a automatic update
+        Task(
+            health_topic.hiv_topic_chart,
+            inputs=[
+                f"{HEALTH_RAW}/aids_region_AIDS-related deaths - All ages.csv",
+                f"{HEALTH_RAW}/aids_region_People living with HIV receiving ART (%).csv",
+            ],
+            outputs=[
+                f"{CHARTS}/hiv_topic_chart.csv",
+                f"{DOWNLOAD}/hiv_topic_chart.csv",
+            ],
+        ),
+        # WHO charts
+        Task(
+            health_topic.dtp_topic_chart,
+            inputs=[WHO_DTP_RAW],
+            outputs=[f"{CHARTS}/DTP_topic_chart.csv", f"{DOWNLOAD}/DTP_topic_chart.csv"],
+        ),
+        Task(
+            health_overview_charts.malaria_chart,
+            inputs=[WHO_MALARIA_RAW],
+            outputs=[f"{CHARTS}/malaria_overview.csv"],
+        ),
+        Task(
+            health_topic.malaria_topic_chart,
+            outputs=[
+                f"{CHARTS}/malaria_topic_chart.csv",
+                f"{DOWNLOAD}/malaria_topic_chart.csv",
+            ],
+        ),
+        # IHME
+        Task(
+            health_topic.ihme_spending_topic_chart,
+            inputs=[
+                f"{HEALTH_RAW}/ihme_health_spending.csv",
+                f"{HEALTH_RAW}/ihme_health_spending_codes.csv",
+            ],
+            outputs=[
+                f"{CHARTS}/health_spending_topic_chart.csv",
+                f"{DOWNLOAD}/health_spending_topic_chart.csv",
+            ],
+        ),
+    ]
+
+
+def daily_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated daily"""
+    return daily_health_data_tasks() + daily_health_chart_tasks()
+
+
+def monthly_tasks() -> list[Task]:
+    """Tasks for the data and charts that are updated monthly"""
+    return monthly_health_data_tasks() + monthly_health_chart_tasks()
 
 
 def update_daily() -> None:
     """Update all data that is updated daily"""
-    update_daily_health_data()
-    update_daily_health_charts()
+    run_tasks(daily_tasks())
 
 
 def update_monthly() -> None:
     """Update all data that is updated monthly"""
-    update_monthly_health_data()
-    update_monthly_health_charts()
+    run_tasks(monthly_tasks())
 
 
 if __name__ == "__main__":
-    update_daily_health_data()
-    update_daily_health_charts()
-    update_monthly_health_data()
-    update_monthly_health_charts()
+    run_tasks(daily_tasks() + monthly_tasks())
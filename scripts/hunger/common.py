@@ -1,18 +1,11 @@
 import datetime
 
-from bblocks import WFPData, set_bblocks_data_path
-
-from scripts.config import PATHS
-
-set_bblocks_data_path(PATHS.bblocks_data)
+from scripts.importers import wfp_session
 
 
 def get_insufficient_food():
     """ """
-    wfp = WFPData()
-    wfp.load_data("insufficient_food")
-    # wfp.update()
-    df = wfp.get_data("insufficient_food")
+    df = wfp_session().get_data("insufficient_food")
 
     return df
 
@@ -4,20 +4,14 @@ import datetime
 import json
 
 import pandas as pd
-from bblocks import WorldBankData, set_bblocks_data_path
 
 from scripts.config import PATHS
 from scripts.hunger.common import aggregate_insufficient_food
 
-set_bblocks_data_path(PATHS.bblocks_data)
-
 
 def stunting() -> dict:
     """Stunting dynamic text"""
 
-    wb = WorldBankData()
-    wb.load_data("SH.STA.STNT.ME.ZS")
-
     df = pd.read_csv(
         f"{PATHS.raw_data}/hunger/SH.STA.STNT.ME.ZS.csv", parse_dates=["date"]
     )
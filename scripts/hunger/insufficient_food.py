@@ -1,21 +1,21 @@
 import pandas as pd
-from bblocks import WFPData, set_bblocks_data_path, add_short_names_column
 from bblocks.dataframe_tools.add import add_population_share_column
 
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
+from scripts.config import configure_data_paths
+from scripts.country_ids import add_short_names_column
+from scripts.importers import wfp_session
 
-set_bblocks_data_path(PATHS.bblocks_data)
+SINK = ChartSink("hunger_topic")
 
 
 def read_world_insufficient_food() -> pd.DataFrame:
-    wfp = WFPData()
-
-    wfp.load_data("insufficient_food")
-
-    return wfp.get_data()
+    return wfp_session().get_data("insufficient_food")
 
 
 def insufficient_food_map() -> None:
+    configure_data_paths("bblocks")
+
     data = read_world_insufficient_food()
 
     data = data.sort_values(["iso_code", "date"]).drop_duplicates(
@@ -42,7 +42,7 @@ def insufficient_food_map() -> None:
     )
 
     # chart version
-    data.to_csv(PATHS.charts + rf"/hunger_topic/insufficient_food.csv", index=False)
+    SINK.write("insufficient_food.csv", data, download=False)
 
 
 if __name__ == "__main__":
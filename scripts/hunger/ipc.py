@@ -5,13 +5,11 @@ from datetime import datetime
 import pandas as pd
 import requests
 from bblocks import format_number
-from country_converter import CountryConverter
 from dateutil.relativedelta import relativedelta
 
 from scripts.common import update_key_number
 from scripts.config import PATHS
-
-convert = CountryConverter()
+from scripts.country_ids import convert_id
 
 BASE_URL: str = "https://api.ipcinfo.org/"
 WEB_URL: str = "https://fsr2av3qi2.execute-api.us-east-1.amazonaws.com/ch/"
@@ -55,8 +53,8 @@ def _build_table(data: list):
         df = pd.concat([df, pd.DataFrame(data_, index=[r])], ignore_index=False)
 
     df = df.assign(
-        country_name=convert.pandas_convert(df.iso2, to="name_short", not_found=None),
-        iso_code=convert.pandas_convert(df.iso2, to="ISO3", not_found=None),
+        country_name=convert_id(df.iso2, from_type=None, to_type="name_short"),
+        iso_code=convert_id(df.iso2, from_type=None, to_type="ISO3"),
         from_date=pd.to_datetime(df.from_date, format="%b %Y"),
         to_date=pd.to_datetime(df.to_date, format="%b %Y"),
     )
@@ -1,22 +1,22 @@
 """Create hunger overview charts for the topic carrousel"""
 
 import pandas as pd
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
 from scripts.common import clean_wb_overview
 from scripts.hunger.common import wb_indicators
 from scripts.hunger.common import aggregate_insufficient_food
 import datetime
 
+SINK = ChartSink("hunger_topic")
+
 
 def wb_charts(indicators: dict) -> None:
     """Create world bank overview charts"""
 
     for code, name in indicators.items():
-        (
-            pd.read_csv(f"{PATHS.raw_data}/hunger/{code}.csv")
-            .pipe(clean_wb_overview)
-            .to_csv(f"{PATHS.charts}/hunger_topic/{name}.csv", index=False)
-        )
+        df = pd.read_csv(f"{PATHS.raw_data}/hunger/{code}.csv").pipe(clean_wb_overview)
+        SINK.write(f"{name}.csv", df, download=False)
 
 
 def insufficient_food_single_measure() -> None:
@@ -40,9 +40,7 @@ def insufficient_food_single_measure() -> None:
     }
 
     df = pd.DataFrame.from_records([d])
-    df.to_csv(
-        f"{PATHS.charts}/hunger_topic/insufficient_food_single_measure.csv", index=False
-    )
+    SINK.write("insufficient_food_single_measure.csv", df, download=False)
 
 
 def update_hunger_overview_charts() -> None:
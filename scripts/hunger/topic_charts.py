@@ -3,11 +3,12 @@
 import datetime
 
 import pandas as pd
-from country_converter import CountryConverter
 
+from scripts.chart_sink import ChartSink
 from scripts.config import PATHS
+from scripts.country_ids import convert_id, converter
 
-coco = CountryConverter()
+SINK = ChartSink("hunger_topic")
 
 
 def ipc_chart() -> None:
@@ -32,16 +33,14 @@ def ipc_chart() -> None:
         .loc[lambda d: d.country_name != "LAC"]
     )
 
-    df.to_csv(f"{PATHS.charts}/hunger_topic/ipc_phases.csv", index=False)
-    df.to_csv(f"{PATHS.download}/hunger_topic/ipc_phases.csv", index=False)
+    SINK.write("ipc_phases.csv", df)
 
 
 def stunting_chart() -> None:
     """Create stunting connected dot chart"""
 
-    country_list = list(coco.data.loc[lambda d: d.continent == "Africa", "ISO3"]) + [
-        "SSA"
-    ]
+    africa = converter().data.loc[lambda d: d.continent == "Africa", "ISO3"]
+    country_list = list(africa) + ["SSA"]
 
     df = pd.read_csv(f"{PATHS.raw_data}/hunger/SH.STA.STNT.ME.ZS.csv")
     df = (
@@ -54,8 +53,11 @@ def stunting_chart() -> None:
         pd.concat([df.first(), df.last()])
         .assign(date=lambda d: pd.to_datetime(d.date).dt.strftime("%Y"))
         .assign(
-            country=lambda d: coco.convert(
-                d.iso_code, to="name_short", not_found="Sub-Saharan Africa"
+            country=lambda d: convert_id(
+                d.iso_code,
+                from_type=None,
+                to_type="name_short",
+                not_found="Sub-Saharan Africa",
             )
         )
         .sort_values(by="value")
@@ -67,8 +69,7 @@ def stunting_chart() -> None:
         )
     )
 
-    df.to_csv(f"{PATHS.charts}/hunger_topic/prevalence_of_stunting.csv", index=False)
-    df.to_csv(f"{PATHS.download}/hunger_topic/prevalence_of_stunting.csv", index=False)
+    SINK.write("prevalence_of_stunting.csv", df)
 
 
 def price_table() -> None:
@@ -155,7 +156,7 @@ def price_table() -> None:
     final.insert(3, "as of", final.pop("as of"))
     final.insert(4, "units", final.pop("units"))
 
-    final.to_csv(f"{PATHS.charts}/hunger_topic/price_table.csv", index=False)
+    SINK.write("price_table.csv", final, download=False)
 
 
 def update_hunger_topic_charts() -> None:
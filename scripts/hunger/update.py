@@ -1,74 +1,177 @@
-"""Update data chats and text for hunger topic"""
+"""Update data chats and text for hunger topic.
 
-import os
+The chart and data modules are imported when the task lists are built, so importing
+this module stays cheap.
+"""
 
-from bblocks import WorldBankData, set_bblocks_data_path
-from bblocks.import_tools.world_bank import PinkSheet
+import os
+from functools import partial
 
-from scripts.config import PATHS
-from scripts.hunger.common import get_insufficient_food, wb_indicators
-from scripts.hunger.dynamic_text import update_hunger_dynamic_text
-from scripts.hunger.insufficient_food import insufficient_food_map
-from scripts.hunger.ipc import IPC, update_ipc_key_numbers
-from scripts.hunger.overview_charts import update_hunger_overview_charts
-from scripts.hunger.topic_charts import update_hunger_topic_charts
+from scripts.config import PATHS, configure_data_paths
 from scripts.logger import logger
+from scripts.tasks import Task, WFP_RAW, run_tasks, wb_cache
 
-set_bblocks_data_path(PATHS.bblocks_data)
+# Charts and data files used by the task definitions below
+CHARTS: str = f"{PATHS.charts}/hunger_topic"
+DOWNLOAD: str = f"{PATHS.download}/hunger_topic"
+HUNGER_RAW: str = f"{PATHS.raw_data}/hunger"
 
 
 # --- DAILY UPDATE ---
 
 
-def update_daily_hunger_data() -> None:
-    """Update daily data for hunger topic"""
+def update_ipc_data() -> None:
+    """Update IPC data"""
+    from scripts.hunger.ipc import IPC
 
-    # update IPC data
     ipc = IPC(api_key=os.environ.get("IPC_API"))
     df = ipc.get_ipc_ch_data()
     df.to_csv(f"{PATHS.raw_data}/hunger/ipc.csv", index=False)
     logger.info("Updated IPC data")
 
-    # update pink sheet
+
+def update_pink_sheet_data() -> None:
+    """Update World Bank Pink Sheet prices"""
+    from bblocks.import_tools.world_bank import PinkSheet
+
+    configure_data_paths("bblocks")
+
     pink_sheet = PinkSheet().load_data(indicator="prices").get_data()
     pink_sheet.to_csv(f"{PATHS.raw_data}/hunger/pink_sheet.csv", index=False)
     logger.info("Updated Pink Sheet data")
 
-    # update WFP data
+
+def update_wfp_data() -> None:
+    """Update WFP insufficient food data"""
+    from scripts.hunger.common import get_insufficient_food
+
     wfp_data = get_insufficient_food()
     wfp_data.to_csv(f"{PATHS.raw_data}/hunger/wfp.csv", index=False)
     logger.info("Updated WFP data")
 
-    insufficient_food_map()
-    update_ipc_key_numbers()
+
+def daily_data_tasks() -> list[Task]:
+    """Tasks to update daily data for hunger topic"""
+    from scripts.hunger.insufficient_food import insufficient_food_map
+    from scripts.hunger.ipc import update_ipc_key_numbers
+
+    return [
+        Task(update_ipc_data, outputs=[f"{HUNGER_RAW}/ipc.csv"]),
+        Task(
+            update_pink_sheet_data,
+            outputs=[
+                f"{PATHS.bblocks_data}/pink_sheet_prices.csv",
+                f"{HUNGER_RAW}/pink_sheet.csv",
+            ],
+        ),
+        Task(update_wfp_data, inputs=[WFP_RAW], outputs=[f"{HUNGER_RAW}/wfp.csv"]),
+        Task(
+            insufficient_food_map,
+            inputs=[WFP_RAW, *wb_cache(["SP.POP.TOTL"], most_recent_only=True)],
+            outputs=[f"{CHARTS}/insufficient_food.csv"],
+        ),
+        Task(update_ipc_key_numbers, outputs=[f"{CHARTS}/ipc_key_numbers.json"]),
+    ]
 
 
 # --- Monthly update ---
 
 
-def update_monthly_hunger_data() -> None:
-    """Update monthly data for hunger topic"""
+def update_wb_indicator(code: str) -> None:
+    """Update a World Bank indicator used by the hunger topic"""
+    from bblocks import WorldBankData
+
+    from scripts.importers import world_bank_data
+
+    configure_data_paths("bblocks")
 
-    for code in wb_indicators:
-        WorldBankData().load_data(code).update_data(reload_data=False)
-        _ = WorldBankData()
-        (
-            _.load_data(code)
-            .get_data(code)
-            .to_csv(f"{PATHS.raw_data}/hunger/{code}.csv", index=False)
+    WorldBankData().load_data(code).update_data(reload_data=False)
+    world_bank_data(code).to_csv(f"{PATHS.raw_data}/hunger/{code}.csv", index=False)
+    logger.info(f"Updated {code} data")
+
+
+def monthly_data_tasks() -> list[Task]:
+    """Tasks to update monthly data for hunger topic"""
+    from scripts.hunger.common import wb_indicators
+
+    return [
+        Task(
+            partial(update_wb_indicator, code),
+            outputs=[*wb_cache([code]), f"{HUNGER_RAW}/{code}.csv"],
+            name=f"hunger.update.update_wb_indicator[{code}]",
         )
-        logger.info(f"Updated {code} data")
+        for code in wb_indicators
+    ]
 
 
 # --- Chart and text update ---
 
 
+def chart_and_text_tasks() -> list[Task]:
+    """Tasks to update all charts and text on hunger page"""
+    from scripts.hunger.common import wb_indicators
+    from scripts.hunger.dynamic_text import update_hunger_dynamic_text
+    from scripts.hunger.overview_charts import (
+        insufficient_food_single_measure,
+        wb_charts,
+    )
+    from scripts.hunger.topic_charts import ipc_chart, price_table, stunting_chart
+
+    return [
+        # Topic charts
+        Task(
+            ipc_chart,
+            inputs=[f"{HUNGER_RAW}/ipc.csv"],
+            outputs=[f"{CHARTS}/ipc_phases.csv", f"{DOWNLOAD}/ipc_phases.csv"],
+        ),
+        Task(
+            stunting_chart,
+            inputs=[f"{HUNGER_RAW}/SH.STA.STNT.ME.ZS.csv"],
+            outputs=[
+                f"{CHARTS}/prevalence_of_stunting.csv",
+                f"{DOWNLOAD}/prevalence_of_stunting.csv",
+            ],
+        ),
+        Task(
+            price_table,
+            inputs=[f"{HUNGER_RAW}/pink_sheet.csv"],
+            outputs=[f"{CHARTS}/price_table.csv"],
+        ),
+        # Overview charts
+        Task(
+            partial(wb_charts, wb_indicators),
+            inputs=[f"{HUNGER_RAW}/{code}.csv" for code in wb_indicators],
+            outputs=[f"{CHARTS}/{name}.csv" for name in wb_indicators.values()],
+            name="hunger.overview_charts.wb_charts",
+        ),
+        Task(
+            insufficient_food_single_measure,
+            inputs=[f"{HUNGER_RAW}/wfp.csv"],
+            outputs=[f"{CHARTS}/insufficient_food_single_measure.csv"],
+        ),
+        # Dynamic text
+        Task(
+            update_hunger_dynamic_text,
+            inputs=[
+                f"{HUNGER_RAW}/ipc.csv",
+                f"{HUNGER_RAW}/SH.STA.STNT.ME.ZS.csv",
+                f"{HUNGER_RAW}/wfp.csv",
+            ],
+            outputs=[f"{CHARTS}/key_numbers.json"],
+        ),
+    ]
+
+
+def update_daily_hunger_data() -> None:
+    """Update daily data for hunger topic"""
+    run_tasks(daily_data_tasks())
+
+
+def update_monthly_hunger_data() -> None:
+    """Update monthly data for hunger topic"""
+    run_tasks(monthly_data_tasks())
+
+
 def update_charts_and_text() -> None:
     """Update all charts and text on hunger page"""
-
-    update_hunger_topic_charts()
-    logger.info("Updated hunger topic charts")
-    update_hunger_overview_charts()
-    logger.info("Updated hunger overview charts")
-    update_hunger_dynamic_text()
-    logger.info("Updated hunger dynamic text")
+    run_tasks(chart_and_text_tasks())
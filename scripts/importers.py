@@ -0,0 +1,247 @@
+"""Shared copies of the bblocks datasets read by many tasks.
+
+Several chart builders read the same bblocks dataset. Each of them used to build
+its own importer and parse the cached files again. The objects below parse a dataset
+the first time it is requested and serve it from memory afterwards. Callers get a
+copy, so they can transform it freely without changing the shared frame.
+
+- `wfp_session()` serves the WFP indicators (replaces `WFPData`).
+- `world_bank_data()` and `weo_data()` serve World Bank and WEO indicators from a
+  pool keyed by (source, indicator, most_recent_only). They return the same frames
+  as `WorldBankData().load_data(...).get_data()` and
+  `WorldEconomicOutlook(...).load_data(...).get_data()`. World Bank csv files
+  already cached by bblocks are read through their Parquet mirror (see
+  `scripts.parquet_mirror`).
+
+A dataset is parsed again if its files change on disk, for example after an update
+task downloads new data. `clear_shared_data()` drops everything and is called by the
+task runner at the end of a run.
+"""
+
+import glob
+import os
+import threading
+
+import pandas as pd
+
+from scripts.config import configure_data_paths
+from scripts.logger import logger
+from scripts.parquet_mirror import read_raw_csv
+
+# WEO release used across the site (its file is tasks.WEO_RAW)
+WEO_VERSION: tuple[int, int] = (2025, 1)
+
+
+def _files_signature(pattern: str) -> tuple:
+    """Name, size and modification time of the files matching `pattern`"""
+
+    signature = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+
+    return tuple(signature)
+
+
+class WFPSession:
+    """WFP indicators parsed once and shared by the tasks of a run.
+
+    It can stand in for a loaded `bblocks.WFPData` object: `get_data(indicator)`
+    returns the same frame, but only the requested indicator is parsed.
+    """
+
+    def __init__(self):
+        self._frames: dict[str, tuple[tuple, pd.DataFrame]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _indicator_lock(self, indicator: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(indicator, threading.Lock())
+
+    @staticmethod
+    def _signature(indicator: str) -> tuple:
+        from bblocks.config import BBPaths
+
+        return _files_signature(f"{BBPaths.wfp_data}/*_{indicator}.csv")
+
+    def get_data(self, indicator: str) -> pd.DataFrame:
+        """A copy of a WFP indicator ("inflation" or "insufficient_food")"""
+
+        configure_data_paths("bblocks")
+
+        # Tasks asking for different indicators do not wait for each other
+        with self._indicator_lock(indicator):
+            signature = self._signature(indicator)
+            cached = self._frames.get(indicator)
+
+            if cached is None or cached[0] != signature:
+                from bblocks import WFPData
+
+                wfp = WFPData()
+                wfp.load_data(indicator)
+                cached = (signature, wfp.get_data(indicator))
+                self._frames[indicator] = cached
+                logger.debug(f"Parsed WFP '{indicator}' data ({len(cached[1])} rows)")
+
+        return cached[1].copy()
+
+    def clear(self, indicator: str | None = None) -> None:
+        """Drop an indicator (or all of them) so it is parsed again on next use"""
+
+        with self._lock:
+            if indicator is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(indicator, None)
+
+
+class ImporterPool:
+    """World Bank and WEO indicators parsed once and shared by the tasks of a run.
+
+    Each (source, indicator, most_recent_only) combination is loaded with bblocks
+    the first time it is requested, and again only if its backing file changes.
+    """
+
+    def __init__(self):
+        self._frames: dict[tuple, tuple[tuple, pd.DataFrame]] = {}
+        self._locks: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._weo_lock = threading.Lock()
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _get(self, key: tuple, path: str, loader) -> pd.DataFrame:
+        """The shared frame for `key`, (re)loaded with `loader` when `path` changed"""
+
+        with self._key_lock(key):
+            signature = _files_signature(path)
+            cached = self._frames.get(key)
+
+            if cached is None or cached[0] != signature:
+                data = loader()
+                # bblocks downloads missing files, so take the signature again
+                cached = (signature or _files_signature(path), data)
+                self._frames[key] = cached
+                logger.debug(f"Loaded {key[0]} '{key[1]}'")
+
+        return cached[1]
+
+    def world_bank(
+        self, indicator: str, most_recent_only: bool = False
+    ) -> pd.DataFrame:
+        """A World Bank indicator, as loaded by `WorldBankData`"""
+        from bblocks import WorldBankData
+        from bblocks.config import BBPaths
+
+        configure_data_paths("bblocks")
+
+        suffix = "most_recent" if most_recent_only else ""
+        path = f"{BBPaths.raw_data}/{indicator}_all_{suffix}.csv"
+
+        def load() -> pd.DataFrame:
+            # Cached indicators are read from their Parquet mirror, which gives the
+            # frame bblocks would parse from the csv
+            if os.path.exists(path):
+                return read_raw_csv(path, parse_dates=["date"])
+            return (
+                WorldBankData()
+                .load_data(indicator, most_recent_only=most_recent_only)
+                .get_data(indicator)
+            )
+
+        return self._get(("world_bank", indicator, most_recent_only), path, load)
+
+    def _weo_importer(self):
+        """A WEO importer holding the parsed release, shared by every indicator"""
+        from bblocks import WorldEconomicOutlook
+        from bblocks.config import BBPaths
+
+        year, release = WEO_VERSION
+        path = f"{BBPaths.raw_data}/weo_{year}_{release}.feather"
+
+        def load():
+            # The release is parsed by the first `load_data` call and then kept
+            return WorldEconomicOutlook(year=year, release=release)
+
+        # Cached like a frame, so a new file on disk gives a new importer
+        return self._get(("weo", "release", False), path, load)
+
+    def weo(self, indicator: str) -> pd.DataFrame:
+        """A WEO indicator with its metadata, as loaded by `WorldEconomicOutlook`"""
+        from bblocks.config import BBPaths
+
+        configure_data_paths("bblocks")
+
+        year, release = WEO_VERSION
+        path = f"{BBPaths.raw_data}/weo_{year}_{release}.feather"
+
+        def load() -> pd.DataFrame:
+            weo = self._weo_importer()
+            # The importer is shared, so indicators are loaded one at a time
+            with self._weo_lock:
+                return weo.load_data(indicator).get_data(indicator, keep_metadata=True)
+
+        return self._get(("weo", indicator, False), path, load)
+
+    def clear(self) -> None:
+        """Drop every indicator so they are loaded again on next use"""
+        with self._lock:
+            self._frames.clear()
+
+
+_wfp_session = WFPSession()
+_importer_pool = ImporterPool()
+
+
+def wfp_session() -> WFPSession:
+    """The WFP session shared by every task in this process"""
+    return _wfp_session
+
+
+def importer_pool() -> ImporterPool:
+    """The World Bank and WEO pool shared by every task in this process"""
+    return _importer_pool
+
+
+def _as_list(indicators: str | list) -> list:
+    return [indicators] if isinstance(indicators, str) else list(indicators)
+
+
+def world_bank_data(
+    indicators: str | list, most_recent_only: bool = False
+) -> pd.DataFrame:
+    """World Bank indicators from the shared pool, in the order requested"""
+
+    frames = [
+        _importer_pool.world_bank(indicator, most_recent_only=most_recent_only)
+        for indicator in dict.fromkeys(_as_list(indicators))
+    ]
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def weo_data(indicators: str | list, keep_metadata: bool = False) -> pd.DataFrame:
+    """WEO indicators from the shared pool, in the order requested"""
+
+    frames = [
+        _importer_pool.weo(indicator)
+        for indicator in dict.fromkeys(_as_list(indicators))
+    ]
+    df = pd.concat(frames, ignore_index=True)
+
+    if not keep_metadata:
+        return df.filter(["iso_code", "name", "indicator", "year", "value"], axis=1)
+
+    return df
+
+
+def clear_shared_data() -> None:
+    """Release every shared dataset"""
+    _wfp_session.clear()
+    _importer_pool.clear()
@@ -0,0 +1,245 @@
+"""Timing, memory and row-count instrumentation for update runs.
+
+`stage` (a context manager) records, for a block of work, the wall and CPU time, the
+peak resident memory of the process, the change in traced memory (when tracemalloc
+is enabled), the number of rows read and written through pandas, and the number of
+bytes written to disk.
+
+The task runner wraps every task (each fetch and chart builder) in a stage. At the
+end of a run the stages are appended to a JSONL run report and written as an
+OpenMetrics file, both next to `scripts_log.log`. They are local history, and are
+not committed.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from scripts.config import PATHS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_PATH: str = f"{PATHS.root_log}/run_report.jsonl"
+METRICS_PATH: str = f"{PATHS.root_log}/run_metrics.prom"
+
+_local = threading.local()
+_hooks_lock = threading.Lock()
+_hooks_installed = False
+
+
+@dataclass
+class StageStats:
+    """Measurements for a single stage of a run"""
+
+    stage: str
+    status: str = "ok"
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float | None = None
+    traced_memory_delta_mb: float | None = None
+    rows_in: int = 0
+    rows_out: int = 0
+    bytes_written: int = 0
+    files_written: list[str] = field(default_factory=list)
+    files_unchanged: list[str] = field(default_factory=list)
+
+
+def _peak_rss_mb() -> float | None:
+    """Peak resident memory of the process so far"""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def _traced_mb() -> float | None:
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.get_traced_memory()[0] / 1024**2
+
+
+def _active_stages() -> list[StageStats]:
+    """Stages open on the current thread (nested stages all get the counts)"""
+    return getattr(_local, "stages", [])
+
+
+def _count_rows(result) -> int:
+    import pandas as pd
+
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values() if isinstance(v, pd.DataFrame))
+    return 0
+
+
+def _wrap_reader(reader):
+    @functools.wraps(reader)
+    def wrapper(*args, **kwargs):
+        result = reader(*args, **kwargs)
+        for stats in _active_stages():
+            stats.rows_in += _count_rows(result)
+        return result
+
+    return wrapper
+
+
+def _wrap_writer(writer):
+    @functools.wraps(writer)
+    def wrapper(df, *args, **kwargs):
+        result = writer(df, *args, **kwargs)
+        path = args[0] if args else kwargs.get("path_or_buf", kwargs.get("path"))
+        is_file = isinstance(path, (str, os.PathLike)) and os.path.isfile(path)
+        for stats in _active_stages():
+            stats.rows_out += len(df)
+            if is_file:
+                stats.bytes_written += os.path.getsize(path)
+                stats.files_written.append(os.path.relpath(path, PATHS.project_dir))
+        return result
+
+    return wrapper
+
+
+def record_output(path: str, changed: bool) -> None:
+    """Count a file written outside the pandas writers (or left as it was)"""
+
+    relative = os.path.relpath(path, PATHS.project_dir)
+    for stats in _active_stages():
+        if changed:
+            stats.bytes_written += os.path.getsize(path)
+            stats.files_written.append(relative)
+        else:
+            stats.files_unchanged.append(relative)
+
+
+def install_io_hooks() -> None:
+    """Count rows and bytes going through the pandas readers and writers"""
+    global _hooks_installed
+
+    import pandas as pd
+
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+
+        for name in ("read_csv", "read_excel", "read_feather", "read_parquet"):
+            setattr(pd, name, _wrap_reader(getattr(pd, name)))
+
+        for name in ("to_csv", "to_feather", "to_parquet"):
+            setattr(pd.DataFrame, name, _wrap_writer(getattr(pd.DataFrame, name)))
+
+        _hooks_installed = True
+
+
+@contextmanager
+def stage(name: str, report: "RunReport | None" = None):
+    """Measure a block of work. The stats are added to `report`, if given"""
+
+    install_io_hooks()
+
+    stats = StageStats(stage=name)
+    if not hasattr(_local, "stages"):
+        _local.stages = []
+    _local.stages.append(stats)
+
+    traced_start = _traced_mb()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+
+    try:
+        yield stats
+    except BaseException:
+        stats.status = "failed"
+        raise
+    finally:
+        stats.wall_seconds = round(time.perf_counter() - wall_start, 3)
+        stats.cpu_seconds = round(time.thread_time() - cpu_start, 3)
+        stats.peak_rss_mb = _peak_rss_mb()
+        if traced_start is not None and (traced_end := _traced_mb()) is not None:
+            stats.traced_memory_delta_mb = round(traced_end - traced_start, 1)
+
+        _local.stages.pop()
+        if report is not None:
+            report.add(stats)
+
+
+class RunReport:
+    """Collects the stages of a run and writes them out at the end"""
+
+    def __init__(self, run_name: str, trace_memory: bool = False):
+        self.run_name = run_name
+        self.started = datetime.now(timezone.utc)
+        self.run_id = f"{run_name}-{self.started:%Y%m%dT%H%M%SZ}"
+        self.stages: list[StageStats] = []
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add(self, stats: StageStats) -> None:
+        with self._lock:
+            self.stages.append(stats)
+
+    def _records(self) -> list[dict]:
+        base = {"run_id": self.run_id, "run": self.run_name}
+        records = [{**base, **asdict(stats)} for stats in self.stages]
+        records.append(
+            {
+                **base,
+                "stage": "total",
+                "started": self.started.isoformat(),
+                "wall_seconds": round(time.perf_counter() - self._wall_start, 3),
+                "peak_rss_mb": _peak_rss_mb(),
+                "stages": len(self.stages),
+                "failed": sum(s.status == "failed" for s in self.stages),
+            }
+        )
+        return records
+
+    def _openmetrics(self, records: list[dict]) -> str:
+        metrics = {
+            "wall_seconds": ("gauge", "Wall clock time of the stage"),
+            "cpu_seconds": ("gauge", "CPU time of the thread running the stage"),
+            "peak_rss_mb": ("gauge", "Peak resident memory of the process"),
+            "traced_memory_delta_mb": ("gauge", "Change in memory traced by Python"),
+            "rows_in": ("gauge", "Rows read through pandas"),
+            "rows_out": ("gauge", "Rows written through pandas"),
+            "bytes_written": ("gauge", "Bytes written to disk through pandas"),
+        }
+
+        lines = []
+        for metric, (kind, help_text) in metrics.items():
+            full_name = f"aftershocks_stage_{metric}"
+            lines += [f"# TYPE {full_name} {kind}", f"# HELP {full_name} {help_text}"]
+            for record in records:
+                if record.get(metric) is None:
+                    continue
+                labels = f'run="{self.run_name}",stage="{record["stage"]}"'
+                lines.append(f"{full_name}{{{labels}}} {record[metric]}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Append the run to the JSONL report and replace the OpenMetrics file"""
+
+        records = self._records()
+
+        with open(REPORT_PATH, "a") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+        with open(METRICS_PATH, "w") as file:
+            file.write(self._openmetrics(records))
@@ -0,0 +1,83 @@
+"""Decode JSON-stat datasets into a frame of their non-empty observations.
+
+`pyjstat` expands a dataset into a row for every cell of the cube (every country x
+counterpart x year for IDS data), builds it from Python lists and leaves the empty
+cells for the caller to drop. Most IDS cells are empty. `read_dataset` instead:
+
+- reads the `value` array (or the sparse `{position: value}` object) into NumPy and
+  keeps only the non-null observations;
+- turns their positions into a category code per dimension (`np.unravel_index`,
+  the last dimension varies fastest, as in JSON-stat);
+- builds every dimension column as a categorical straight from those codes.
+
+Rows come in the order of the cube and columns are named like pyjstat's
+(the dimension labels, or ids), so the frame is pyjstat's output without the empty
+cells, with categorical dimension columns and float values.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _category_labels(dimension: dict) -> list[str]:
+    """The labels of the categories of a dimension, in the order of its index"""
+
+    category = dimension["category"]
+    labels = category.get("label", {})
+    index = category.get("index")
+
+    if index is None:
+        ids = list(labels)[:1]
+    elif isinstance(index, list):
+        ids = index
+    else:
+        ids = sorted(index, key=index.get)
+
+    return [labels.get(id_, id_) for id_ in ids]
+
+
+def _observations(values: list | dict, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Positions in the cube and values of the non-null observations"""
+
+    if isinstance(values, dict):
+        positions = np.fromiter(map(int, values), dtype="int64", count=len(values))
+        numbers = np.array(list(values.values()), dtype="float64")
+        order = np.argsort(positions, kind="stable")
+        positions, numbers = positions[order], numbers[order]
+    else:
+        numbers = np.array(values, dtype="float64")
+        positions = np.arange(len(numbers), dtype="int64")
+
+    present = ~np.isnan(numbers) & (positions < size)
+
+    return positions[present], numbers[present]
+
+
+def read_dataset(data: dict, value: str = "value") -> pd.DataFrame:
+    """The non-empty observations of a JSON-stat dataset (version 1.0 or 2.0)"""
+
+    # A version 1.0 response is a bundle of datasets: read the first one
+    if "class" not in data:
+        data = next(iter(data.values()))
+
+    dimensions = data["dimension"]
+    ids = data.get("id") or dimensions["id"]
+    sizes = data.get("size") or dimensions["size"]
+
+    positions, numbers = _observations(data[value], int(np.prod(sizes)))
+    codes = np.unravel_index(positions, sizes)
+
+    columns = {}
+    for dimension, dimension_codes in zip(ids, codes):
+        name = dimensions[dimension].get("label") or dimension
+        # Labels are not always unique: categories are the distinct labels
+        label_codes, categories = pd.factorize(
+            pd.Index(_category_labels(dimensions[dimension]), dtype=object)
+        )
+        columns[name] = pd.Categorical.from_codes(
+            label_codes[dimension_codes], categories=categories
+        )
+
+    columns[value] = numbers
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,232 @@
+"""Key-number JSON files (overview.json, debt_key_numbers.json...) shared by builders.
+
+Many builders add their indicators to the same JSON file. `update_key_number` used to
+read, update and rewrite the whole file on every call. The store keeps each file in
+memory instead:
+
+- `update(path, new_dict)` merges the new keys into the in-memory document;
+- `read(path)` returns the document with every update made so far;
+- inside `batch()` files are only written when `flush()` is called or the batch
+  ends, once per file. Outside a batch every update is written straight away.
+
+Updates are guarded by a lock, so builders running in parallel can contribute to the
+same file. Files are written atomically (temporary file plus rename).
+
+A document can also be handled as a table with one row per (indicator, entity_id,
+field, value), see `to_table` and `to_document`. Derived documents, like the
+country page summary, are built as projections of that table.
+"""
+
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from scripts.files import atomic_write
+from scripts.logger import logger
+
+KEY_NUMBER_COLUMNS: list[str] = ["indicator", "entity_id", "field", "value"]
+
+
+def _covers(path: str, paths: list[str]) -> bool:
+    """Check whether `path` is one of `paths` or inside one of them"""
+    path = os.path.normpath(path)
+
+    return any(
+        path == os.path.normpath(p) or path.startswith(os.path.normpath(p) + os.sep)
+        for p in paths
+    )
+
+
+class KeyNumberStore:
+    """Key-number documents, read once and written once per batch"""
+
+    def __init__(self):
+        self._documents: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._updated: dict[str, set[str]] = {}
+        self._lock = threading.RLock()
+        self._batches = 0
+
+    def _document(self, path: str) -> dict:
+        path = os.path.normpath(path)
+
+        if path not in self._documents:
+            try:
+                with open(path, "r") as file:
+                    self._documents[path] = json.load(file)
+            except FileNotFoundError:
+                self._documents[path] = {}
+
+        return self._documents[path]
+
+    def read(self, path: str) -> dict:
+        """A copy of a key-number document, including updates not yet written"""
+
+        with self._lock:
+            document = copy.deepcopy(self._document(path))
+            if not self._batches:
+                self._documents.pop(os.path.normpath(path), None)
+
+        return document
+
+    def update(self, path: str, new_dict: dict) -> None:
+        """Replace (or add) the top level keys of `new_dict` in a document"""
+
+        with self._lock:
+            document = self._document(path)
+            for key, value in new_dict.items():
+                document[key] = copy.deepcopy(value)
+            self._dirty.add(os.path.normpath(path))
+
+            if self._batches:
+                updated = self._updated.setdefault(os.path.normpath(path), set())
+                updated.update(new_dict)
+            else:
+                self.flush([path])
+
+    def table(self, path: str) -> pd.DataFrame:
+        """A key-number document as a table (see `to_table`)"""
+        return to_table(self.read(path))
+
+    def updated(self, path: str) -> set[str]:
+        """The indicators of a document updated during the current batch"""
+        with self._lock:
+            return set(self._updated.get(os.path.normpath(path), set()))
+
+    def flush(self, paths: list[str] | None = None) -> list[str]:
+        """Write the documents with pending updates (only those in `paths`, if given).
+
+        Returns the paths that were written.
+        """
+
+        with self._lock:
+            written = [p for p in self._dirty if paths is None or _covers(p, paths)]
+
+            for path in written:
+                with atomic_write(path) as file:
+                    json.dump(self._documents[path], file, indent=4)
+                self._dirty.discard(path)
+                logger.debug(f"Wrote key numbers to '{os.path.basename(path)}'")
+
+            if not self._batches:
+                self._documents.clear()
+
+        return written
+
+    @contextmanager
+    def batch(self):
+        """Hold the writes until the end of the block (or an explicit `flush`)"""
+
+        with self._lock:
+            self._batches += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batches -= 1
+                if not self._batches:
+                    # The next batch reads the files again
+                    self.flush()
+                    self._updated.clear()
+
+
+def to_table(document: dict) -> pd.DataFrame:
+    """Flatten a key-number document into (indicator, entity_id, field, value) rows.
+
+    Rows keep the order of the document.
+    """
+
+    rows = [
+        (indicator, entity_id, field, value)
+        for indicator, entities in document.items()
+        for entity_id, fields in entities.items()
+        for field, value in fields.items()
+    ]
+
+    return pd.DataFrame(rows, columns=KEY_NUMBER_COLUMNS).astype(
+        {"indicator": "category", "entity_id": "str", "field": "category"}
+    )
+
+
+def to_document(table: pd.DataFrame) -> dict:
+    """Nest a key-number table into {indicator: {entity_id: {field: value}}}"""
+
+    document: dict = {}
+    for indicator, entity_id, field, value in zip(
+        *(table[column].tolist() for column in KEY_NUMBER_COLUMNS)
+    ):
+        document.setdefault(indicator, {}).setdefault(entity_id, {})[field] = value
+
+    return document
+
+
+def summary_projection(table: pd.DataFrame, ids: pd.Series) -> pd.DataFrame:
+    """Key numbers re-keyed by ISO3 code, with a row for every country.
+
+    `ids` maps the names used in `table` (its index) to ISO3 codes. For each
+    indicator, the countries in `ids` are keyed by their code and get an `info`
+    field: "" when they have data and "display-none" when they do not. Entities
+    which are not in `ids` (regions, other countries) are kept as they are, before
+    the countries, which follow the order of `ids`.
+    """
+
+    indicators = table.indicator.unique()
+    rank = pd.Series(range(len(ids)), index=ids.index)
+
+    known = table.entity_id.isin(ids.index)
+    others = table.loc[~known].assign(block=0, order=range((~known).sum()))
+
+    # Countries with data: re-keyed, and flagged as shown
+    present = table.loc[known & (table.field != "info")].assign(
+        block=1, order=lambda d: d.entity_id.map(rank)
+    )
+    shown = present.drop_duplicates(["indicator", "entity_id"]).assign(
+        field="info", value=""
+    )
+
+    # Countries without data: a single field that hides them
+    grid = pd.MultiIndex.from_product(
+        [indicators, ids.index], names=["indicator", "entity_id"]
+    ).to_frame(index=False)
+    hidden = (
+        grid.merge(
+            present[["indicator", "entity_id"]].drop_duplicates(),
+            how="left",
+            indicator=True,
+        )
+        .loc[lambda d: d._merge == "left_only"]
+        .drop(columns="_merge")
+        .assign(
+            field="info",
+            value="display-none",
+            block=1,
+            order=lambda d: d.entity_id.map(rank),
+        )
+    )
+
+    countries = pd.concat([present, shown, hidden], ignore_index=True).assign(
+        entity_id=lambda d: d.entity_id.map(ids)
+    )
+
+    position = {indicator: i for i, indicator in enumerate(indicators)}
+
+    return (
+        pd.concat([others, countries], ignore_index=True)
+        .assign(indicator_order=lambda d: d.indicator.map(position).astype(int))
+        .sort_values(["indicator_order", "block", "order"], kind="stable")
+        .filter(KEY_NUMBER_COLUMNS, axis=1)
+        .reset_index(drop=True)
+    )
+
+
+_store = KeyNumberStore()
+
+
+def key_number_store() -> KeyNumberStore:
+    """The key-number store shared by every builder in this process"""
+    return _store
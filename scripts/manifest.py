@@ -0,0 +1,191 @@
+"""Build manifest used to skip tasks whose inputs and code have not changed.
+
+For every task that ran successfully, the manifest stores a fingerprint made of:
+
+- the content hash of each declared input, and of the `SHARED_INPUTS` which many
+  builders read through shared helpers;
+- the hash of the source of the module that defines the task function and of every
+  `scripts` module it imports, directly or not (a change to a shared helper such as
+  `scripts.common` also invalidates the tasks that use it).
+
+On the next run, a task with the same fingerprint whose outputs all exist is
+skipped. The manifest is a local cache and is not committed: a fresh checkout
+rebuilds everything.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import threading
+from functools import cache, partial
+
+from scripts.config import PATHS
+
+MANIFEST_PATH: str = f"{PATHS.root_log}/build_manifest.json"
+
+# Reference data read by most builders (regions and country groups through
+# `scripts.common`)
+SHARED_INPUTS: list[str] = [f"{PATHS.raw_data}/wb_groupings.csv"]
+
+_CHUNK_SIZE: int = 1 << 20
+
+
+def _module_path(module: str) -> str | None:
+    """The source file of a `scripts` module, if there is one"""
+
+    base = os.path.join(PATHS.project_dir, *module.split("."))
+    for path in (f"{base}.py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+@cache
+def _imported_modules(path: str) -> tuple[str, ...]:
+    """The `scripts` modules imported anywhere in a source file (functions included)"""
+
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), filename=path)
+
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+            # `from scripts.oda import common` imports a module
+            modules += [f"{node.module}.{alias.name}" for alias in node.names]
+
+    return tuple(m for m in modules if m == "scripts" or m.startswith("scripts."))
+
+
+def source_files(module: str) -> list[str]:
+    """The source files of a module and of the `scripts` modules it imports"""
+
+    seen: dict[str, None] = {}
+    pending = [module]
+
+    while pending:
+        name = pending.pop()
+        path = _module_path(name)
+        if path is None or path in seen:
+            continue
+        seen[path] = None
+        pending += _imported_modules(path)
+        # Importing a module runs the `__init__` of its packages
+        pending.append(name.rpartition(".")[0])
+
+    return sorted(seen)
+
+
+class BuildManifest:
+    """Fingerprints of the last successful run of each task"""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # (path, size, mtime) -> content hash, so shared inputs are hashed once
+        self._file_hashes: dict[tuple, str] = {}
+
+        try:
+            with open(path, "r") as file:
+                self.entries: dict[str, dict] = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def _hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            if key in self._file_hashes:
+                return self._file_hashes[key]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            while chunk := file.read(_CHUNK_SIZE):
+                digest.update(chunk)
+
+        with self._lock:
+            self._file_hashes[key] = digest.hexdigest()
+
+        return digest.hexdigest()
+
+    def _hash_path(self, path: str) -> str:
+        """Content hash of a file, or of every file inside a folder"""
+
+        if os.path.isfile(path):
+            return self._hash_file(path)
+
+        if not os.path.isdir(path):
+            return "missing"
+
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            # Hidden folders and files are derived (Parquet mirrors, temporary files)
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(f for f in files if not f.startswith(".")):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(self._hash_file(file_path).encode())
+
+        return digest.hexdigest()
+
+    def code_version(self, func) -> str:
+        """Hash of the module defining the task function and the modules it uses"""
+
+        while isinstance(func, partial):
+            func = func.func
+
+        module = getattr(func, "__module__", None)
+        if module and _module_path(module):
+            files = source_files(module)
+        else:
+            try:
+                files = [inspect.getsourcefile(func)]
+            except TypeError:
+                return "unknown"
+
+        digest = hashlib.sha256()
+        for path in files:
+            try:
+                file_hash = self._hash_file(path)
+            except (TypeError, OSError):
+                return "unknown"
+            digest.update(os.path.relpath(path, PATHS.project_dir).encode())
+            digest.update(file_hash.encode())
+
+        return digest.hexdigest()
+
+    def fingerprint(self, task) -> dict:
+        # Paths are stored relative to the project so the manifest is portable
+        return {
+            "code": self.code_version(task.func),
+            "inputs": {
+                os.path.relpath(path, PATHS.project_dir): self._hash_path(path)
+                for path in sorted({*task.inputs, *SHARED_INPUTS})
+            },
+        }
+
+    def is_up_to_date(self, task, fingerprint: dict) -> bool:
+        """Check whether a task can be skipped"""
+
+        return (
+            self.entries.get(task.name) == fingerprint
+            and all(os.path.exists(path) for path in task.outputs)
+        )
+
+    def record(self, task, fingerprint: dict) -> None:
+        with self._lock:
+            self.entries[task.name] = fingerprint
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous file in a single step"""
+
+        temp_path = f"{self.path}.tmp"
+        with self._lock, open(temp_path, "w") as file:
+            json.dump(self.entries, file, indent=2, sort_keys=True)
+
+        os.replace(temp_path, self.path)
@@ -1,14 +1,20 @@
+import os
+from functools import cache, lru_cache
+
 import numpy as np
 import pandas as pd
-from bblocks import convert_id, format_number
+import pyarrow as pa
+import pyarrow.parquet as pq
+from bblocks import format_number
 from oda_data import provider_groupings
 from oda_data.clean_data.common import dac_deflate
 
-from pydeflate import deflate, set_pydeflate_path
-from scripts.config import PATHS
-
+from pydeflate import deflate
+from scripts.config import PATHS, configure_data_paths
+from scripts.country_ids import convert_id
+from scripts.files import atomic_write, file_digest
+from scripts.parquet_mirror import read_raw_csv
 
-set_pydeflate_path(PATHS.raw_data)
 
 # Define a year for the constant price calculations
 CONSTANT_YEAR: int = 2024
@@ -16,8 +22,16 @@ CONSTANT_YEAR: int = 2024
 # Start year for the timeseries charts
 START_YEAR: int = 2010
 
-# DAC codes for the members of the DAC
-DAC = list(provider_groupings()["dac_members"])
+
+@cache
+def _dac_members() -> tuple:
+    return tuple(provider_groupings()["dac_members"])
+
+
+def dac_members() -> list[int]:
+    """DAC codes for the members of the DAC"""
+    return list(_dac_members())
+
 
 # How to group sectors into more aggregated categories
 SECTORS_MAPPING: dict = {
@@ -123,66 +137,90 @@ SECTORS_MAPPING: dict = {
     ],
 }
 
+# Position of each sector in SECTORS_MAPPING, for integer lookups
+SECTOR_GROUPS: list[str] = list(SECTORS_MAPPING)
+_SECTOR_GROUP: dict = {
+    sector: position
+    for position, sectors in enumerate(SECTORS_MAPPING.values())
+    for sector in sectors
+    if isinstance(sector, str)
+}
+# Sectors without a name are part of "Other Sectors"
+_MISSING_SECTOR_GROUP: int = SECTOR_GROUPS.index("Other Sectors")
+
 
 def read_total_oda(official_definition: bool = True) -> pd.DataFrame:
     """Read the csv containing total ODA data.
     This CSV is generated in another repository. Eventually this should
     be replaced by a connection to our database
     """
-    flow = pd.read_csv(f"{PATHS.raw_oda}/total_oda_flow.csv", parse_dates=["year"])
-    ge = pd.read_csv(f"{PATHS.raw_oda}/total_oda_ge.csv", parse_dates=["year"])
+    dac = [("donor_code", "in", dac_members())]
 
-    # Filter dataframe to keep only the 'official definition' of ODA in a given year
+    # Keep only the 'official definition' of ODA in a given year
     # This means GE from 2018 and Flow before then.
-    if official_definition:
-        flow = flow.loc[flow.year.dt.year < 2018]
-        ge = ge.loc[ge.year.dt.year >= 2018]
+    flow_years = [("year", "<", 2018)] if official_definition else []
+    ge_years = [("year", ">=", 2018)] if official_definition else []
 
-    return pd.concat([flow, ge], ignore_index=True).loc[
-        lambda d: d.donor_code.isin(DAC)
-    ]
+    flow = read_raw_csv(
+        f"{PATHS.raw_oda}/total_oda_flow.csv",
+        filters=dac + flow_years,
+        parse_dates=["year"],
+    )
+    ge = read_raw_csv(
+        f"{PATHS.raw_oda}/total_oda_ge.csv",
+        filters=dac + ge_years,
+        parse_dates=["year"],
+    )
+
+    return pd.concat([flow, ge], ignore_index=True)
 
 
 def read_oda_gni() -> pd.DataFrame:
     """Read the csv containing ODA/GNI data"""
 
-    return pd.read_csv(f"{PATHS.raw_oda}/oda_gni.csv", parse_dates=["year"])
+    return read_raw_csv(f"{PATHS.raw_oda}/oda_gni.csv", parse_dates=["year"])
 
 
 def read_oda_africa() -> pd.DataFrame:
     """Read the csv containing ODA to Africa data"""
 
-    return pd.read_csv(
-        f"{PATHS.raw_oda}/total_oda_to_africa.csv", parse_dates=["year"]
-    ).loc[lambda d: d.donor_code.isin(DAC)]
+    return read_raw_csv(
+        f"{PATHS.raw_oda}/total_oda_to_africa.csv",
+        filters=[("donor_code", "in", dac_members())],
+        parse_dates=["year"],
+    )
 
 
 def read_oda_by_income() -> pd.DataFrame:
     """Read the csv containing ODA by income group data"""
 
-    return pd.read_csv(
-        f"{PATHS.raw_oda}/total_oda_by_income.csv", parse_dates=["year"]
-    ).loc[lambda d: d.donor_code.isin(DAC + [20001])]
+    return read_raw_csv(
+        f"{PATHS.raw_oda}/total_oda_by_income.csv",
+        filters=[("donor_code", "in", dac_members() + [20001])],
+        parse_dates=["year"],
+    )
 
 
 def read_gni() -> pd.DataFrame:
     """Read the csv containing GNI data"""
 
-    return pd.read_csv(f"{PATHS.raw_oda}/gni.csv", parse_dates=["year"]).loc[
-        lambda d: d.donor_code.isin(DAC)
-    ]
+    return read_raw_csv(
+        f"{PATHS.raw_oda}/gni.csv",
+        filters=[("donor_code", "in", dac_members())],
+        parse_dates=["year"],
+    )
 
 
 def read_sectors() -> pd.DataFrame:
-    df = (
-        pd.read_csv(f"{PATHS.raw_oda}/sectors_view.csv", parse_dates=["year"])
-        .astype({"donor_code": "Int16"})
-        .loc[lambda d: d.donor_code.isin(DAC)]
-    )
+    df = read_raw_csv(
+        f"{PATHS.raw_oda}/sectors_view.csv",
+        filters=[("donor_code", "in", dac_members())],
+        parse_dates=["year"],
+    ).astype({"donor_code": "Int16"})
 
     # df = df.loc[
     #    lambda d: (d.currency == "usd")
-    #    & (d.donor_code.isin(DAC))
+    #    & (d.donor_code.isin(dac_members()))
     #    & (d.prices == "current")
     #    & (d.recipient.isin(["Africa", "LDCs", "All Developing Countries"]))
     # ].filter(
@@ -193,10 +231,214 @@ def read_sectors() -> pd.DataFrame:
     return df
 
 
+@cache
+def _purpose_sectors() -> tuple[np.ndarray, list, list]:
+    """The sector of every purpose code (a position in the lists returned, -1 for
+    none), the sector names and their broad sector names, as defined by oda_data"""
+    from oda_data.tools.sector_lists import (
+        get_broad_sector_groups,
+        get_sector_groups,
+    )
+
+    groups = get_sector_groups()
+    broad = get_broad_sector_groups()
+
+    codes = [code for purpose_codes in groups.values() for code in purpose_codes]
+    lookup = np.full(max(codes) + 1, -1, dtype="int16")
+    # Later groups take precedence, as in oda_data's `add_sectors`
+    for position, purpose_codes in enumerate(groups.values()):
+        lookup[purpose_codes] = position
+
+    names = list(groups)
+
+    return lookup, names, [broad.get(name, name) for name in names]
+
+
+def _purpose_positions(purpose_code: pd.Series) -> np.ndarray:
+    """Position of the sector of each purpose code (-1 if it has none)"""
+
+    lookup, _, _ = _purpose_sectors()
+
+    codes = purpose_code.to_numpy(dtype="float64", na_value=np.nan)
+    known = (codes >= 0) & (codes < len(lookup))  # False for missing codes
+
+    positions = np.full(len(codes), -1, dtype="int16")
+    positions[known] = lookup[codes[known].astype("int64")]
+
+    return positions
+
+
+def add_broad_sectors(data: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the data by broad sector, like oda_data's `add_broad_sectors`.
+
+    The broad sector of each row is looked up in a precomputed purpose code array
+    instead of being matched group by group.
+    """
+    _, _, broad = _purpose_sectors()
+
+    # Position -1 (no sector) picks the last, empty, slot
+    broad_names = np.array([*broad, np.nan], dtype=object)
+    data = data.assign(
+        broad_sector=broad_names[_purpose_positions(data.purpose_code)]
+    ).drop(columns="purpose_code")
+    data["broad_sector"] = data["broad_sector"].fillna("Unallocated/ Unspecified")
+
+    return (
+        data.groupby(
+            [c for c in data.columns if c != "value"], observed=True, dropna=False
+        )
+        .sum(numeric_only=True)
+        .loc[lambda d: d["value"] != 0]
+        .reset_index(drop=False)
+        .rename(columns={"broad_sector": "purpose_name"})
+    )
+
+
+def index_sectors(df: pd.DataFrame) -> pd.DataFrame:
+    """The sectors view with categorical recipient, purpose and sector columns,
+    indexed by (recipient, donor_code, year)"""
+
+    df = df.rename(columns={"recipient_name": "recipient"})
+
+    if "sector" not in df.columns:
+        _, names, _ = _purpose_sectors()
+        positions = _purpose_positions(df.purpose_code)
+        df = df.assign(sector=pd.Categorical.from_codes(positions, names))
+
+    categorical = ["recipient", "purpose_name", "sector"]
+
+    return (
+        df.astype({c: "category" for c in categorical if c in df.columns})
+        .set_index(["recipient", "donor_code", "year"])
+        .sort_index()
+    )
+
+
+@lru_cache(maxsize=1)
+def _sectors_table(digest: str | None) -> pd.DataFrame:
+    return index_sectors(read_sectors())
+
+
+def sectors_table() -> pd.DataFrame:
+    """The sectors view (see `index_sectors`), read once per version of the file"""
+    return _sectors_table(_sectors_view_digest()).copy()
+
+
+def recipient_sectors(recipient: str) -> pd.DataFrame:
+    """The rows of the sectors table for a recipient (an index lookup)"""
+
+    table = sectors_table()
+    if recipient not in table.index.get_level_values("recipient"):
+        return table.iloc[:0]
+
+    return table.xs(recipient, level="recipient", drop_level=False)
+
+
+def build_sector_cube(table: pd.DataFrame) -> pd.DataFrame:
+    """Aid by year, donor, recipient, broad sector and sector group.
+
+    `table` is the sectors table (see `index_sectors`). Broad sectors are those of
+    oda_data, sector groups the keys of SECTORS_MAPPING. The cube also has:
+
+    - an "All Developing Countries" recipient, the sum of every recipient;
+    - a "DAC Countries, Total" donor (code 20001), the sum of every donor but the
+      EU Institutions (918);
+    - `recipient_total`, the aid of the donor to the recipient in the year across
+      all sectors, which is the denominator of sector shares.
+    """
+
+    _, names, broad = _purpose_sectors()
+    df = table.reset_index()
+
+    # Position -1 (no sector, or no group) picks the last, empty, slot
+    broad_names = np.array([*broad, np.nan], dtype=object)
+    group_names = np.array([*SECTOR_GROUPS, np.nan], dtype=object)
+
+    df = pd.DataFrame(
+        {
+            "year": df.year.dt.year.astype("int16"),
+            "donor_code": df.donor_code.astype("int32"),
+            "recipient": df.recipient.astype(object),
+            "broad_sector": broad_names[_purpose_positions(df.purpose_code)],
+            "sector_group": group_names[sector_groups(df.sector)],
+            "value": df.value,
+        }
+    ).fillna({"broad_sector": "Unallocated/ Unspecified"})
+
+    keys = ["year", "donor_code", "recipient", "broad_sector", "sector_group"]
+
+    def total(data: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+        return data.groupby(by, as_index=False, dropna=False, sort=False)["value"].sum()
+
+    cube = total(df, keys)
+    all_recipients = total(cube, [k for k in keys if k != "recipient"]).assign(
+        recipient="All Developing Countries"
+    )
+    cube = pd.concat([cube, all_recipients], ignore_index=True)
+
+    dac_total = total(
+        cube.loc[lambda d: d.donor_code != 918], [k for k in keys if k != "donor_code"]
+    ).assign(donor_code=20001)
+    cube = pd.concat([cube, dac_total], ignore_index=True)
+
+    cube["recipient_total"] = cube.groupby(["year", "donor_code", "recipient"])[
+        "value"
+    ].transform("sum")
+
+    return (
+        cube.filter([*keys, "value", "recipient_total"], axis=1)
+        .sort_values(keys, kind="stable")
+        .astype({"donor_code": "int32"})
+        .astype({c: "category" for c in ("recipient", "broad_sector", "sector_group")})
+        .reset_index(drop=True)
+    )
+
+
+def _sector_cube_path() -> str:
+    return f"{PATHS.raw_oda}/sectors_cube.parquet"
+
+
+def _sectors_view_digest() -> str | None:
+    return file_digest(f"{PATHS.raw_oda}/sectors_view.csv")
+
+
+def save_sector_cube() -> None:
+    """Materialize the sector cube of the current sectors view"""
+
+    table = pa.Table.from_pandas(
+        build_sector_cube(sectors_table()), preserve_index=False
+    )
+    # The cube records the version of the view it was built from
+    metadata = {**table.schema.metadata, b"source": _sectors_view_digest().encode()}
+
+    with atomic_write(_sector_cube_path(), "wb") as file:
+        pq.write_table(table.replace_schema_metadata(metadata), file)
+
+
+@lru_cache(maxsize=1)
+def _sector_cube(digest: str | None) -> pd.DataFrame:
+    path = _sector_cube_path()
+
+    if os.path.exists(path):
+        source = (pq.read_schema(path).metadata or {}).get(b"source")
+        if digest is not None and source == digest.encode():
+            return pd.read_parquet(path)
+
+    # The view changed since the cube was saved (or it never was)
+    return build_sector_cube(sectors_table())
+
+
+def sector_cube() -> pd.DataFrame:
+    """The sector cube (see `build_sector_cube`) of the current sectors view"""
+    return _sector_cube(_sectors_view_digest()).copy()
+
+
 def read_oda_by_region() -> pd.DataFrame:
-    return pd.read_csv(
-        f"{PATHS.raw_oda}/total_oda_by_region.csv", parse_dates=["year"]
-    ).loc[lambda d: d.donor_code.isin(DAC + [20001])]
+    return read_raw_csv(
+        f"{PATHS.raw_oda}/total_oda_by_region.csv",
+        filters=[("donor_code", "in", dac_members() + [20001])],
+        parse_dates=["year"],
+    )
 
 
 def total_by_region(df: pd.DataFrame) -> pd.DataFrame:
@@ -224,6 +466,8 @@ def append_dac_total(df: pd.DataFrame, grouper=None) -> pd.DataFrame:
 def add_constant_change_column(df: pd.DataFrame, base: int) -> pd.DataFrame:
     """Add a column with the change in constant terms"""
 
+    configure_data_paths("oda_data", "pydeflate")
+
     df_constant = dac_deflate(
         df,
         base_year=base,
@@ -277,52 +521,59 @@ def add_short_names(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
-def filter_health_sectors(df: pd.DataFrame) -> pd.DataFrame:
-    return df.loc[lambda d: d.sector.isin(SECTORS_MAPPING["Health"])].reset_index(
-        drop=True
+def sector_groups(sector: pd.Series) -> np.ndarray:
+    """Position in SECTORS_MAPPING of the group of each sector (-1 if none)"""
+
+    sector = sector.astype("category")
+    lookup = np.array(
+        [_SECTOR_GROUP.get(name, -1) for name in sector.cat.categories]
+        + [_MISSING_SECTOR_GROUP],
+        dtype="int8",
     )
 
+    # Missing sectors have the code -1, which picks the last slot
+    return lookup[sector.cat.codes.to_numpy()]
 
-def filter_humanitarian_sectors(df: pd.DataFrame) -> pd.DataFrame:
-    return df.loc[lambda d: d.sector.isin(SECTORS_MAPPING["Humanitarian"])].reset_index(
+
+def _filter_sector_group(df: pd.DataFrame, group: str) -> pd.DataFrame:
+    return df.loc[sector_groups(df.sector) == SECTOR_GROUPS.index(group)].reset_index(
         drop=True
     )
 
 
+def filter_health_sectors(df: pd.DataFrame) -> pd.DataFrame:
+    return _filter_sector_group(df, "Health")
+
+
+def filter_humanitarian_sectors(df: pd.DataFrame) -> pd.DataFrame:
+    return _filter_sector_group(df, "Humanitarian")
+
+
 def filter_food_sectors(df: pd.DataFrame) -> pd.DataFrame:
-    return df.loc[
-        lambda d: d.sector.isin(
-            SECTORS_MAPPING["Developmental Food Aid/Food Security Assistance"]
-        )
-    ].reset_index(drop=True)
+    return _filter_sector_group(
+        df, "Developmental Food Aid/Food Security Assistance"
+    )
+
 
+def aid_to_sector_ts(sector_group: str) -> pd.DataFrame:
+    """DAC aid to all developing countries for a group of SECTORS_MAPPING, with its
+    share of the aid to all sectors"""
 
-def aid_to_sector_ts(filter_function: callable) -> pd.DataFrame:
-    all_sectors = (
-        read_sectors()
+    configure_data_paths("oda_data", "pydeflate")
+
+    return (
+        sector_cube()
         .loc[
-            lambda d: (d.donor_code != 918)
+            lambda d: (d.donor_code == 20001)
             & (d.recipient == "All Developing Countries")
+            & (d.sector_group == sector_group)
         ]
-        .groupby(["year", "recipient"], as_index=False)["value"]
-        .sum()
-        .filter(["year", "value"], axis=1)
-    )
-
-    return (
-        read_sectors()
-        .pipe(filter_function)
-        .loc[lambda d: d.recipient == "All Developing Countries"]
-        .groupby(["year", "donor_code"], as_index=False)["value"]
+        .groupby(["year", "donor_code", "recipient_total"], as_index=False)["value"]
         .sum()
-        .pipe(append_dac_total, grouper=["year"])
         .pipe(add_short_names)
-        .loc[lambda d: d.name == "DAC Countries, Total"]
-        .merge(all_sectors, on=["year"], how="left", suffixes=("", "_all"))
         .assign(
-            year=lambda d: d.year.dt.year,
             share=lambda d: format_number(
-                d.value / d.value_all, decimals=1, as_percentage=True
+                d.value / d.recipient_total, decimals=1, as_percentage=True
             ),
         )
         .assign(
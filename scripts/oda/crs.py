@@ -0,0 +1,150 @@
+"""Read slices of the CRS (one recipient, a few providers...) without loading it all.
+
+`CRSData(...).read(using_bulk_download=True)` goes through the whole CRS bulk file
+that oda_data downloads to its own cache folder. `read_crs` reads a per-year copy of
+it instead:
+
+- the bulk file is split once into one Parquet file per year (in `raw_data/oda/.crs`),
+  sorted by recipient and provider and written in small row groups. The split is
+  reused between runs and redone when oda_data downloads a new bulk file;
+- year, provider and recipient filters and the column projection are pushed down
+  into a pyarrow dataset scan, so only the row groups of the requested recipients
+  and the requested columns are decoded.
+
+As `CRSData` does, rows reporting core contributions to multilateral organisations
+(`bi_multi` 2) are dropped.
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scripts.config import PATHS, configure_data_paths
+from scripts.files import atomic_write
+from scripts.logger import logger
+
+# Per-year copies of the CRS bulk file
+CRS_YEARS: str = f"{PATHS.raw_oda}/.crs"
+
+# Key of the bulk file version in the schema metadata of the yearly files
+_METADATA_KEY: bytes = b"crs_bulk"
+
+# Rows per row group of the yearly files. Small groups let recipient filters skip
+# most of a year.
+_ROW_GROUP_SIZE: int = 16_000
+
+_lock = threading.Lock()
+
+
+def _bulk_version(path: str) -> bytes:
+    # The bulk file is too large to hash on every read, and is only ever replaced
+    stats = os.stat(path)
+    return f"{stats.st_size}-{stats.st_mtime_ns}".encode()
+
+
+def _ensure_bulk() -> str:
+    """The path of the CRS bulk file, downloaded by oda_data if needed"""
+
+    configure_data_paths("oda_data")
+    from oda_data import CRSData
+
+    crs = CRSData(years=[2020], recipients=[85])
+
+    # oda_data keeps the bulk file in its own cache folder, not in PATHS
+    path = str(crs.bulk_cache.base_dir / "CRSData_bulk.parquet")
+
+    if not os.path.exists(path):
+        crs.read(using_bulk_download=True, columns=["year"])
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"oda_data did not save the CRS bulk file at {path}")
+
+    return path
+
+
+def _year_path(year: int) -> str:
+    return f"{CRS_YEARS}/crs_{year}.parquet"
+
+
+def _is_current(path: str, version: bytes) -> bool:
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except FileNotFoundError:
+        return False
+
+    return metadata.get(_METADATA_KEY) == version
+
+
+def _split_year(bulk: ds.Dataset, year: int, version: bytes) -> None:
+    """Save the rows of one year of the bulk file, sorted by recipient and provider"""
+
+    table = bulk.to_table(filter=ds.field("year") == year)
+    table = table.sort_by(
+        [("recipient_code", "ascending"), ("donor_code", "ascending")]
+    )
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _METADATA_KEY: version}
+    )
+
+    with atomic_write(_year_path(year), "wb") as file:
+        pq.write_table(table, file, row_group_size=_ROW_GROUP_SIZE)
+
+    logger.debug(f"Saved {table.num_rows} CRS rows for {year}")
+
+
+def _year_files(years: list[int]) -> list[str]:
+    """The yearly files for `years`, split from the current bulk file if needed"""
+
+    with _lock:
+        path = _ensure_bulk()
+        version = _bulk_version(path)
+
+        stale = [year for year in years if not _is_current(_year_path(year), version)]
+        if stale:
+            bulk = ds.dataset(path, format="parquet")
+            for year in stale:
+                _split_year(bulk, year, version)
+
+    return [_year_path(year) for year in years]
+
+
+def _codes(values: list[int] | range | int | None) -> list[int] | None:
+    if values is None:
+        return None
+    return [values] if isinstance(values, int) else list(values)
+
+
+def read_crs(
+    years: list[int] | range | int,
+    providers: list[int] | int | None = None,
+    recipients: list[int] | int | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """CRS rows for some years, providers and recipients (all of them if None).
+
+    Returns the columns of the bulk file (only `columns`, if given), like
+    `CRSData(years, providers, recipients).read(using_bulk_download=True)`.
+    """
+
+    files = _year_files(_codes(years))
+    dataset = ds.dataset(files, format="parquet")
+
+    expression = pc.scalar(True)
+    for column, codes in (
+        ("donor_code", _codes(providers)),
+        ("recipient_code", _codes(recipients)),
+    ):
+        if codes is not None:
+            expression &= ds.field(column).isin(codes)
+
+    if "bi_multi" in dataset.schema.names:
+        bi_multi = ds.field("bi_multi")
+        expression &= (bi_multi != 2) | bi_multi.is_null()
+
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    return table.to_pandas().reset_index(drop=True)
@@ -0,0 +1,256 @@
+"""Fetch the OECD indicators of several scripts with as few downloads as possible.
+
+Each function of `scripts.oda.get_data` used to build its own `OECDClient`, for the
+same years and donors, and fetch its indicators one after the other. A `FetchPlan`
+collects their requests first:
+
+- requests for the same years and measures are merged into one download, with the
+  union of their indicators, providers and recipients (an indicator requested by
+  several scripts is only fetched once);
+- the merged downloads run concurrently;
+- each request gets back the rows of its own indicators, providers and recipients,
+  as `OECDClient.get_indicators` would have returned them.
+
+Downloads are cached in `raw_data/oda/.oecd_cache`, keyed by what was requested and
+by the current release of the OECD tables it comes from (a hash of the dataflow
+definition published by OECD, which links to the files of the latest release; the
+header of the message changes with every response and is left out). When OECD has
+not published anything new, a re-run reads the cache. If the release cannot be
+checked (OECD is unreachable), the data is downloaded again.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import cache
+from xml.etree import ElementTree
+
+import pandas as pd
+import pyarrow as pa
+import requests
+
+from scripts.config import PATHS, configure_data_paths
+from scripts.files import atomic_write
+from scripts.logger import logger
+
+OECD_CACHE: str = f"{PATHS.raw_oda}/.oecd_cache"
+
+# SDMX dataflows of the OECD tables behind the oda_data indicators
+DATAFLOW_URL: str = "https://sdmx.oecd.org/public/rest/dataflow/OECD.DCD.FSD"
+DATAFLOWS: dict[str, str] = {
+    "DAC1": "DSD_DAC1@DF_DAC1",
+    "DAC2A": "DSD_DAC2@DF_DAC2A",
+    "CRS": "DSD_CRS@DF_CRS",
+}
+
+
+@dataclass(frozen=True)
+class OECDRequest:
+    """Indicators to fetch with `OECDClient` (arguments as tuples, so it is hashable)"""
+
+    indicators: tuple[str, ...]
+    years: tuple[int, ...]
+    providers: tuple[int, ...]
+    measure: tuple[str, ...] = ("net_disbursement",)
+    recipients: tuple[int, ...] | None = None
+
+
+def oecd_request(
+    indicators: list[str],
+    years: range | list[int],
+    providers: list[int],
+    measure: list[str] | str = "net_disbursement",
+    recipients: list[int] | None = None,
+) -> OECDRequest:
+    """An `OECDRequest` built from the arguments `OECDClient` takes"""
+
+    return OECDRequest(
+        indicators=tuple(indicators),
+        years=tuple(years),
+        providers=tuple(providers),
+        measure=(measure,) if isinstance(measure, str) else tuple(measure),
+        recipients=None if recipients is None else tuple(recipients),
+    )
+
+
+def _union(*values: tuple) -> tuple:
+    """The values of several tuples, once, in order of appearance"""
+    return tuple(dict.fromkeys(v for group in values for v in group))
+
+
+def _download_key(request: OECDRequest) -> tuple:
+    # Requests share a download when they are for the same years and measures, and
+    # either all of them or none of them filter recipients
+    return request.years, request.measure, request.recipients is None
+
+
+def merge_requests(oecd_requests: list[OECDRequest]) -> dict[tuple, OECDRequest]:
+    """The downloads needed by `oecd_requests`, by download key"""
+
+    groups: dict[tuple, list[OECDRequest]] = {}
+    for request in oecd_requests:
+        groups.setdefault(_download_key(request), []).append(request)
+
+    return {
+        key: OECDRequest(
+            indicators=_union(*(r.indicators for r in group)),
+            years=group[0].years,
+            providers=_union(*(r.providers for r in group)),
+            measure=group[0].measure,
+            recipients=(
+                None
+                if group[0].recipients is None
+                else _union(*(r.recipients for r in group))
+            ),
+        )
+        for key, group in groups.items()
+    }
+
+
+def select(data: pd.DataFrame, request: OECDRequest) -> pd.DataFrame:
+    """The rows of a merged download that answer `request`"""
+
+    rows = data.donor_code.isin(request.providers)
+    if request.recipients is not None:
+        rows &= data.recipient_code.isin(request.recipients)
+
+    # As `OECDClient.get_indicators`, drop the columns an indicator does not use
+    return pd.concat(
+        [
+            data.loc[rows & (data.one_indicator == indicator)].dropna(
+                axis=1, how="all"
+            )
+            for indicator in request.indicators
+        ],
+        ignore_index=True,
+    )
+
+
+@cache
+def _sources(indicator: str) -> tuple[str, ...]:
+    configure_data_paths("oda_data")
+    from oda_data import OECDClient
+
+    return tuple(OECDClient.available_indicators()[indicator]["sources"])
+
+
+def release_token(content: bytes) -> str | None:
+    """A hash of an SDMX-ML structure message, without its `Header` (the message ID
+    and preparation time change with every response). None if it cannot be read."""
+
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        return None
+
+    for header in [e for e in root if e.tag.rsplit("}", 1)[-1] == "Header"]:
+        root.remove(header)
+
+    structure = ElementTree.canonicalize(ElementTree.tostring(root, encoding="unicode"))
+    return hashlib.sha256(structure.encode()).hexdigest()
+
+
+@cache
+def _release(source: str) -> str | None:
+    """A token which changes when OECD publishes a new release of a table"""
+
+    try:
+        response = requests.get(
+            f"{DATAFLOW_URL}/{DATAFLOWS[source]}/latest", timeout=30
+        )
+        response.raise_for_status()
+    except (KeyError, requests.RequestException) as error:
+        logger.info(f"Could not check the current {source} release ({error})")
+        return None
+
+    token = release_token(response.content)
+    if token is None:
+        logger.info(f"Could not read the current {source} release")
+
+    return token
+
+
+def _cache_key(download: OECDRequest) -> tuple[str, str | None]:
+    """The cache key of the download, and of the releases of its tables"""
+
+    request = hashlib.sha256(
+        json.dumps(asdict(download), sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    sources = sorted({s for i in download.indicators for s in _sources(i)})
+    releases = [_release(source) for source in sources]
+    if None in releases:
+        return request, None
+
+    release = hashlib.sha256(json.dumps(releases).encode()).hexdigest()[:16]
+    return request, release
+
+
+def _fetch(download: OECDRequest) -> pd.DataFrame:
+    """The data of a download, from the cache when OECD has not published since"""
+
+    request, release = _cache_key(download)
+    path = f"{OECD_CACHE}/{request}-{release}.parquet"
+
+    if release is not None and os.path.exists(path):
+        logger.debug(f"Read {', '.join(download.indicators)} from the OECD cache")
+        return pd.read_parquet(path)
+
+    configure_data_paths("oda_data")
+    from oda_data import OECDClient
+
+    data = OECDClient(
+        years=list(download.years),
+        providers=list(download.providers),
+        recipients=None if download.recipients is None else list(download.recipients),
+        measure=list(download.measure),
+    ).get_indicators(list(download.indicators))
+
+    if release is not None:
+        for stale in glob.glob(f"{OECD_CACHE}/{request}-*.parquet"):
+            os.remove(stale)
+        try:
+            with atomic_write(path, "wb") as file:
+                data.to_parquet(file, index=False)
+        except (pa.ArrowException, ValueError) as error:
+            logger.info(f"Could not cache {', '.join(download.indicators)} ({error})")
+
+    return data
+
+
+class FetchPlan:
+    """OECD requests collected by name, and fetched together by `run`"""
+
+    def __init__(self):
+        self.requests: dict[str, OECDRequest] = {}
+
+    def add(self, name: str, request: OECDRequest) -> None:
+        self.requests[name] = request
+
+    def downloads(self) -> dict[tuple, OECDRequest]:
+        """The distinct downloads needed by the requests"""
+        return merge_requests(list(self.requests.values()))
+
+    def run(self, max_workers: int = 4) -> dict[str, pd.DataFrame]:
+        """Fetch every request, running the downloads concurrently"""
+
+        downloads = self.downloads()
+        logger.info(
+            f"Fetching {len(self.requests)} OECD requests in {len(downloads)} downloads"
+        )
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            results = dict(zip(downloads, pool.map(_fetch, downloads.values())))
+
+        return {
+            name: select(results[_download_key(request)], request)
+            for name, request in self.requests.items()
+        }
+
+
+def fetch(request: OECDRequest) -> pd.DataFrame:
+    """The data of a single request (through the cache)"""
+    return select(_fetch(request), request)
@@ -1,22 +1,63 @@
 import pandas as pd
-from oda_data import set_data_path, ODAData, CRSData, provider_groupings, OECDClient
-from pydeflate import set_pydeflate_path
+from oda_data import ODAData
 
 from scripts import config
-
-set_data_path(config.PATHS.raw_oda)
-set_pydeflate_path(config.PATHS.raw_data)
+from scripts.config import configure_data_paths
+from scripts.oda.common import dac_members
+from scripts.oda.crs import read_crs
+from scripts.oda.fetch_plan import FetchPlan, OECDRequest, fetch, oecd_request
 
 
 YEARS = range(2000, 2025)
-DAC = list(provider_groupings()["dac_members"])
+
+REGIONS: dict[int, str] = {
+    9998: "Developing countries, unspecified",
+    10001: "Africa",
+    10004: "America",
+    10007: "Asia",
+    10010: "Europe",
+    10011: "Middle East",
+    10012: "Oceania",
+}
+
+
+def oda_requests() -> dict[str, OECDRequest]:
+    """The OECD data read by the functions below, by function name"""
+
+    both = ["net_disbursement", "grant_equivalent"]
+    incomes = [10024, 10045, 10046, 10047, 10048, 10049]
+
+    return {
+        "get_totals": oecd_request(["DAC1.10.1010"], YEARS, dac_members(), both),
+        "get_oda_gni": oecd_request(
+            ["ONE.40.1010_11010_1"], YEARS, dac_members(), both
+        ),
+        "get_gni": oecd_request(["DAC1.40.1"], YEARS, dac_members()),
+        "get_oda_by_income": oecd_request(
+            ["ONE.10.206_106"], YEARS, dac_members() + [20001], recipients=incomes
+        ),
+        "get_oda_to_africa": oecd_request(
+            ["ONE.10.206_106"],
+            YEARS,
+            dac_members() + [20001],
+            recipients=[10100, 10001],
+        ),
+        "get_oda_to_regions": oecd_request(
+            ["DAC2A.10.106", "DAC2A.10.206"],
+            YEARS,
+            dac_members() + [20001],
+            recipients=list(REGIONS),
+        ),
+    }
 
 
-def get_totals():
-    oda = OECDClient(
-        years=YEARS, providers=DAC, measure=["net_disbursement", "grant_equivalent"]
-    )
-    oda = oda.get_indicators(["DAC1.10.1010"])
+def _oda(name: str, oda: pd.DataFrame | None) -> pd.DataFrame:
+    """`oda` or, if None, the data requested by the function `name` on its own"""
+    return fetch(oda_requests()[name]) if oda is None else oda
+
+
+def get_totals(oda: pd.DataFrame | None = None):
+    oda = _oda("get_totals", oda)
 
     flow = oda.loc[lambda d: d.flows_code == 1140].assign(indicator="ODA (net flows)")
     ge = oda.loc[lambda d: d.flows_code == 1160].assign(
@@ -34,12 +75,8 @@ def get_totals():
     )
 
 
-def get_oda_gni():
-    oda = OECDClient(
-        years=YEARS, providers=DAC, measure=["net_disbursement", "grant_equivalent"]
-    )
-
-    oda = oda.get_indicators(["ONE.40.1010_11010_1"])
+def get_oda_gni(oda: pd.DataFrame | None = None):
+    oda = _oda("get_oda_gni", oda)
 
     data = (
         oda.assign(value=lambda d: round(d.value * 100, 2), indicator="ODA GNI")
@@ -50,10 +87,8 @@ def get_oda_gni():
     data.to_csv(f"{config.PATHS.raw_oda}/oda_gni.csv", index=False)
 
 
-def get_gni():
-    oda = OECDClient(years=YEARS, providers=DAC, measure=["net_disbursement"])
-
-    oda = oda.get_indicators(["DAC1.40.1"])
+def get_gni(oda: pd.DataFrame | None = None):
+    oda = _oda("get_gni", oda)
 
     data = oda.assign(indicator="GNI").filter(
         ["year", "donor_code", "flows_code", "value", "indicator"], axis=1
@@ -61,15 +96,8 @@ def get_gni():
     data.to_csv(f"{config.PATHS.raw_oda}/gni.csv", index=False)
 
 
-def get_oda_by_income():
-    recipients = [10024, 10045, 10046, 10047, 10048, 10049]
-    oda = OECDClient(
-        years=YEARS,
-        providers=DAC + [20001],
-        measure=["net_disbursement"],
-        recipients=recipients,
-    )
-    oda = oda.get_indicators(["ONE.10.206_106"])
+def get_oda_by_income(oda: pd.DataFrame | None = None):
+    oda = _oda("get_oda_by_income", oda)
 
     names = {
         10024: "Not classified by income",
@@ -87,19 +115,11 @@ def get_oda_by_income():
     ).to_csv(f"{config.PATHS.raw_oda}/total_oda_by_income.csv", index=False)
 
 
-def get_oda_to_africa() -> None:
+def get_oda_to_africa(oda: pd.DataFrame | None = None) -> None:
     total = [10100]
     africa = [10001]
 
-    recipients = total + africa
-
-    oda = OECDClient(
-        years=YEARS,
-        providers=DAC + [20001],
-        measure=["net_disbursement"],
-        recipients=recipients,
-    )
-    oda = oda.get_indicators(["ONE.10.206_106"])
+    oda = _oda("get_oda_to_africa", oda)
 
     data = oda.filter(["year", "donor_code", "recipient_code", "value"], axis=1)
 
@@ -117,25 +137,8 @@ def get_oda_to_africa() -> None:
     data.to_csv(f"{config.PATHS.raw_oda}/total_oda_to_africa.csv", index=False)
 
 
-def get_oda_to_regions():
-    recipients = {
-        9998: "Developing countries, unspecified",
-        10001: "Africa",
-        10004: "America",
-        10007: "Asia",
-        10010: "Europe",
-        10011: "Middle East",
-        10012: "Oceania",
-    }
-
-    oda = OECDClient(
-        years=YEARS,
-        providers=DAC + [20001],
-        measure=["net_disbursement"],
-        recipients=list(recipients),
-    )
-
-    oda = oda.get_indicators(["DAC2A.10.106", "DAC2A.10.206"])
+def get_oda_to_regions(oda: pd.DataFrame | None = None):
+    oda = _oda("get_oda_to_regions", oda)
 
     indicators = {
         "DAC2A.10.106": "imputed_multilateral",
@@ -143,7 +146,7 @@ def get_oda_to_regions():
     }
 
     data = oda.assign(
-        recipient=lambda d: d.recipient_code.map(recipients),
+        recipient=lambda d: d.recipient_code.map(REGIONS),
         indicator=lambda d: d.one_indicator.map(indicators),
     ).filter(
         ["year", "donor_code", "recipient_code", "value", "indicator", "recipient"],
@@ -154,13 +157,15 @@ def get_oda_to_regions():
 
 
 def get_ukraine_bilat() -> pd.DataFrame:
+    configure_data_paths("oda_data", "pydeflate")
+
     recipients = {85: "Ukraine"}
 
     indicators = {"recipient_bilateral_flow_net": "bilateral"}
 
     oda = ODAData(
         years=YEARS,
-        donors=DAC + [20001],
+        donors=dac_members() + [20001],
         recipients=list(recipients),
         include_names=True,
         prices="constant",
@@ -175,8 +180,20 @@ def get_ukraine_bilat() -> pd.DataFrame:
 
 
 def get_ukraine_crs() -> pd.DataFrame:
-    df = CRSData(years=range(2015, 2025), recipients=[85], providers=DAC).read(
-        using_bulk_download=True
+    df = read_crs(
+        years=range(2015, 2025),
+        recipients=[85],
+        providers=dac_members(),
+        columns=[
+            "year",
+            "donor_code",
+            "donor_name",
+            "recipient_name",
+            "flow_name",
+            "usd_disbursement",
+            "usd_received",
+            "usd_grant_equiv",
+        ],
     )
 
     df = df.loc[lambda d: d.flow_name != "Other Official Flows (non Export Credit)"]
@@ -217,11 +234,13 @@ def get_ukraine_crs() -> pd.DataFrame:
 
 
 def get_idrc() -> pd.DataFrame:
+    configure_data_paths("oda_data", "pydeflate")
+
     indicators = {"idrc_ge_linked": "irdc"}
 
     oda = ODAData(
         years=YEARS,
-        donors=DAC + [20001],
+        donors=dac_members() + [20001],
         include_names=True,
         prices="constant",
         base_year=2023,
@@ -235,9 +254,11 @@ def get_idrc() -> pd.DataFrame:
 
 
 def get_total_official():
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=YEARS,
-        donors=DAC + [20001],
+        donors=dac_members() + [20001],
         include_names=True,
         prices="constant",
         base_year=2023,
@@ -260,11 +281,28 @@ def get_total_official():
     return df
 
 
+def update_oda_tables(max_workers: int = 4) -> None:
+    """Fetch the data of every table in one plan (see `scripts.oda.fetch_plan`),
+    then build and save the tables"""
+
+    tables = {
+        "get_totals": get_totals,
+        "get_oda_gni": get_oda_gni,
+        "get_gni": get_gni,
+        "get_oda_by_income": get_oda_by_income,
+        "get_oda_to_africa": get_oda_to_africa,
+        "get_oda_to_regions": get_oda_to_regions,
+    }
+
+    plan = FetchPlan()
+    for name, request in oda_requests().items():
+        plan.add(name, request)
+
+    data = plan.run(max_workers)
+    for name, save in tables.items():
+        save(data[name])
+
+
 if __name__ == "__main__":
-    get_totals()
-    get_oda_gni()
-    get_gni()
-    get_oda_by_income()
-    get_oda_to_africa()
-    get_oda_to_regions()
+    update_oda_tables()
     # df = get_ukraine_crs()
@@ -1,24 +1,18 @@
-from bblocks import format_number, set_bblocks_data_path
-from oda_data import ODAData, set_data_path
-from oda_data.tools.groupings import provider_groupings
+from bblocks import format_number
+from oda_data import ODAData
 
+from scripts.chart_sink import ChartSink
 from scripts.common import df_to_key_number, update_key_number
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
 from scripts.logger import logger
 from scripts.oda import common
 
-set_data_path(PATHS.raw_oda)
-set_bblocks_data_path(PATHS.bblocks_data)
-
-DacCountries = (
-    provider_groupings()["dac_countries"]
-    | {84: "Lithuania"}
-    | {82: "Estonia"}
-    | {20001: "DAC Countries, Total"}
-)
+SINK = ChartSink("oda_topic")
 
 
 def global_aid_key_number() -> None:
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=range(2020, 2024),
         donors=20001,
@@ -47,7 +41,7 @@ def global_aid_key_number() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/sm_total_oda.csv", index=False)
+    SINK.write("sm_total_oda.csv", data, download=False)
     logger.debug("Saved chart version of sm_total_oda.csv")
 
     # Dynamic text version
@@ -65,6 +59,8 @@ def aid_gni_key_number() -> None:
     """Create an overview chart which contains the latest ODA/GNI value and
     the change in constant terms."""
 
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=range(2020, 2024),
         donors=20001,
@@ -92,7 +88,7 @@ def aid_gni_key_number() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/oda_gni_sm.csv", index=False)
+    SINK.write("oda_gni_sm.csv", data, download=False)
     logger.debug("Saved chart version of oda_gni_sm.csv")
 
     # Dynamic text version
@@ -106,6 +102,8 @@ def aid_gni_key_number() -> None:
 
 
 def aid_to_africa_ts() -> None:
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=range(common.START_YEAR, 2024),
         donors=20001,
@@ -140,7 +138,7 @@ def aid_to_africa_ts() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/aid_to_africa_ts.csv", index=False)
+    SINK.write("aid_to_africa_ts.csv", data, download=False)
     logger.debug("Saved chart version of aid_to_africa_ts.csv")
 
     # Dynamic text version
@@ -153,6 +151,8 @@ def aid_to_africa_ts() -> None:
 
 
 def aid_to_incomes_latest() -> None:
+    configure_data_paths("oda_data", "pydeflate")
+
     recipients = {
         10024: "Not classified by income",
         10045: "Low income",
@@ -193,15 +193,9 @@ def aid_to_incomes_latest() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/aid_to_income_latest.csv", index=False)
-    logger.debug("Saved chart version of aid_to_income_latest.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    data.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_income_latest.csv", index=False
-    )
-    logger.debug("Saved download version of aid_to_income_latest.csv")
+    SINK.write("aid_to_income_latest.csv", data, source=source)
+    logger.debug("Saved chart version of aid_to_income_latest.csv")
 
     # Dynamic text version
     income_dict = df_to_key_number(
@@ -216,20 +210,14 @@ def aid_to_incomes_latest() -> None:
 
 
 def aid_to_health_ts() -> None:
-    df = common.aid_to_sector_ts(common.filter_health_sectors).rename(
+    df = common.aid_to_sector_ts("Health").rename(
         columns={"value": "Total aid to health", "share": "Share of total ODA"}
     )
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/aid_to_health_ts.csv", index=False)
-    logger.debug("Saved chart version of aid_to_health_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_health_ts.csv", index=False
-    )
-    logger.debug("Saved download version of aid_to_health_ts.csv")
+    SINK.write("aid_to_health_ts.csv", df, source=source)
+    logger.debug("Saved chart version of aid_to_health_ts.csv")
 
     # Dynamic text version
     kn = {
@@ -241,20 +229,14 @@ def aid_to_health_ts() -> None:
 
 
 def aid_to_humanitarian_ts() -> None:
-    df = common.aid_to_sector_ts(common.filter_humanitarian_sectors).rename(
+    df = common.aid_to_sector_ts("Humanitarian").rename(
         columns={"value": "Total Humanitarian Aid", "share": "Share of total ODA"}
     )
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/aid_to_humanitarian_ts.csv", index=False)
-    logger.debug("Saved chart version of aid_to_humanitarian_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_humanitarian_ts.csv", index=False
-    )
-    logger.debug("Saved download version of aid_to_humanitarian_ts.csv")
+    SINK.write("aid_to_humanitarian_ts.csv", df, source=source)
+    logger.debug("Saved chart version of aid_to_humanitarian_ts.csv")
 
     # Dynamic text version
     kn = {
@@ -266,20 +248,15 @@ def aid_to_humanitarian_ts() -> None:
 
 
 def aid_to_food() -> None:
-    df = common.aid_to_sector_ts(common.filter_food_sectors).rename(
+    food = "Developmental Food Aid/Food Security Assistance"
+    df = common.aid_to_sector_ts(food).rename(
         columns={"value": "Total Food Aid", "share": "Share of total ODA"}
     )
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/aid_to_food_ts.csv", index=False)
-    logger.debug("Saved chart version of aid_to_food_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_food_ts.csv", index=False
-    )
-    logger.debug("Saved download version of aid_to_food_ts.csv")
+    SINK.write("aid_to_food_ts.csv", df, source=source)
+    logger.debug("Saved chart version of aid_to_food_ts.csv")
 
 
 if __name__ == "__main__":
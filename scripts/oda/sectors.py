@@ -1,8 +1,11 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
 from pathlib import Path
 
 import pandas as pd
 from oda_data import (
-    set_data_path,
     sector_imputations,
     add_sectors,
     add_broad_sectors,
@@ -11,14 +14,26 @@ from oda_data import (
 )
 from oda_data.clean_data.channels import add_channel_names
 
-from scripts.config import PATHS
+from scripts.config import PATHS, configure_data_paths
+from scripts.files import atomic_write
+from scripts.logger import logger
 
-set_data_path(PATHS.raw_oda)
 
 START_YEAR: int = 2012
 END_YEAR: int = 2024
 
-BILATERAL_PROVIDERS: list = list(provider_groupings()["all_bilateral"])
+# Partial sectors views, one Parquet file per block of years (see `pipeline_by_years`)
+SECTORS_VIEW_PARTS: str = f"{PATHS.raw_oda}/.sectors_view"
+
+
+@cache
+def _bilateral_providers() -> tuple:
+    return tuple(provider_groupings()["all_bilateral"])
+
+
+def bilateral_providers() -> list[int]:
+    """Codes of all bilateral providers"""
+    return list(_bilateral_providers())
 
 
 def groupby_purpose(
@@ -36,6 +51,8 @@ def groupby_purpose(
     Returns:
         pd.DataFrame: The grouped data.
     """
+
+    configure_data_paths("oda_data")
     # Drop the existing purpose names, unless the data is requested at that level
     if group_by != "purpose" and "purpose_name" in data.columns:
         data = data.drop(columns="purpose_name")
@@ -71,6 +88,8 @@ def groupby_purpose(
 
 
 def add_names(data: pd.DataFrame, by_recipient: bool) -> pd.DataFrame:
+    configure_data_paths("oda_data")
+
     if "channel_code" in data.columns:
         data = data.pipe(add_channel_names)
 
@@ -114,6 +133,8 @@ def get_multilateral_spending_shares(
 
     """
 
+    configure_data_paths("oda_data")
+
     shares = (
         sector_imputations.multilateral_spending_shares_by_channel_and_purpose_smoothed(
             years=range(start_year - 2, end_year + 1), oda_only=False
@@ -158,9 +179,11 @@ def get_imputed_multilateral_disbursements_by_sector(
 
     """
 
+    configure_data_paths("oda_data")
+
     # Get the spending data
     spending = sector_imputations.imputed_multilateral_by_purpose(
-        providers=BILATERAL_PROVIDERS,
+        providers=bilateral_providers(),
         years=range(start_year - 2, end_year + 1),
         currency=currency,
         base_year=base_year,
@@ -205,10 +228,12 @@ def get_bilateral_disbursements_by_sector(
         pd.DataFrame: A DataFrame with the bilateral disbursements by sector.
     """
 
+    configure_data_paths("oda_data")
+
     # Get the spending data
     spending = sector_imputations.spending_by_purpose(
         years=range(start_year - 2, end_year + 1),
-        providers=BILATERAL_PROVIDERS,
+        providers=bilateral_providers(),
         currency=currency,
         base_year=base_year,
     )
@@ -232,6 +257,8 @@ def pipeline(
     base_year: int | None = None,
     include_bilateral: bool = False,
 ) -> pd.DataFrame:
+    configure_data_paths("oda_data")
+
     if include_bilateral:
         bilateral = get_bilateral_disbursements_by_sector(
             start_year=start_year,
@@ -275,6 +302,93 @@ def pipeline(
     )
 
 
+def year_blocks(
+    start_year: int, end_year: int, block_size: int = 1
+) -> list[tuple[int, int]]:
+    """Split the years from `start_year` to `end_year` into blocks of `block_size`"""
+    return [
+        (first, min(first + block_size - 1, end_year))
+        for first in range(start_year, end_year + 1, block_size)
+    ]
+
+
+def _pipeline_block(years: tuple[int, int], folder: str, **kwargs) -> str:
+    """Run the pipeline for a block of years and save it in `folder`.
+
+    The pipeline also fetches the two years before the block (as the full pipeline
+    does), which are dropped: they belong to the previous block.
+    """
+    first, last = years
+
+    df = pipeline(start_year=first, end_year=last, **kwargs).loc[
+        lambda d: d.year.between(first, last)
+    ]
+
+    path = f"{folder}/years_{first}_{last}.parquet"
+    with atomic_write(path, "wb") as file:
+        df.to_parquet(file, index=False)
+
+    logger.debug(f"Saved sectors view for {first}-{last} ({len(df)} rows)")
+
+    return path
+
+
+def pipeline_by_years(
+    start_year: int = START_YEAR,
+    end_year: int = END_YEAR,
+    block_size: int = 1,
+    max_workers: int | None = None,
+    folder: str = SECTORS_VIEW_PARTS,
+    **kwargs,
+) -> list[str]:
+    """Run `pipeline` one block of years at a time, in a pool of processes.
+
+    Each block is aggregated on its own and saved as a Parquet file in `folder`, so
+    a worker only holds the data of `block_size` years. The years covered are those
+    of `pipeline(start_year, end_year)`, which starts two years before `start_year`.
+    Other keyword arguments (`currency`, `by_recipient`...) are passed to `pipeline`.
+
+    The first block runs alone, so that the oda_data bulk files are downloaded once
+    before the other blocks read them in parallel.
+
+    Returns the paths of the blocks, in order of years (see `write_sectors_view`).
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    for stale in glob.glob(f"{folder}/*.parquet"):
+        os.remove(stale)
+
+    blocks = year_blocks(start_year - 2, end_year, block_size)
+    run_block = partial(_pipeline_block, folder=folder, **kwargs)
+
+    paths = [run_block(blocks[0])]
+    with ProcessPoolExecutor(max_workers) as pool:
+        paths.extend(pool.map(run_block, blocks[1:]))
+
+    return paths
+
+
+def write_sectors_view(
+    paths: list[str], path: str = f"{PATHS.raw_oda}/sectors_view.csv"
+) -> None:
+    """Merge the blocks of `pipeline_by_years` into the sectors view csv.
+
+    The blocks cover different years, so the csv is their concatenation (the same
+    rows, in the same order, as `pipeline`). They are read one at a time.
+    """
+
+    with atomic_write(path) as file:
+        for position, block in enumerate(paths):
+            pd.read_parquet(block).to_csv(file, index=False, header=position == 0)
+
+
 if __name__ == "__main__":
-    df = pipeline(base_year=2024, include_bilateral=True, by_recipient=True)
-    df.to_csv(PATHS.raw_oda + r"/sectors_view.csv", index=False)
+    blocks = pipeline_by_years(
+        base_year=2024, include_bilateral=True, by_recipient=True
+    )
+    write_sectors_view(blocks)
+
+    # Pre-aggregated broad sectors, read by the sector charts
+    from scripts.oda.common import save_sector_cube
+
+    save_sector_cube()
@@ -1,26 +1,33 @@
+from functools import cache, lru_cache
+
 import pandas as pd
 from bblocks import format_number
 from oda_data import (
     ODAData,
-    set_data_path,
-    CRSData,
     provider_groupings,
     add_sectors,
-    add_broad_sectors,
 )
 from oda_data.clean_data.common import dac_deflate
 
-from scripts.config import PATHS
+from scripts.chart_sink import ChartSink
+from scripts.config import PATHS, configure_data_paths
+from scripts.files import file_digest
 from scripts.logger import logger
 from scripts.oda import common
+from scripts.oda.crs import read_crs
+
+SINK = ChartSink("oda_topic")
 
-set_data_path(PATHS.raw_oda)
-DacMembers = (
-    provider_groupings()["dac_members"]
-    | {84: "Lithuania"}
-    | {82: "Estonia"}
-    | {20001: "DAC Countries, Total"}
-)
+
+@cache
+def dac_members() -> dict:
+    """DAC members (plus Lithuania, Estonia and the DAC total) by donor code"""
+    return (
+        provider_groupings()["dac_members"]
+        | {84: "Lithuania"}
+        | {82: "Estonia"}
+        | {20001: "DAC Countries, Total"}
+    )
 
 
 def _ge_filter(ge_indicator: str, flow_indicator: str) -> str:
@@ -34,9 +41,11 @@ def global_aid_ts() -> None:
     """Create an overview chart which contains the latest total ODA value and
     the change in constant terms."""
 
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=range(2000, 2024),
-        donors=list(DacMembers),
+        donors=list(dac_members()),
         prices="constant",
         base_year=common.CONSTANT_YEAR,
         include_names=True,
@@ -63,21 +72,17 @@ def global_aid_ts() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/oda_gni_ts.csv", index=False)
-    logger.debug("Saved live chart oda_gni_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    data.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/oda_gni_ts.csv", index=False
-    )
-    logger.debug("Saved download chart oda_gni_ts.csv")
+    SINK.write("oda_gni_ts.csv", data, source=source)
+    logger.debug("Saved live chart oda_gni_ts.csv")
 
 
 def oda_gni_single_year() -> None:
+    configure_data_paths("oda_data", "pydeflate")
+
     oda = ODAData(
         years=range(2000, 2024),
-        donors=list(DacMembers),
+        donors=list(dac_members()),
         include_names=True,
     )
 
@@ -121,57 +126,29 @@ def oda_gni_single_year() -> None:
     )
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/oda_gni_single_year_ts.csv", index=False)
-    logger.debug("Saved live chart oda_gni_single_year_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    data.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/oda_gni_single_year_ts.csv", index=False
-    )
-    logger.debug("Saved download chart oda_gni_sing_year_ts.csv")
-
-
-def _sectors_ts() -> tuple[pd.DataFrame, list]:
-    df_ = common.read_sectors().drop(columns=["purpose_name"])
-    df_ = add_broad_sectors(df_)
-    df = df_.rename(columns={"purpose_name": "sector", "recipient_name": "recipient"})
+    SINK.write("oda_gni_single_year_ts.csv", data, source=source)
+    logger.debug("Saved live chart oda_gni_single_year_ts.csv")
 
-    # Add sector share of total by year and donor
-    df["share"] = df.groupby(
-        ["year", "donor_code", "sector"], dropna=False, observed=True
-    )["value"].transform(lambda x: x / x.sum())
 
-    df = df.groupby(["year", "donor_code", "sector", "recipient"], as_index=False)[
-        ["value", "share"]
-    ].sum()
+def build_sectors_ts(cube: pd.DataFrame) -> tuple[pd.DataFrame, list]:
+    """Aid by broad sector for all developing countries, and the sectors in order
+    of importance, from the sector cube (see `common.build_sector_cube`)"""
 
-    all_dev = (
-        df.assign(recipient="All Developing Countries")
+    df = (
+        cube.loc[lambda d: d.recipient == "All Developing Countries"]
         .groupby(
-            ["year", "donor_code", "sector", "recipient"],
+            ["year", "donor_code", "broad_sector", "recipient_total"],
             as_index=False,
-            dropna=False,
             observed=True,
-        )[["value", "share"]]
+        )["value"]
         .sum()
-    )
-
-    df = pd.concat([df, all_dev], ignore_index=True)
-
-    df = (
-        df.loc[lambda d: d.recipient == "All Developing Countries"]
-        .assign(year=lambda d: d.year.dt.year)
-        .pipe(
-            common.append_dac_total,
-            grouper=["year", "sector", "recipient"],
-        )
+        .loc[lambda d: d.value != 0]
+        .rename(columns={"broad_sector": "sector"})
+        .astype({"sector": str})
         .pipe(common.add_short_names)
-        .assign(
-            share=lambda d: d.groupby(["year", "name", "recipient"])["value"].transform(
-                lambda x: x / x.sum()
-            )
-        )
+        # Share of the sector in the aid of the donor, in the year
+        .assign(share=lambda d: d.value / d.recipient_total)
         .filter(["name", "year", "sector", "share", "value"], axis=1)
         .sort_values(["year", "name", "share"], ascending=[False, True, False])
     )
@@ -186,6 +163,17 @@ def _sectors_ts() -> tuple[pd.DataFrame, list]:
     return df, order
 
 
+@lru_cache(maxsize=1)
+def _cached_sectors_ts(digest: str | None) -> tuple[pd.DataFrame, list]:
+    return build_sectors_ts(common.sector_cube())
+
+
+def _sectors_ts() -> tuple[pd.DataFrame, list]:
+    """`build_sectors_ts`, computed once per version of the sectors view"""
+    df, order = _cached_sectors_ts(file_digest(f"{PATHS.raw_oda}/sectors_view.csv"))
+    return df.copy(), list(order)
+
+
 def sector_totals() -> None:
     df, order = _sectors_ts()
 
@@ -198,15 +186,9 @@ def sector_totals() -> None:
     )
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/sector_totals.csv", index=False)
-    logger.debug("Saved live chart sector_totals.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/sector_totals.csv", index=False
-    )
-    logger.debug("Saved download chart sector_totals.csv")
+    SINK.write("sector_totals.csv", df, source=source)
+    logger.debug("Saved live chart sector_totals.csv")
 
 
 def key_sector_shares() -> None:
@@ -233,15 +215,9 @@ def key_sector_shares() -> None:
     )
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/key_sector_shares.csv", index=False)
-    logger.debug("Saved live chart key_sector_shares.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/key_sector_shares.csv", index=False
-    )
-    logger.debug("Saved download chart key_sector_shares.csv")
+    SINK.write("key_sector_shares.csv", df, source=source)
+    logger.debug("Saved live chart key_sector_shares.csv")
 
 
 def aid_to_regions_ts() -> None:
@@ -289,15 +265,9 @@ def aid_to_regions_ts() -> None:
     df = common.sort_dac_first(df, keep_current_sorting=True)
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/aid_to_regions_ts.csv", index=False)
-    logger.debug("Saved live chart aid_to_regions_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_regions_ts.csv", index=False
-    )
-    logger.debug("Saved download chart aid_to_regions_ts.csv")
+    SINK.write("aid_to_regions_ts.csv", df, source=source)
+    logger.debug("Saved live chart aid_to_regions_ts.csv")
 
 
 def aid_to_incomes() -> None:
@@ -329,15 +299,9 @@ def aid_to_incomes() -> None:
     df = common.sort_dac_first(df, keep_current_sorting=True)
 
     # chart version
-    df.to_csv(f"{PATHS.charts}/oda_topic/aid_to_income_ts.csv", index=False)
-    logger.debug("Saved chart version of aid_to_income_ts.csv")
-
-    # download version
     source = "OECD DAC Creditor Reporting System (CRS)"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_income_ts.csv", index=False
-    )
-    logger.debug("Saved download version of aid_to_income_ts.csv")
+    SINK.write("aid_to_income_ts.csv", df, source=source)
+    logger.debug("Saved chart version of aid_to_income_ts.csv")
 
 
 def covid_bi_multi_dac() -> pd.DataFrame:
@@ -365,10 +329,10 @@ def covid_bi_multi_dac() -> pd.DataFrame:
 
 
 def oda_covid_idrc():
-    from oda_data import ODAData, set_data_path
+    from oda_data import ODAData
     from oda_data.tools.groupings import donor_groupings
 
-    set_data_path(PATHS.raw_oda)
+    configure_data_paths("oda_data", "pydeflate")
 
     dg = donor_groupings()
 
@@ -499,22 +463,16 @@ def oda_covid_idrc():
     # df.loc[lambda d: d.Year == 2023, "Other ODA"] = None
 
     # live version
-    df.to_csv(f"{PATHS.charts}/oda_topic/oda_covid.csv", index=False)
-    logger.debug("Saved live chart oda_covid.csv")
-
-    # download version
     source = "OECD DAC Table1"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/oda_covid.csv", index=False
-    )
-    logger.debug("Saved download version of oda_covid.csv")
+    SINK.write("oda_covid.csv", df, source=source)
+    logger.debug("Saved live chart oda_covid.csv")
 
 
 def oda_idrc_share():
-    from oda_data import ODAData, set_data_path
+    from oda_data import ODAData
     from oda_data.tools.groupings import donor_groupings
 
-    set_data_path(PATHS.raw_oda)
+    configure_data_paths("oda_data", "pydeflate")
 
     dg = donor_groupings()
 
@@ -594,22 +552,16 @@ def oda_idrc_share():
     )
 
     # live version
-    df.to_csv(f"{PATHS.charts}/oda_topic/oda_idrc_share.csv", index=False)
-    logger.debug("Saved live chart oda_covid.csv")
-
-    # download version
     source = "OECD DAC Table1"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/oda_idrc_share.csv", index=False
-    )
-    logger.debug("Saved download version of oda_idrc_share.csv")
+    SINK.write("oda_idrc_share.csv", df, source=source)
+    logger.debug("Saved live chart oda_covid.csv")
 
 
 def flow_shares_idrc_covid():
-    from oda_data import ODAData, set_data_path
+    from oda_data import ODAData
     from oda_data.tools.groupings import donor_groupings
 
-    set_data_path(PATHS.raw_oda)
+    configure_data_paths("oda_data", "pydeflate")
 
     dg = donor_groupings()
 
@@ -707,22 +659,16 @@ def flow_shares_idrc_covid():
     )
 
     # live version
-    df.to_csv(f"{PATHS.charts}/oda_topic/oda_ukraine_covid_refugees.csv", index=False)
-    logger.debug("Saved live chart oda_covid.csv")
-
-    # download version
     source = "OECD DAC Table1"
-    df.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/oda_ukraine_covid_refugees.csv", index=False
-    )
-    logger.debug("Saved download version of oda_covid.csv")
+    SINK.write("oda_ukraine_covid_refugees.csv", df, source=source)
+    logger.debug("Saved live chart oda_covid.csv")
 
 
 def aid_to_ukraine() -> pd.DataFrame:
-    from oda_data import OECDClient, set_data_path, sector_imputations, CRSData
+    from oda_data import OECDClient, sector_imputations
     from oda_data.tools.groupings import provider_groupings
 
-    set_data_path(PATHS.raw_oda)
+    configure_data_paths("oda_data", "pydeflate")
 
     dg = provider_groupings()
 
@@ -737,14 +683,15 @@ def aid_to_ukraine() -> pd.DataFrame:
         "DAC2A.10.206": "bilateral",
     }
 
-    crs = CRSData(
-        years=range(2018, 2025), providers=list(dg["dac_countries"]), recipients=85
-    )
-
     cols = ["year", "donor_code", "donor_name", "recipient_code", "recipient_name"]
 
     df_bilateral_ge = (
-        crs.read(using_bulk_download=True, columns=cols + ["usd_disbursement"])
+        read_crs(
+            years=range(2018, 2025),
+            providers=list(dg["dac_countries"]),
+            recipients=85,
+            columns=cols + ["usd_disbursement"],
+        )
         .assign(value=lambda d: d.usd_disbursement)
         .groupby(cols, dropna=False, observed=True)["value"]
         .sum()
@@ -809,14 +756,8 @@ def aid_to_ukraine_comparison() -> None:
 
 
     # chart version
-    data.to_csv(f"{PATHS.charts}/oda_topic/aid_to_ukraine_comparison.csv", index=False)
-
-    # download version
     source = "OECD DAC Table2a and Credit Reporting System (CRS)"
-
-    data.assign(source=source).to_csv(
-        f"{PATHS.download}/oda_topic/aid_to_ukraine_comparison.csv", index=False
-    )
+    SINK.write("aid_to_ukraine_comparison.csv", data, source=source)
 
 
 if __name__ == "__main__":
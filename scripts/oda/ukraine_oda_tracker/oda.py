@@ -1,6 +1,7 @@
 import pandas as pd
-from bblocks import add_short_names_column, format_number
+from bblocks import format_number
 
+from scripts.country_ids import add_short_names_column
 
 YEARLY_COSTS_URL: str = (
     "https://raw.githubusercontent.com/ONEcampaign/"
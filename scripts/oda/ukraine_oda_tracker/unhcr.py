@@ -1,4 +1,5 @@
 import datetime
+from functools import cache
 
 import requests
 
@@ -12,18 +13,21 @@ def _get_data() -> dict:
     return requests.get(url).json()["data"][0]
 
 
-UN_DATA = _get_data()
+@cache
+def _un_data() -> dict:
+    """UNHCR data, downloaded on first use"""
+    return _get_data()
 
 
 def read_refugee_data() -> str:
     """Read json file from UNHCR website and return dataframe"""
-    return f"{int(UN_DATA['individuals']):,.0f}"
+    return f"{int(_un_data()['individuals']):,.0f}"
 
 
 def read_refugee_date() -> str:
     """Read json file from UNHCR website and return dataframe"""
     try:
-        date = datetime.date(*[int(d) for d in UN_DATA["date"].split("-")])
+        date = datetime.date(*[int(d) for d in _un_data()["date"].split("-")])
     except AttributeError:
         data = _get_data()
         date = datetime.date(*[int(d) for d in data["date"].split("-")])
@@ -0,0 +1,140 @@
+"""Build OData queries for the WHO APIs, and read them page by page.
+
+The WHO GHO indicators (`ghoapi.azureedge.net`) and the GHE causes of death are
+served through OData. Instead of downloading a whole indicator (every country, year
+and dimension) and filtering it with pandas, or sending one request per country, an
+`ODataQuery` asks the server for only what is needed:
+
+- `$filter` conditions, built with `eq`, `is_in` (e.g. a list of countries),
+  `between` (e.g. a range of years) and combined with `all_of`;
+- `$select` of the fields that are used, and an `$orderby` which keeps pages stable;
+- `$top`/`$skip` pages. The first page also asks for `$count`, so that `read_query`
+  can then request all the other pages concurrently.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import quote, urlencode
+
+import pandas as pd
+import requests
+
+from scripts.logger import logger
+
+# Records per page
+PAGE_SIZE: int = 1_000
+
+# Characters left as they are in the query string (OData syntax)
+_SAFE: str = "$,'()"
+
+
+def literal(value: str | int | float) -> str:
+    """A value as an OData literal (text is quoted)"""
+
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def eq(field: str, value: str | int | float) -> str:
+    return f"{field} eq {literal(value)}"
+
+
+def is_in(field: str, values: list) -> str:
+    """`field` is one of `values` (as `eq` conditions, which every service knows)"""
+    return "(" + " or ".join(eq(field, v) for v in dict.fromkeys(values)) + ")"
+
+
+def between(field: str, start: int | float, end: int | float) -> str:
+    """`field` is between `start` and `end`, both included"""
+    return f"{field} ge {literal(start)} and {field} le {literal(end)}"
+
+
+def all_of(*conditions: str | None) -> str | None:
+    """The conditions that are not None, all of them"""
+
+    conditions = [c for c in conditions if c is not None]
+    return " and ".join(conditions) if conditions else None
+
+
+@dataclass(frozen=True)
+class ODataQuery:
+    """A query to an OData collection at `url`"""
+
+    url: str
+    filter: str | None = None
+    select: tuple[str, ...] = ()
+    orderby: tuple[str, ...] = ()
+
+    def page_url(
+        self, top: int | None = None, skip: int = 0, count: bool = False
+    ) -> str:
+        """The url of the `top` records after the first `skip` ones"""
+
+        params = {
+            "$filter": self.filter,
+            "$select": ",".join(self.select) or None,
+            "$orderby": ",".join(self.orderby) or None,
+            "$top": top,
+            "$skip": skip or None,
+            "$count": "true" if count else None,
+        }
+        query = urlencode(
+            {k: v for k, v in params.items() if v is not None},
+            quote_via=quote,
+            safe=_SAFE,
+        )
+
+        return f"{self.url}?{query}" if query else self.url
+
+
+def page_skips(count: int, first_page: int, page_size: int) -> range:
+    """The `$skip` of the pages after the first one, for `count` records in all"""
+
+    # A service may send fewer records than asked for: page at its own size
+    if 0 < first_page < min(page_size, count):
+        page_size = first_page
+
+    return range(first_page, count, page_size) if first_page else range(0)
+
+
+def get_page(url: str, timeout: int = 120) -> dict:
+    response = requests.get(
+        url, headers={"Accept": "application/json"}, timeout=timeout
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def read_query(
+    query: ODataQuery, page_size: int = PAGE_SIZE, max_workers: int = 4
+) -> pd.DataFrame:
+    """The records matching `query` (the `select`ed fields, when given).
+
+    The first page is read with the number of matching records, and the other pages
+    are then requested concurrently (in order).
+    """
+
+    first = get_page(query.page_url(top=page_size, count=True))
+    records = list(first["value"])
+    count = first.get("@odata.count")
+
+    if count is None:
+        # Without a count, read the pages one after the other until a short one
+        page = first["value"]
+        while len(page) == page_size:
+            page = get_page(query.page_url(top=page_size, skip=len(records)))["value"]
+            records.extend(page)
+    else:
+        skips = page_skips(count, len(records), page_size)
+        with ThreadPoolExecutor(max_workers) as pool:
+            pages = pool.map(
+                lambda skip: get_page(query.page_url(top=page_size, skip=skip)),
+                skips,
+            )
+            for page in pages:
+                records.extend(page["value"])
+
+    logger.debug(f"Read {len(records)} records from {query.url}")
+
+    return pd.DataFrame.from_records(records, columns=list(query.select) or None)
@@ -0,0 +1,214 @@
+"""Parquet mirrors of the raw csv files, read instead of the csv.
+
+Raw csv files (the ODA tables in `raw_data/oda`, the World Bank indicators cached by
+bblocks...) are read by many builders, each of them parsing the whole file again.
+`read_raw_csv` reads a Parquet copy of the file instead. The copy lives in a
+`.parquet` folder next to the csv and is rebuilt whenever the content of the csv
+changes (the csv stays the source of truth, and the only file kept in git).
+
+The mirror stores typed columns:
+
+- years (a `year` column of integers, or dates which are all on January 1st) as
+  int16;
+- text as dictionary-encoded columns, and integer codes (`*_code`) as int32;
+- the csv dtypes, so that the frame read back is the one `pd.read_csv` returns.
+
+`columns=` and `filters=` are passed to pyarrow, so only the columns and rows needed
+are decoded. Filters use the stored values: years are integers, e.g.
+`filters=[("year", ">=", 2018), ("donor_code", "in", [1, 2])]`.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts.files import atomic_write, file_digest
+from scripts.logger import logger
+
+# Key of the mirror metadata in the Parquet schema
+_METADATA_KEY: bytes = b"aftershocks"
+
+# Bump to rebuild every mirror when the way they are stored changes
+_MIRROR_VERSION: int = 1
+
+_locks: dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+def mirror_path(path: str) -> str:
+    """Where the Parquet mirror of the csv at `path` is stored"""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, ".parquet", f"{os.path.splitext(name)[0]}.parquet")
+
+
+def _path_lock(path: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(os.path.normpath(path), threading.Lock())
+
+
+def _is_year(column: pd.Series) -> bool:
+    return (
+        column.dtype.kind == "i"
+        and column.name == "year"
+        and column.between(1000, 9999).all()
+    )
+
+
+def _is_year_start(column: pd.Series) -> bool:
+    """Text dates which are all on January 1st ("1960-01-01")"""
+    values = column.dropna()
+    return (
+        column.dtype == object
+        and len(values) > 0
+        and values.map(type).eq(str).all()
+        and values.str.fullmatch(r"\d{4}-01-01").all()
+    )
+
+
+def _stored_columns(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """The frame to store, with how to restore each column"""
+
+    stored = {}
+    columns = {}
+
+    for name, column in df.items():
+        kind = None
+
+        if _is_year(column):
+            kind = "year"
+            column = column.astype("int16")
+        elif _is_year_start(column):
+            kind = "year_start"
+            column = column.str[:4].astype("float").astype("Int16")
+        elif column.dtype == object:
+            column = column.astype("category")
+        elif column.dtype.kind == "i" and str(name).endswith("_code"):
+            if column.between(np.iinfo("int32").min, np.iinfo("int32").max).all():
+                column = column.astype("int32")
+
+        stored[name] = column
+        columns[name] = {"dtype": str(df[name].dtype), "kind": kind}
+
+    return pd.DataFrame(stored), columns
+
+
+def _build(path: str, target: str, digest: str) -> None:
+    """Write the mirror of the csv at `path`"""
+
+    df, columns = _stored_columns(pd.read_csv(path))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {"version": _MIRROR_VERSION, "source": digest, "columns": columns}
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, _METADATA_KEY: json.dumps(metadata).encode()}
+    )
+
+    with atomic_write(target, "wb") as file:
+        pq.write_table(table, file, row_group_size=64_000)
+
+    logger.debug(f"Mirrored '{os.path.basename(path)}' to Parquet ({len(df)} rows)")
+
+
+def _metadata(target: str) -> dict | None:
+    """The mirror metadata, or None if there is no (readable) mirror"""
+
+    try:
+        schema_metadata = pq.read_schema(target).metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+    if _METADATA_KEY not in schema_metadata:
+        return None
+
+    return json.loads(schema_metadata[_METADATA_KEY])
+
+
+def _mirror(path: str) -> tuple[str, dict]:
+    """The path and metadata of an up to date mirror of `path`, built if needed"""
+
+    digest = file_digest(path)
+    if digest is None:
+        raise FileNotFoundError(path)
+
+    target = mirror_path(path)
+
+    with _path_lock(target):
+        metadata = _metadata(target)
+        if (
+            metadata is None
+            or metadata["version"] != _MIRROR_VERSION
+            or metadata["source"] != digest
+        ):
+            _build(path, target, digest)
+            metadata = _metadata(target)
+
+    return target, metadata
+
+
+def _years_to_dates(values: pd.Series) -> np.ndarray:
+    """Years (possibly missing) as datetime64[ns] dates on January 1st"""
+
+    years = values.to_numpy(dtype="float64", na_value=np.nan)
+    dates = np.full(len(years), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    known = ~np.isnan(years)
+    dates[known] = (years[known].astype("int64") - 1970).astype("datetime64[Y]")
+
+    return dates
+
+
+def _restore(column: pd.Series, spec: dict, parse_date: bool) -> pd.Series:
+    """A stored column as `pd.read_csv` returns it"""
+
+    kind = spec["kind"]
+
+    if kind in ("year", "year_start"):
+        if parse_date:
+            return pd.Series(_years_to_dates(column), index=column.index)
+        if kind == "year":
+            return column.astype(spec["dtype"])
+        return column.map(lambda year: f"{int(year)}-01-01", na_action="ignore")
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype(object)
+    elif spec["dtype"] != str(column.dtype):
+        column = column.astype(spec["dtype"])
+
+    if parse_date:
+        return pd.to_datetime(column)
+
+    return column
+
+
+def read_raw_csv(
+    path: str,
+    columns: list[str] | None = None,
+    filters: list | None = None,
+    parse_dates: list[str] | None = None,
+) -> pd.DataFrame:
+    """Read a raw csv through its Parquet mirror.
+
+    Returns what `pd.read_csv(path, usecols=columns, parse_dates=parse_dates)`
+    would (with the columns in the order given), keeping only the rows that match
+    `filters` (see `pyarrow.parquet.read_table`). The index always starts at 0.
+    """
+
+    target, metadata = _mirror(path)
+    specs = metadata["columns"]
+
+    df = pq.read_table(target, columns=columns, filters=filters).to_pandas(
+        ignore_metadata=True
+    )
+    parse_dates = set(parse_dates or [])
+
+    return df.assign(
+        **{
+            name: _restore(df[name], specs[name], name in parse_dates)
+            for name in df.columns
+        }
+    )
@@ -0,0 +1,242 @@
+"""Dependency-aware runner for the daily, weekly and monthly update scripts.
+
+Every fetcher and chart builder is registered as a `Task` which declares the files
+it reads and the files it writes. Two tasks which touch the same file keep the order
+in which they were registered (read after write, write after write and write after
+read). Every other task is free to run concurrently on a pool of worker threads.
+
+Tasks that read local files are skipped when neither their inputs nor their code
+changed since the last successful run (see `scripts.manifest`). Tasks without
+declared inputs get their data from the web and always run.
+"""
+
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from scripts.cassette import MODES, use_cassettes
+from scripts.config import PATHS
+from scripts.instrumentation import RunReport, StageStats, stage
+from scripts.key_numbers import key_number_store
+from scripts.logger import logger
+from scripts.manifest import BuildManifest
+
+DEFAULT_WORKERS: int = 4
+
+# Folder where bblocks stores the WFP country files
+WFP_RAW: str = f"{PATHS.bblocks_data}/wfp_raw"
+
+# WEO release cached by bblocks (also used by its GDP and expenditure columns)
+WEO_RAW: str = f"{PATHS.bblocks_data}/weo_2025_1.feather"
+
+
+@dataclass
+class Task:
+    """A single step of an update run.
+
+    `inputs` and `outputs` are absolute paths. A path can be a folder, in which case
+    it covers every file inside it. If no name is given, the name of the function
+    (qualified by its module) is used. Set `always_run` for tasks which also read
+    data that is not declared in `inputs` (for example from an API).
+    """
+
+    func: Callable[[], None]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    name: str = ""
+    always_run: bool = False
+
+    def __post_init__(self):
+        if not self.name:
+            module = self.func.__module__.removeprefix("scripts.")
+            self.name = f"{module}.{self.func.__name__}"
+
+    def run(
+        self,
+        manifest: BuildManifest | None = None,
+        force: bool = False,
+        report: RunReport | None = None,
+    ) -> None:
+        """Run the task, unless the manifest shows that it is up to date"""
+
+        with stage(self.name, report) as stats:
+            # Key numbers added by earlier tasks must be on disk before inputs are
+            # fingerprinted (see `scripts.key_numbers`)
+            key_number_store().flush(self.inputs)
+
+            incremental = manifest is not None and self.inputs and not self.always_run
+            if incremental:
+                fingerprint = manifest.fingerprint(self)
+                if not force and manifest.is_up_to_date(self, fingerprint):
+                    stats.status = "up_to_date"
+                    logger.info(f"Skipped task '{self.name}' (up to date)")
+                    return
+
+            logger.debug(f"Started task '{self.name}'")
+            self.func()
+
+            if incremental:
+                manifest.record(self, fingerprint)
+
+        logger.info(f"Finished task '{self.name}' in {stats.wall_seconds}s")
+
+
+def wb_cache(indicators: list[str] | dict, most_recent_only: bool = False) -> list:
+    """Paths of the files where bblocks caches World Bank indicators"""
+    suffix = "most_recent" if most_recent_only else ""
+    return [f"{PATHS.bblocks_data}/{code}_all_{suffix}.csv" for code in indicators]
+
+
+def _overlaps(path: str, other: str) -> bool:
+    """Check whether two paths are the same or one contains the other"""
+    path, other = os.path.normpath(path), os.path.normpath(other)
+
+    return (
+        path == other
+        or path.startswith(other + os.sep)
+        or other.startswith(path + os.sep)
+    )
+
+
+def _any_overlap(paths: list[str], others: list[str]) -> bool:
+    return any(_overlaps(p, o) for p in paths for o in others)
+
+
+def _depends_on(task: Task, earlier: Task) -> bool:
+    """Check whether `task` has to wait for a task registered before it"""
+    return (
+        _any_overlap(earlier.outputs, task.inputs)
+        or _any_overlap(earlier.outputs, task.outputs)
+        or _any_overlap(earlier.inputs, task.outputs)
+    )
+
+
+def build_graph(tasks: list[Task]) -> dict[str, set[str]]:
+    """Map each task name to the names of the tasks it depends on"""
+
+    names = [task.name for task in tasks]
+    duplicated = {name for name in names if names.count(name) > 1}
+    if duplicated:
+        raise ValueError(f"Duplicated task names: {', '.join(sorted(duplicated))}")
+
+    return {
+        task.name: {e.name for e in tasks[:position] if _depends_on(task, e)}
+        for position, task in enumerate(tasks)
+    }
+
+
+def run_tasks(
+    tasks: list[Task],
+    max_workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+    run_name: str = "tasks",
+    trace_memory: bool = False,
+) -> None:
+    """Run tasks concurrently, respecting the dependencies between them.
+
+    A task that fails does not stop independent tasks from running, but every task
+    which depends on it is skipped. A RuntimeError is raised at the end of the run
+    if any task failed. Tasks whose inputs and code did not change since their last
+    successful run are skipped, unless `force` is True.
+
+    Every task is timed and measured (see `scripts.instrumentation`) and a run
+    report named `run_name` is written at the end.
+    """
+
+    graph = build_graph(tasks)
+    manifest = BuildManifest()
+    report = RunReport(run_name, trace_memory=trace_memory)
+    pending = {task.name: task for task in tasks}
+    done: set[str] = set()
+    failed: dict[str, BaseException] = {}
+    skipped: set[str] = set()
+    running: dict[Future, str] = {}
+
+    # Key-number files are written once, when the batch ends
+    with key_number_store().batch(), ThreadPoolExecutor(max_workers) as pool:
+        while pending or running:
+            # Dependencies are always registered earlier, so a single pass in
+            # registration order is enough to propagate skips.
+            for name in list(pending):
+                dependencies = graph[name]
+                if dependencies & (skipped | set(failed)):
+                    del pending[name]
+                    skipped.add(name)
+                    report.add(StageStats(stage=name, status="skipped"))
+                    logger.info(f"Skipped task '{name}' (a dependency failed)")
+                elif dependencies <= done:
+                    task = pending.pop(name)
+                    running[pool.submit(task.run, manifest, force, report)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    done.add(name)
+                else:
+                    failed[name] = error
+                    logger.error(f"Task '{name}' failed", exc_info=error)
+
+    manifest.save()
+    report.write()
+
+    # Country names matched during the run are reused by the next one
+    from scripts import country_ids
+
+    country_ids.save()
+
+    # Shared datasets only live for the duration of a run
+    from scripts.importers import clear_shared_data
+
+    clear_shared_data()
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} task(s) failed: {', '.join(failed)}. "
+            f"{len(skipped)} task(s) skipped."
+        ) from next(iter(failed.values()))
+
+
+def parse_run_arguments(description: str) -> argparse.Namespace:
+    """Command line options shared by the update scripts"""
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of tasks to run at the same time (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every output, even if its inputs did not change",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Trace Python allocations for the run report (slows the run down)",
+    )
+    parser.add_argument(
+        "--http",
+        choices=MODES,
+        default=os.environ.get("AFTERSHOCKS_HTTP", "live"),
+        help="Fetch data live, record responses to cassettes or replay them",
+    )
+    parser.add_argument(
+        "--http-latency",
+        type=float,
+        default=float(os.environ.get("AFTERSHOCKS_HTTP_LATENCY", 0)),
+        help="Seconds to wait before serving each replayed response",
+    )
+
+    args = parser.parse_args()
+    use_cassettes(mode=args.http, latency=args.http_latency)
+
+    return args
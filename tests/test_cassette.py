@@ -0,0 +1,45 @@
+import pytest
+import requests
+
+from scripts import cassette
+
+URL = "https://example.org/data.csv"
+BODY = b"iso_code,value\n" + b"".join(b"AGO,%d\n" % i for i in range(1_000))
+
+
+def _record(folder) -> None:
+    cassette.use_cassettes("record", folder=str(folder))
+    meta = {
+        "method": "GET",
+        "url": URL,
+        "status": 200,
+        "reason": "OK",
+        "headers": {"Content-Type": "text/csv; charset=utf-8"},
+    }
+    cassette._save(cassette.request_key("GET", URL), meta, BODY)
+
+
+def test_replay_streamed_download(tmp_path):
+    _record(tmp_path)
+    cassette.use_cassettes("replay", folder=str(tmp_path))
+
+    try:
+        with requests.get(URL, stream=True) as response:
+            chunks = list(response.iter_content(chunk_size=512))
+        with requests.get(URL, stream=True) as response:
+            lines = list(response.iter_lines())
+    finally:
+        cassette.use_cassettes("live")
+
+    assert b"".join(chunks) == BODY
+    assert lines == BODY.splitlines()
+
+
+def test_replay_missing_request(tmp_path):
+    cassette.use_cassettes("replay", folder=str(tmp_path))
+
+    try:
+        with pytest.raises(cassette.CassetteMiss):
+            requests.get(URL)
+    finally:
+        cassette.use_cassettes("live")
@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from scripts.common import df_to_key_number
+
+
+def test_df_to_key_number():
+    df = pd.DataFrame(
+        {"iso_code": ["KEN", "UGA"], "value": [1.5, 2], "date": ["May", "June"]}
+    )
+
+    assert df_to_key_number(df, "gdp", "iso_code", ["value", "date"]) == {
+        "gdp": {
+            "KEN": {"value": "1.5", "date": "May"},
+            "UGA": {"value": "2.0", "date": "June"},
+        }
+    }
+
+
+def test_df_to_key_number_rejects_duplicated_ids():
+    df = pd.DataFrame({"iso_code": ["KEN", "UGA", "KEN"], "value": [1, 2, 3]})
+
+    with pytest.raises(ValueError, match="KEN"):
+        df_to_key_number(df, "gdp", "iso_code", "value")
@@ -0,0 +1,108 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from scripts.oda import crs
+
+COLUMNS = ["year", "donor_code", "recipient_code", "bi_multi", "usd_disbursement"]
+
+
+def _bulk(values: float = 1.0) -> pa.Table:
+    """Two years of CRS rows, in no particular order"""
+
+    rows = [
+        (year, donor, recipient, bi_multi, values * (year + donor + recipient))
+        for year in (2021, 2020)
+        for recipient in (238, 85, 62)
+        for donor in (4, 1, 12)
+        for bi_multi in (1, 2, None)
+    ]
+    return pa.table(
+        dict(zip(COLUMNS, map(list, zip(*rows)))),
+        schema=pa.schema(
+            [
+                ("year", pa.int16()),
+                ("donor_code", pa.int32()),
+                ("recipient_code", pa.int32()),
+                ("bi_multi", pa.int8()),
+                ("usd_disbursement", pa.float64()),
+            ]
+        ),
+    )
+
+
+@pytest.fixture
+def bulk(tmp_path, monkeypatch):
+    """The path of a synthetic bulk file, read in place of oda_data's"""
+
+    path = tmp_path / "CRSData_bulk.parquet"
+    pq.write_table(_bulk(), path)
+
+    monkeypatch.setattr(crs, "_ensure_bulk", lambda: str(path))
+    monkeypatch.setattr(crs, "CRS_YEARS", str(tmp_path / ".crs"))
+    return path
+
+
+def _expected(bulk_path, years, providers=None, recipients=None, columns=None):
+    df = pq.read_table(bulk_path).to_pandas()
+    df = df.loc[df.year.isin(years) & (df.bi_multi.isna() | (df.bi_multi != 2))]
+    if providers is not None:
+        df = df.loc[df.donor_code.isin(providers)]
+    if recipients is not None:
+        df = df.loc[df.recipient_code.isin(recipients)]
+    return df.filter(columns or COLUMNS)
+
+
+def _assert_same_rows(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    by = list(expected.columns)
+    pd.testing.assert_frame_equal(
+        result.sort_values(by).reset_index(drop=True),
+        expected.sort_values(by).reset_index(drop=True),
+    )
+
+
+def test_split_per_year(bulk):
+    crs.read_crs([2020])
+
+    files = os.listdir(crs.CRS_YEARS)
+    assert files == ["crs_2020.parquet"]
+
+    year = pq.read_table(f"{crs.CRS_YEARS}/crs_2020.parquet").to_pandas()
+    assert set(year.year) == {2020}
+    assert year.recipient_code.is_monotonic_increasing
+
+
+def test_filters_and_columns(bulk):
+    result = crs.read_crs(
+        range(2020, 2022),
+        providers=[4, 12],
+        recipients=85,
+        columns=["donor_code", "usd_disbursement"],
+    )
+
+    assert list(result.columns) == ["donor_code", "usd_disbursement"]
+    _assert_same_rows(
+        result,
+        _expected(bulk, [2020, 2021], [4, 12], [85], list(result.columns)),
+    )
+
+
+def test_core_contributions_are_dropped(bulk):
+    result = crs.read_crs(2021)
+
+    assert 2 not in set(result.bi_multi.dropna())
+    assert result.bi_multi.isna().any()
+    _assert_same_rows(result, _expected(bulk, [2021]))
+
+
+def test_resplit_when_the_bulk_file_changes(bulk):
+    crs.read_crs(2020)
+
+    pq.write_table(_bulk(values=2.0), bulk)
+    stats = os.stat(bulk)
+    os.utime(bulk, ns=(stats.st_atime_ns, stats.st_mtime_ns + 1_000_000_000))
+
+    _assert_same_rows(crs.read_crs(2020), _expected(bulk, [2020]))
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.chart_sink import _add_column
+from scripts.fast_csv import csv_cell, to_csv_text
+
+FLOATS = [
+    0.0,
+    -0.0,
+    1.0,
+    0.1,
+    1 / 3,
+    1e-4,
+    9.999e-5,
+    1e-5,
+    1e15,
+    1e16 - 2,
+    1e16,
+    1.5e16,
+    123456789012345.6,
+    -2.5e-7,
+    np.nan,
+    np.inf,
+    -np.inf,
+]
+
+TEXT = [
+    "plain",
+    "with, comma",
+    'with "quotes"',
+    "multi\nline",
+    "",
+    None,
+    "Côte d'Ivoire",
+    " spaces ",
+    "semi;colon",
+    "tab\tcharacter",
+    "N/A",
+    "1e5",
+    "trailing,",
+    '"',
+    ",",
+    "ok",
+    "last",
+]
+
+FRAMES = {
+    "floats": pd.DataFrame({"a": FLOATS, "b": FLOATS[::-1]}),
+    "text": pd.DataFrame({"name": TEXT, "value": FLOATS}),
+    "integers": pd.DataFrame(
+        {"year": np.arange(2000, 2017), "code": np.arange(-8, 9, dtype="int8")}
+    ),
+    "nullable_integers": pd.DataFrame(
+        {"a": pd.array([1, None, 3] * 5, dtype="Int64"), "b": [0.5, None, 2.0] * 5}
+    ),
+    "booleans": pd.DataFrame({"flag": [True, False, True], "value": [1.0, 2.0, 3.0]}),
+    "string_dtype": pd.DataFrame(
+        {"name": pd.array(["a", None, "b,c"], dtype="string"), "value": [1, 2, 3]}
+    ),
+    "mixed_objects": pd.DataFrame({"a": ["x", 1, 2.5], "b": [1.0, 2.0, 3.0]}),
+    "dates": pd.DataFrame(
+        {"date": pd.date_range("2024-01-01", periods=3), "value": [1.0, 2.0, 3.0]}
+    ),
+    "quoted_header": pd.DataFrame({"a, b": [1.0], 'say "hi"': ["x"], 3: [None]}),
+    "single_column": pd.DataFrame({"value": FLOATS}),
+    "no_rows": pd.DataFrame({"a": [], "b": []}),
+    "no_columns": pd.DataFrame(),
+}
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_to_csv_text_matches_pandas(name):
+    df = FRAMES[name]
+    assert to_csv_text(df) == df.to_csv(index=False, lineterminator="\n")
+
+
+@pytest.mark.parametrize("value", [t for t in TEXT if t is not None])
+def test_csv_cell_matches_pandas(value):
+    df = pd.DataFrame({"a": [value], "b": [1]})
+    assert f"a,b\n{csv_cell(value)},1\n" == df.to_csv(index=False, lineterminator="\n")
+
+
+@pytest.mark.parametrize("name", ["floats", "text", "single_column", "no_rows"])
+def test_add_column_matches_pandas(name):
+    df = FRAMES[name]
+    text = _add_column(to_csv_text(df), df, "source", "WFP, HungerMapLive")
+    expected = df.assign(source="WFP, HungerMapLive").to_csv(
+        index=False, lineterminator="\n"
+    )
+    assert text == expected
@@ -0,0 +1,41 @@
+from scripts.oda.fetch_plan import release_token
+
+MESSAGE = """<?xml version="1.0" encoding="utf-8"?>
+<message:Structure
+    xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message"
+    xmlns:structure="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/structure">
+  <message:Header>
+    <message:ID>{id}</message:ID>
+    <message:Test>false</message:Test>
+    <message:Prepared>{prepared}</message:Prepared>
+  </message:Header>
+  <message:Structures>
+    <structure:Dataflows>
+      <structure:Dataflow id="DSD_DAC1@DF_DAC1" version="{version}"/>
+    </structure:Dataflows>
+  </message:Structures>
+</message:Structure>
+"""
+
+
+def _message(id_: str, prepared: str, version: str = "1.2") -> bytes:
+    return MESSAGE.format(id=id_, prepared=prepared, version=version).encode()
+
+
+def test_release_token_ignores_header():
+    first = _message("IREF000123", "2024-05-01T10:00:00Z")
+    second = _message("IREF000456", "2024-05-02T11:30:00Z")
+
+    assert release_token(first) is not None
+    assert release_token(first) == release_token(second)
+
+
+def test_release_token_changes_with_release():
+    first = _message("IREF000123", "2024-05-01T10:00:00Z", version="1.2")
+    second = _message("IREF000123", "2024-05-01T10:00:00Z", version="1.3")
+
+    assert release_token(first) != release_token(second)
+
+
+def test_release_token_unreadable():
+    assert release_token(b"<html>Service unavailable") is None
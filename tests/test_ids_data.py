@@ -0,0 +1,147 @@
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("bblocks")
+
+from scripts.config import PATHS  # noqa: E402
+from scripts.debt import ids_data  # noqa: E402
+
+SERIES = ["DT.AMT.BLAT.CD", "DT.INT.BLAT.CD"]
+
+
+def _rows(codes: list[str], start_year: int, end_year: int, value: float):
+    return pd.DataFrame(
+        [
+            {
+                "time": year,
+                "country": "Kenya",
+                "series_code": code,
+                "counterpart-area": "World",
+                "series": code,
+                "value": value,
+            }
+            for code in codes
+            for year in range(start_year, end_year + 1)
+        ]
+    ).pipe(ids_data._typed)
+
+
+class FakeIDS:
+    """The IDS API, with one value for every row of the current release"""
+
+    def __init__(self):
+        self.release = "2024-12-03"
+        self.value = 1.0
+        self.calls = []
+
+    def fetch_indicators(self, indicators, start_year, end_year):
+        self.calls.append((list(indicators), start_year, end_year))
+        return _rows(indicators, start_year, end_year, self.value)
+
+
+@pytest.fixture
+def ids(tmp_path, monkeypatch):
+    (tmp_path / "raw_data" / "debt").mkdir(parents=True)
+    monkeypatch.setattr(PATHS, "project_dir", str(tmp_path))
+    monkeypatch.setattr(ids_data, "WATERMARKS", str(tmp_path / "watermarks.json"))
+
+    fake = FakeIDS()
+    monkeypatch.setattr(ids_data, "fetch_indicators", fake.fetch_indicators)
+    monkeypatch.setattr(ids_data, "ids_release_date", lambda: fake.release)
+    return fake
+
+
+def _update(series=SERIES, start_year=2009, end_year=2030) -> None:
+    ids_data._update_ids_file(series, start_year, end_year, "ids", incremental=True)
+
+
+def _stored() -> pd.DataFrame:
+    return pd.read_feather(f"{PATHS.raw_debt}/ids.feather")
+
+
+def _watermark() -> dict:
+    with open(ids_data.WATERMARKS) as file:
+        return json.load(file)["ids"]
+
+
+def test_upsert_replaces_the_window_of_fetched_series():
+    stored = _rows(SERIES, 2009, 2030, value=1.0)
+    new = _rows(SERIES, 2021, 2029, value=2.0)
+    windows = {SERIES[0]: 2021, SERIES[1]: 2021}
+
+    df = ids_data._upsert(stored, new, windows)
+
+    assert (df.loc[df.time < 2021].value == 1.0).all()
+    assert (df.loc[df.time >= 2021].value == 2.0).all()
+    # Stored rows in the window which are not in the new data are dropped
+    assert df.time.max() == 2029
+    assert len(df) == 2 * len(range(2009, 2030))
+
+
+def test_upsert_keeps_series_missing_from_the_new_data():
+    stored = _rows(SERIES, 2009, 2030, value=1.0)
+    new = _rows(SERIES[:1], 2021, 2030, value=2.0)
+    windows = {SERIES[0]: 2021, SERIES[1]: 2021}
+
+    df = ids_data._upsert(stored, new, windows)
+    missing = df.loc[df.series_code == SERIES[1]]
+
+    assert len(missing) == len(range(2009, 2031))
+    assert (missing.value == 1.0).all()
+
+
+def test_incremental_update_requests_the_revisable_years(ids):
+    _update()
+    ids.value = 2.0
+    _update()
+
+    # Last year of history before the 2024 release: 2023
+    window = 2023 - ids_data.REVISABLE_YEARS + 1
+    assert ids.calls[-1] == (SERIES, window, 2030)
+
+    df = _stored()
+    assert (df.loc[df.time < window].value == 1.0).all()
+    assert (df.loc[df.time >= window].value == 2.0).all()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"release": "2025-12-02"},
+        {"start_year": 2010},
+        {"end_year": 2031},
+        {"series": SERIES[:1]},
+    ],
+)
+def test_full_refresh(ids, change):
+    _update()
+
+    ids.release = change.get("release", ids.release)
+    arguments = {k: v for k, v in change.items() if k != "release"}
+    _update(**arguments)
+
+    series = arguments.get("series", SERIES)
+    start_year = arguments.get("start_year", 2009)
+    end_year = arguments.get("end_year", 2030)
+    assert ids.calls[-1] == (series, start_year, end_year)
+
+
+def test_full_refresh_when_the_release_is_unknown(ids):
+    _update()
+    ids.release = None
+    _update()
+
+    assert ids.calls[-1] == (SERIES, 2009, 2030)
+
+
+def test_watermark_is_the_last_year_before_the_release(ids):
+    _update()
+
+    assert _watermark() == {
+        "release": "2024-12-03",
+        "start_year": 2009,
+        "end_year": 2030,
+        "series": {code: 2023 for code in SERIES},
+    }
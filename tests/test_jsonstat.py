@@ -0,0 +1,89 @@
+import copy
+
+import pandas as pd
+import pytest
+from pyjstat import pyjstat
+
+from scripts.jsonstat import read_dataset
+
+
+def _dimension(label: str, names: list, as_dict: bool = False) -> dict:
+    ids = [f"{label[:3]}{i}" for i in range(len(names))]
+    index = {id_: position for position, id_ in enumerate(ids)} if as_dict else ids
+    category = {"index": index, "label": dict(zip(ids, names))}
+    return {"label": label, "category": category}
+
+
+def _dataset(values: list | dict, index_as_dict: bool = False) -> dict:
+    return {
+        "class": "dataset",
+        "version": "2.0",
+        "id": ["country", "counterpart-area", "time"],
+        "size": [3, 2, 4],
+        "dimension": {
+            "country": _dimension("country", ["Angola", "Kenya", "Niger"]),
+            "counterpart-area": _dimension("counterpart-area", ["World", "China"]),
+            "time": _dimension(
+                "time", ["2019", "2020", "2021", "2022"], as_dict=index_as_dict
+            ),
+        },
+        "value": values,
+    }
+
+
+# Every third cell is empty
+VALUES = [None if i % 3 == 0 else float(i) * 1.5 for i in range(24)]
+
+
+def _expected(data: dict) -> pd.DataFrame:
+    """pyjstat's frame without the empty cells"""
+    df = pyjstat.Dataset(copy.deepcopy(data)).write(output="dataframe")
+    return df.loc[df.value.notna()].reset_index(drop=True)
+
+
+def _assert_same(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(
+        result.astype(object), expected.astype(object), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("index_as_dict", [False, True])
+def test_dense_values_match_pyjstat(index_as_dict):
+    data = _dataset(VALUES, index_as_dict)
+    result = read_dataset(data)
+
+    _assert_same(result, _expected(data))
+    assert isinstance(result.country.dtype, pd.CategoricalDtype)
+    assert result.value.dtype == "float64"
+
+
+def test_sparse_values_match_dense():
+    dense = _dataset(VALUES)
+    sparse = _dataset({str(i): v for i, v in enumerate(VALUES) if v is not None})
+    # The sparse form does not have to be in order
+    sparse["value"] = dict(reversed(list(sparse["value"].items())))
+
+    _assert_same(read_dataset(sparse), read_dataset(dense))
+
+
+def test_version_1_bundle():
+    data = _dataset(VALUES)
+    dimensions = dict(data["dimension"], id=data["id"], size=data["size"])
+    bundle = {"dataset": {"dimension": dimensions, "value": data["value"]}}
+
+    _assert_same(read_dataset(bundle), read_dataset(data))
+
+
+def test_duplicate_labels():
+    data = _dataset(VALUES)
+    data["dimension"]["country"]["category"]["label"]["cou2"] = "Angola"
+
+    _assert_same(read_dataset(data), _expected(data))
+
+
+def test_all_empty():
+    result = read_dataset(_dataset([None] * 24))
+
+    assert result.empty
+    assert list(result.columns) == ["country", "counterpart-area", "time", "value"]
@@ -0,0 +1,82 @@
+import pytest
+
+from scripts.config import PATHS
+from scripts.manifest import BuildManifest, source_files
+from scripts.tasks import Task
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project whose builder module uses a helper module"""
+
+    (tmp_path / "scripts" / "charts").mkdir(parents=True)
+    (tmp_path / "scripts" / "__init__.py").write_text("")
+    (tmp_path / "scripts" / "charts" / "__init__.py").write_text("")
+    (tmp_path / "scripts" / "helpers.py").write_text("SCALE = 1\n")
+    (tmp_path / "scripts" / "charts" / "builder.py").write_text(
+        "def build():\n    from scripts.helpers import SCALE\n"
+    )
+    (tmp_path / "raw_data").mkdir()
+    (tmp_path / "raw_data" / "input.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "chart.csv").write_text("a,b\n1,2\n")
+
+    monkeypatch.setattr(PATHS, "project_dir", str(tmp_path))
+    return tmp_path
+
+
+def _task(project) -> Task:
+    def build():
+        pass
+
+    build.__module__ = "scripts.charts.builder"
+
+    return Task(
+        build,
+        inputs=[str(project / "raw_data" / "input.csv")],
+        outputs=[str(project / "chart.csv")],
+    )
+
+
+def _run(manifest: BuildManifest, task: Task) -> bool:
+    """Record the task as the runner does. Returns whether it was up to date"""
+
+    fingerprint = manifest.fingerprint(task)
+    if manifest.is_up_to_date(task, fingerprint):
+        return True
+    manifest.record(task, fingerprint)
+    return False
+
+
+def test_source_files_follow_imports(project):
+    files = source_files("scripts.charts.builder")
+
+    assert str(project / "scripts" / "helpers.py") in files
+    assert str(project / "scripts" / "charts" / "__init__.py") in files
+
+
+def test_unchanged_task_is_up_to_date(project):
+    manifest = BuildManifest(str(project / "manifest.json"))
+    task = _task(project)
+
+    assert not _run(manifest, task)
+    assert _run(manifest, task)
+
+
+def test_editing_a_helper_invalidates_the_task(project):
+    manifest = BuildManifest(str(project / "manifest.json"))
+    task = _task(project)
+    _run(manifest, task)
+
+    (project / "scripts" / "helpers.py").write_text("SCALE = 1_000\n")
+
+    assert not _run(manifest, task)
+
+
+def test_editing_an_input_invalidates_the_task(project):
+    manifest = BuildManifest(str(project / "manifest.json"))
+    task = _task(project)
+    _run(manifest, task)
+
+    (project / "raw_data" / "input.csv").write_text("a,b\n1,3\n")
+
+    assert not _run(manifest, task)
@@ -0,0 +1,135 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from scripts.parquet_mirror import mirror_path, read_raw_csv
+
+# An ODA table (as in raw_data/oda)
+ODA = """year,donor_code,flows_code,value,indicator
+2000,5,1140,5030.0,ODA (net flows)
+2001,5,1140,,ODA (net flows)
+2000,20001,11,0.27,"ODA, grant equivalent"
+2001,918,1140,6784.18,
+"""
+
+# A World Bank indicator (as cached by bblocks)
+WORLD_BANK = """date,iso_code,indicator_code,value
+1960-01-01,AGO,SP.POP.TOTL,5357195.0
+2021-01-01,AGO,SP.POP.TOTL,34532429.0
+,NAM,SP.POP.TOTL,2530151.0
+2021-01-01,NAM,SP.POP.TOTL,
+"""
+
+# Dates which are not all on January 1st
+MONTHLY = """date,iso_code,value
+2023-01-31,KEN,9.0
+2023-02-28,KEN,9.2
+2023-03-31,UGA,
+"""
+
+
+def _csv(tmp_path, text: str, name: str = "data.csv") -> str:
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def _expected(path: str, columns=None, parse_dates=None) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=columns, parse_dates=parse_dates)
+    return df if columns is None else df.filter(columns)
+
+
+@pytest.mark.parametrize(
+    "text, parse_dates",
+    [
+        (ODA, None),
+        (ODA, ["year"]),
+        (WORLD_BANK, None),
+        (WORLD_BANK, ["date"]),
+        (MONTHLY, None),
+        (MONTHLY, ["date"]),
+    ],
+)
+def test_matches_read_csv(tmp_path, text, parse_dates):
+    path = _csv(tmp_path, text)
+
+    pd.testing.assert_frame_equal(
+        read_raw_csv(path, parse_dates=parse_dates), _expected(path, None, parse_dates)
+    )
+
+
+def test_stored_types(tmp_path):
+    oda = _csv(tmp_path, ODA, "oda.csv")
+    world_bank = _csv(tmp_path, WORLD_BANK, "world_bank.csv")
+    read_raw_csv(oda)
+    read_raw_csv(world_bank)
+
+    schema = pq.read_schema(mirror_path(oda))
+    assert schema.field("year").type == pa.int16()
+    assert schema.field("donor_code").type == pa.int32()
+    assert schema.field("flows_code").type == pa.int32()
+    assert pa.types.is_dictionary(schema.field("indicator").type)
+
+    schema = pq.read_schema(mirror_path(world_bank))
+    assert schema.field("date").type == pa.int16()
+    assert pa.types.is_dictionary(schema.field("iso_code").type)
+
+
+def test_columns_and_filters(tmp_path):
+    path = _csv(tmp_path, ODA)
+
+    result = read_raw_csv(
+        path,
+        columns=["value", "year", "donor_code"],
+        filters=[("year", ">=", 2001), ("donor_code", "in", [5, 918])],
+        parse_dates=["year"],
+    )
+
+    expected = (
+        _expected(path, ["value", "year", "donor_code"], ["year"])
+        .loc[lambda d: (d.year.dt.year >= 2001) & d.donor_code.isin([5, 918])]
+        .reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_filters_on_dates_use_years(tmp_path):
+    path = _csv(tmp_path, WORLD_BANK)
+
+    result = read_raw_csv(path, filters=[("date", "==", 2021)], parse_dates=["date"])
+
+    assert list(result.iso_code) == ["AGO", "NAM"]
+    assert (result.date == pd.Timestamp("2021-01-01")).all()
+
+
+def _touch(path: str, seconds: int = 10) -> None:
+    stats = os.stat(path)
+    mtime = stats.st_mtime_ns + seconds * 1_000_000_000
+    os.utime(path, ns=(stats.st_atime_ns, mtime))
+
+
+def test_rebuilt_when_the_content_changes(tmp_path):
+    path = _csv(tmp_path, ODA)
+    read_raw_csv(path)
+
+    # Same size, different values
+    _csv(tmp_path, ODA.replace("5030.0", "5031.0"))
+    _touch(path)
+
+    result = read_raw_csv(path)
+    assert result.value.iloc[0] == 5031.0
+    pd.testing.assert_frame_equal(result, _expected(path))
+
+
+def test_not_rebuilt_when_only_the_mtime_changes(tmp_path):
+    path = _csv(tmp_path, ODA)
+    read_raw_csv(path)
+    built = os.stat(mirror_path(path)).st_mtime_ns
+
+    _touch(path)
+
+    pd.testing.assert_frame_equal(read_raw_csv(path), _expected(path))
+    assert os.stat(mirror_path(path)).st_mtime_ns == built
@@ -1,56 +1,69 @@
-from scripts.economy_picker.update_economy_picker import update_map_charts
-from scripts.explorers.economics import econ_explorer
-from scripts.explorers.health import health_explorer
+from scripts.config import PATHS
 from scripts.health import update as health_topic_update
 from scripts.hunger import update as hunger_topic_update
 from scripts.logger import logger
 from scripts.country_page import update as update_country_page
-from scripts.oda.ukraine_oda_tracker import dynamic_text as ukraine_oda_text
+from scripts.tasks import Task, parse_run_arguments, run_tasks
 
 
-def health_daily():
-    """Update daily charts in health page"""
+def health_daily() -> list[Task]:
+    """Daily charts in health page"""
+    return health_topic_update.daily_tasks()
 
-    # Run update scripts
-    health_topic_update.update_daily()
-    logger.info("Updated daily charts in health page")
-
-
-def hunger_update():
-    """Update daily data and all charts on hunger page"""
 
-    hunger_topic_update.update_daily_hunger_data()
-    hunger_topic_update.update_charts_and_text()
-    logger.info("Updated daily hunger data and all charts and text")
+def hunger_update() -> list[Task]:
+    """Daily data and all charts on hunger page"""
+    return (
+        hunger_topic_update.daily_data_tasks()
+        + hunger_topic_update.chart_and_text_tasks()
+    )
 
 
-def country_page_daily():
-    """Update daily charts in country page"""
-
-    # Run update scripts
-    update_country_page.update_daily()
-    logger.info("Updated daily charts in country page")
+def country_page_daily() -> list[Task]:
+    """Daily charts in country page"""
+    return update_country_page.daily_tasks()
 
 
 def update_economy_picker():
     """Update economy picker"""
 
     # Run update scripts
+    # from scripts.economy_picker.update_economy_picker import update_map_charts
     # update_map_charts()
     logger.info("Updated economy picker")
 
 
 def update_explorers():
+    from scripts.explorers.economics import econ_explorer
+    from scripts.explorers.health import health_explorer
+
     econ_explorer()
     health_explorer()
 
 
-def update_other_pages():
-    ukraine_oda_text.key_numbers()
+def update_other_pages() -> list[Task]:
+    from scripts.oda.ukraine_oda_tracker import dynamic_text as ukraine_oda_text
+
+    return [
+        Task(
+            ukraine_oda_text.key_numbers,
+            outputs=[f"{PATHS.charts}/oda_topic/ukraine_tracker_key_numbers.json"],
+        )
+    ]
+
+
+def daily_tasks() -> list[Task]:
+    """All the tasks of the daily update, in their original order"""
+    return health_daily() + hunger_update() + country_page_daily() + update_other_pages()
 
 
 if __name__ == "__main__":
-    health_daily()
-    hunger_update()
-    country_page_daily()
-    update_other_pages()
+    args = parse_run_arguments("Run the daily update")
+    run_tasks(
+        daily_tasks(),
+        max_workers=args.workers,
+        force=args.force,
+        run_name="daily",
+        trace_memory=args.trace_memory,
+    )
+    logger.info("Finished daily update")
@@ -3,41 +3,41 @@ from scripts.country_page import update as update_country_page
 from scripts.logger import logger
 from scripts.debt import update as update_debt
 from scripts.hunger import update as hunger_topic_update
+from scripts.tasks import Task, parse_run_arguments, run_tasks
 
 
-def health_monthly():
-    """Update monthly charts in health page"""
+def health_monthly() -> list[Task]:
+    """Monthly charts in health page"""
+    return health_topic_update.monthly_tasks()
 
-    # Run update scripts
-    health_topic_update.update_monthly()
-    logger.info("Updated monthly charts in health page")
 
+def hunger_update() -> list[Task]:
+    """Monthly hunger data"""
+    return hunger_topic_update.monthly_data_tasks()
 
-def hunger_update():
-    """Update monthly hunger data"""
 
-    hunger_topic_update.update_monthly_hunger_data()
-    logger.info("Updated monthly hunger data")
+def country_page_monthly() -> list[Task]:
+    """Monthly charts in country page"""
+    return update_country_page.monthly_tasks()
 
 
-def country_page_monthly():
-    """Update monthly charts in country page"""
+def debt_monthly() -> list[Task]:
+    """Monthly charts in debt page"""
+    return update_debt.monthly_tasks()
 
-    # Run update scripts
-    update_country_page.update_monthly()
-    logger.info("Updated monthly charts in country page")
 
-
-def debt_monthly():
-    """Update monthly charts in debt page"""
-
-    # Run update scripts
-    update_debt.update_debt_monthly()
-    logger.info("Updated monthly charts in debt page")
+def monthly_tasks() -> list[Task]:
+    """All the tasks of the monthly update, in their original order"""
+    return health_monthly() + hunger_update() + debt_monthly() + country_page_monthly()
 
 
 if __name__ == "__main__":
-    health_monthly()
-    hunger_update()
-    debt_monthly()
-    country_page_monthly()
+    args = parse_run_arguments("Run the monthly update")
+    run_tasks(
+        monthly_tasks(),
+        max_workers=args.workers,
+        force=args.force,
+        run_name="monthly",
+        trace_memory=args.trace_memory,
+    )
+    logger.info("Finished monthly update")
@@ -2,24 +2,31 @@ from scripts.country_page import update as update_country_page
 from scripts.logger import logger
 
 from scripts.debt import update as update_debt
+from scripts.tasks import Task, parse_run_arguments, run_tasks
 
 
-def country_page_weekly():
-    """Update daily charts in country page"""
+def country_page_weekly() -> list[Task]:
+    """Weekly charts in country page"""
+    return update_country_page.weekly_tasks()
 
-    # Run update scripts
-    update_country_page.update_weekly()
-    logger.info("Updated weekly charts in country page")
 
+def debt_page_weekly() -> list[Task]:
+    """Weekly charts in debt page"""
+    return update_debt.weekly_tasks()
 
-def debt_page_weekly():
-    """Update weekly charts in debt page"""
 
-    # Run update scripts
-    update_debt.update_debt_weekly()
-    logger.info("Updated weekly charts in debt page")
+def weekly_tasks() -> list[Task]:
+    """All the tasks of the weekly update"""
+    return debt_page_weekly()  # + country_page_weekly()
 
 
 if __name__ == "__main__":
-    debt_page_weekly()
-    # country_page_weekly()
+    args = parse_run_arguments("Run the weekly update")
+    run_tasks(
+        weekly_tasks(),
+        max_workers=args.workers,
+        force=args.force,
+        run_name="weekly",
+        trace_memory=args.trace_memory,
+    )
+    logger.info("Finished weekly update")